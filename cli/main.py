@@ -17,6 +17,7 @@ Usage:
 """
 
 import argparse
+import copy
 import os
 import sys
 import warnings
@@ -48,8 +49,10 @@ try:
 except ImportError:
     pass  # TensorFlow chưa được cài đặt
 
-from src import Config, run_pipeline, get_default_config, get_fast_config, get_1h_light_config, get_4h_balanced_config, get_scalping_ultra_fast_config, get_scalping_fast_config, get_intraday_light_config, get_intraday_balanced_config, get_swing_fast_config, get_swing_balanced_config, get_long_term_config, get_production_config, get_30k_w24_config, get_30k_w48_config, get_30k_w72_config, get_30k_w96_config, get_30k_w144_config, get_30k_w192_config, get_30k_w240_config, get_30k_w336_config, get_30k_w480_config, get_30k_w672_config   # noqa: E402
+from src import Config, run_pipeline, run_window_sweep, run_walk_forward, get_30k_sweep_configs, get_default_config, get_fast_config, get_1h_light_config, get_4h_balanced_config, get_scalping_ultra_fast_config, get_scalping_fast_config, get_intraday_light_config, get_intraday_balanced_config, get_swing_fast_config, get_swing_balanced_config, get_long_term_config, get_production_config, get_long_term_tcn_config, get_production_tcn_config, get_long_term_multires_config, get_production_multires_config, get_30k_w24_config, get_30k_w48_config, get_30k_w72_config, get_30k_w96_config, get_30k_w144_config, get_30k_w192_config, get_30k_w240_config, get_30k_w336_config, get_30k_w480_config, get_30k_w672_config   # noqa: E402
 from src.core.data import _infer_timeframe_from_filename   # noqa: E402
+from src.core.model import MODEL_BUILDERS   # noqa: E402
+from src.core.resample import TIMEFRAME_MINUTES   # noqa: E402
 
 
 def parse_args():
@@ -59,13 +62,14 @@ def parse_args():
     Giải thích: Giống như "lắng nghe yêu cầu" từ user
     """
     parser = argparse.ArgumentParser(
-        description="Dự báo giá Bitcoin với BiLSTM",
+        description="Dự báo giá Bitcoin với BiLSTM / GRU / TCN",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Ví dụ:
   python -m cli.main --epochs 20 --limit 1500
   python -m cli.main --timeframe 4h --window 30
   python -m cli.main --refresh-cache
+  python -m cli.main --start 2024-01-01 --end 2024-07-01 --limit 0
         """
     )
 
@@ -78,12 +82,18 @@ Ví dụ:
         default=None,
         help='Đường dẫn file CSV (nếu bỏ trống sẽ chọn theo --timeframe)'
     )
+    data_group.add_argument(
+        '--symbol',
+        type=str,
+        default=None,
+        help='Symbol để chọn file data/{symbol}_{timeframe}_data_*.csv (mặc định: btc)'
+    )
     data_group.add_argument(
         '--timeframe',
         type=str,
         default=None,
-        choices=['1d', '4h', '1h', '15m'],
-        help='Timeframe (mặc định theo preset/config; preset default = 15m)'
+        choices=list(TIMEFRAME_MINUTES),
+        help='Timeframe (mặc định theo preset/config; preset default = 15m). Thiếu file → tự gộp từ timeframe nhỏ hơn'
     )
     data_group.add_argument(
         '--limit',
@@ -91,17 +101,56 @@ Ví dụ:
         default=None,
         help='Lấy N dòng cuối trong file CSV (mặc định theo preset/config; <=0 = lấy tất cả)'
     )
+    data_group.add_argument(
+        '--start',
+        type=str,
+        default=None,
+        help='Chỉ lấy nến từ thời điểm này (ISO, ví dụ 2024-01-01 hoặc "2024-01-01 12:00")'
+    )
+    data_group.add_argument(
+        '--end',
+        type=str,
+        default=None,
+        help='Chỉ lấy nến trước thời điểm này (không bao gồm). --limit áp dụng trong khoảng [start, end)'
+    )
     data_group.add_argument(
         '--refresh-cache',
         action='store_true',
-        help='Đọc lại từ CSV gốc (bỏ qua cache đã chuẩn hoá)'
+        help='Đọc lại từ CSV gốc (bỏ qua cache đã chuẩn hoá). Thường không cần: cache tự rebuild khi file nguồn thay đổi'
+    )
+    data_group.add_argument(
+        '--cache-format',
+        type=str,
+        default=None,
+        choices=['parquet', 'ipc', 'csv'],
+        help='Định dạng cache đã chuẩn hoá (mặc định: parquet; ipc = Arrow memory-map)'
+    )
+    data_group.add_argument(
+        '--memory-limit-mb',
+        type=int,
+        default=None,
+        help='Giới hạn RAM (MB) khi tạo cache: CSV lớn được đọc + chuẩn hoá theo từng khối'
+    )
+    data_group.add_argument(
+        '--cache-max-mb',
+        type=int,
+        default=None,
+        help='Budget dung lượng thư mục cache (MB): vượt thì xoá entry ít dùng gần đây nhất'
     )
     data_group.add_argument(
         '--features',
         type=str,
         nargs='+',
         default=None,
-        help='Features sử dụng (mặc định: close)'
+        help='Features sử dụng: cột OHLCV và/hoặc chỉ báo như rsi_14, macd_12_26_9, '
+             'volatility_20, atr_14, volume_z_20, log_return; thêm @1h/@4h/@1d để lấy từ '
+             'timeframe lớn hơn, ví dụ close@1h (mặc định: close)'
+    )
+    data_group.add_argument(
+        '--target',
+        type=str,
+        default=None,
+        help='Cột cần dự đoán (mặc định: close). Không có trong --features thì tự thêm vào'
     )
 
     # ==================== PREPROCESSING ARGS ====================
@@ -113,23 +162,85 @@ Ví dụ:
         default=None,
         help='Số nến nhìn lại (mặc định theo preset/config; preset default = 240)'
     )
+    prep_group.add_argument(
+        '--predict-steps',
+        type=int,
+        default=None,
+        help='Số bước dự đoán trực tiếp (horizon, mặc định: 1). > 1 = báo cáo metrics theo từng horizon'
+    )
+    prep_group.add_argument(
+        '--stride',
+        type=int,
+        default=None,
+        help='Lấy 1 window train mỗi N nến (mặc định: 1 = mọi vị trí)'
+    )
+    prep_group.add_argument(
+        '--subsample',
+        type=float,
+        default=None,
+        help='Tỉ lệ window train ngẫu nhiên mỗi epoch, trong (0, 1] (mặc định: 1.0). < 1 tự bật --window-dataset'
+    )
     prep_group.add_argument(
         '--scaler-type',
         type=str,
         default=None,
-        choices=['minmax', 'standard'],
-        help='Loại scaler (mặc định: minmax)'
+        choices=['minmax', 'standard', 'robust'],
+        help='Loại scaler (mặc định: minmax; robust = median/IQR, ít bị ảnh hưởng bởi giá đột biến)'
+    )
+    prep_group.add_argument(
+        '--dtype',
+        type=str,
+        default=None,
+        choices=['float32', 'float64'],
+        help='Kiểu dữ liệu từ polars tới Keras (mặc định: float32)'
+    )
+    prep_group.add_argument(
+        '--no-prepared-cache',
+        action='store_true',
+        help='Không dùng cache dữ liệu đã chuẩn bị (luôn fit scaler + split lại)'
     )
 
     # ==================== MODEL ARGS ====================
     model_group = parser.add_argument_group("Model", "Cấu hình model")
 
+    model_group.add_argument(
+        '--architecture',
+        type=str,
+        choices=list(MODEL_BUILDERS),
+        default=None,
+        help='Kiến trúc model: bilstm (mặc định), gru, tcn (Conv1D nhân quả giãn - nhanh trên CPU với window dài), multires (BiLSTM trên chuỗi đã nén lịch sử cũ)'
+    )
     model_group.add_argument(
         '--lstm-units',
         type=int,
         nargs='+',
         default=None,
-        help='Số units cho mỗi LSTM layer (mặc định: 64 32)'
+        help='Số units cho mỗi LSTM/GRU layer, tcn: số filters = giá trị đầu (mặc định: 64 32)'
+    )
+    model_group.add_argument(
+        '--kernel-size',
+        type=int,
+        default=None,
+        help='Độ rộng kernel Conv1D của tcn (mặc định: 3)'
+    )
+    model_group.add_argument(
+        '--recent-steps',
+        type=int,
+        default=None,
+        help='multires: số nến gần nhất giữ nguyên độ phân giải (mặc định: 64)'
+    )
+    model_group.add_argument(
+        '--compress-factor',
+        type=int,
+        default=None,
+        help='multires: số nến cũ gộp thành 1 bước (mặc định: 8)'
+    )
+    model_group.add_argument(
+        '--compress',
+        type=str,
+        choices=['conv', 'pool'],
+        default=None,
+        help='multires: cách nén lịch sử cũ - conv (Conv1D stride, học được) hoặc pool (trung bình) (mặc định: conv)'
     )
     model_group.add_argument(
         '--dropout',
@@ -165,6 +276,18 @@ Ví dụ:
         default=None,
         help='Số epochs chờ trước khi dừng (mặc định theo preset/config; preset default = 10)'
     )
+    train_group.add_argument(
+        '--window-dataset',
+        action='store_true',
+        default=None,
+        help='Sinh windows theo từng batch (tiết kiệm RAM với window lớn; bật sẵn ở preset swing-balanced/long-term/production)'
+    )
+    train_group.add_argument(
+        '--data-workers',
+        type=int,
+        default=None,
+        help='Số worker chuẩn bị batch song song khi dùng --window-dataset (mặc định: 1)'
+    )
 
     # ==================== RUNTIME ARGS ====================
     runtime_group = parser.add_argument_group("Runtime", "Cấu hình runtime")
@@ -188,59 +311,86 @@ Ví dụ:
         help='Cố định ngẫu nhiên để tái lập kết quả (mặc định theo preset/config; default = 42, <0 = không set)'
     )
 
+    # ==================== WALK-FORWARD ====================
+    wf_group = parser.add_argument_group(
+        "Walk-forward", "Backtest nhiều fold (train quá khứ → dự đoán block kế tiếp), mỗi fold 1 process"
+    )
+
+    wf_group.add_argument(
+        '--walk-forward',
+        type=int,
+        default=None,
+        metavar='N_FOLDS',
+        help='Chạy walk-forward với N fold thay vì 1 lần train/val/test'
+    )
+    wf_group.add_argument(
+        '--wf-test-size',
+        type=int,
+        default=None,
+        help='Số nến test mỗi fold (mặc định: số dòng // (N_FOLDS + 3))'
+    )
+    wf_group.add_argument(
+        '--wf-gap',
+        type=int,
+        default=None,
+        help='Số nến embargo giữa train/val/test (mặc định: 0)'
+    )
+    wf_group.add_argument(
+        '--wf-workers',
+        type=int,
+        default=None,
+        help='Số process train song song (mặc định: min(N_FOLDS, số CPU // 2))'
+    )
+    wf_group.add_argument(
+        '--wf-threads',
+        type=int,
+        default=None,
+        help='Threads TensorFlow mỗi process (mặc định: intra threads // số process)'
+    )
+
     # ==================== PRESET ====================
     preset_group = parser.add_argument_group("Preset", "Cấu hình có sẵn")
 
     preset_group.add_argument(
         '--preset',
         type=str,
-        choices=['default', 'fast', '1h-light', '4h-balanced', 'scalping-ultra-fast', 'scalping-fast', 'intraday-light', 'intraday-balanced', 'swing-fast', 'swing-balanced', 'long-term', 'production', '30k-w24', '30k-w48', '30k-w72', '30k-w96', '30k-w144', '30k-w192', '30k-w240', '30k-w336', '30k-w480', '30k-w672'],
+        choices=['default', 'fast', '1h-light', '4h-balanced', 'scalping-ultra-fast', 'scalping-fast', 'intraday-light', 'intraday-balanced', 'swing-fast', 'swing-balanced', 'long-term', 'production', 'long-term-tcn', 'production-tcn', 'long-term-multires', 'production-multires', '30k-w24', '30k-w48', '30k-w72', '30k-w96', '30k-w144', '30k-w192', '30k-w240', '30k-w336', '30k-w480', '30k-w672'],
         default='default',
         help='Preset config (mặc định: default)'
     )
 
+    # ==================== SWEEP ====================
+    sweep_group = parser.add_argument_group(
+        "Sweep", "Nhiều window_size trên cùng 1 lần load + scale (mỗi window chỉ tốn thời gian train)"
+    )
+
+    sweep_group.add_argument(
+        '--sweep',
+        type=str,
+        choices=['30k'],
+        default=None,
+        help='Sweep có sẵn: 30k = cả 10 preset 30k-w24 ... 30k-w672 (bỏ qua --preset, --window)'
+    )
+    sweep_group.add_argument(
+        '--sweep-windows',
+        type=int,
+        nargs='+',
+        default=None,
+        help='Sweep các window_size trên preset đang chọn (ví dụ: --sweep-windows 24 48 96)'
+    )
+
     return parser.parse_args()
 
 
-def main():
+def _apply_overrides(config: Config, args, override_window: bool = True) -> None:
     """
-    Main entry point
+    Ghi đè config bằng CLI args (chỉ các args user truyền vào)
 
-    Giải thích: Giống như "nhân viên lễ tân" - tiếp nhận, chuyển tiếp
+    Args:
+        config: Config cần ghi đè (sửa tại chỗ)
+        args: Kết quả parse_args
+        override_window: False khi sweep (window_size do từng config của sweep quyết định)
     """
-    # Parse args
-    args = parse_args()
-
-    # Chọn preset
-    preset_map = {
-        'default': get_default_config,
-        'fast': get_fast_config,
-        '1h-light': get_1h_light_config,
-        '4h-balanced': get_4h_balanced_config,
-        'scalping-ultra-fast': get_scalping_ultra_fast_config,
-        'scalping-fast': get_scalping_fast_config,
-        'intraday-light': get_intraday_light_config,
-        'intraday-balanced': get_intraday_balanced_config,
-        'swing-fast': get_swing_fast_config,
-        'swing-balanced': get_swing_balanced_config,
-        'long-term': get_long_term_config,
-        'production': get_production_config,
-        # 30k dataset presets (15m - fixed limit=30000)
-        '30k-w24': get_30k_w24_config,
-        '30k-w48': get_30k_w48_config,
-        '30k-w72': get_30k_w72_config,
-        '30k-w96': get_30k_w96_config,
-        '30k-w144': get_30k_w144_config,
-        '30k-w192': get_30k_w192_config,
-        '30k-w240': get_30k_w240_config,
-        '30k-w336': get_30k_w336_config,
-        '30k-w480': get_30k_w480_config,
-        '30k-w672': get_30k_w672_config,
-    }
-
-    config = preset_map[args.preset]()
-
-    # Override config với CLI args (chỉ khi user truyền vào)
     if args.data_path is not None:
         config.data.data_path = args.data_path
         # Infer timeframe từ filename nếu user không chỉ định --timeframe
@@ -249,20 +399,54 @@ def main():
             if inferred_tf:
                 config.data.timeframe = inferred_tf
 
+    if args.symbol is not None:
+        config.data.symbol = args.symbol.lower()
     if args.timeframe is not None:
         config.data.timeframe = args.timeframe
     if args.limit is not None:
         config.data.limit = args.limit
+    if args.start is not None:
+        config.data.start = args.start
+    if args.end is not None:
+        config.data.end = args.end
     if args.refresh_cache:
         config.data.refresh_cache = args.refresh_cache
+    if args.cache_format is not None:
+        config.data.cache_format = args.cache_format
+    if args.memory_limit_mb is not None:
+        config.data.memory_limit_mb = args.memory_limit_mb
+    if args.cache_max_mb is not None:
+        config.data.cache_max_mb = args.cache_max_mb
     if args.features is not None:
         config.data.features = args.features
-    if args.window is not None:
+    if args.target is not None:
+        config.data.target = args.target
+    if override_window and args.window is not None:
         config.preprocessing.window_size = args.window
+    if args.predict_steps is not None:
+        config.preprocessing.predict_steps = args.predict_steps
+    if args.stride is not None:
+        config.preprocessing.stride = args.stride
+    if args.subsample is not None:
+        config.preprocessing.subsample = args.subsample
     if args.scaler_type is not None:
         config.preprocessing.scaler_type = args.scaler_type
+    if args.dtype is not None:
+        config.preprocessing.dtype = args.dtype
+    if args.no_prepared_cache:
+        config.preprocessing.cache_prepared = False
+    if args.architecture is not None:
+        config.model.architecture = args.architecture
     if args.lstm_units is not None:
         config.model.lstm_units = args.lstm_units
+    if args.kernel_size is not None:
+        config.model.kernel_size = args.kernel_size
+    if args.recent_steps is not None:
+        config.model.recent_steps = args.recent_steps
+    if args.compress_factor is not None:
+        config.model.compress_factor = args.compress_factor
+    if args.compress is not None:
+        config.model.compress = args.compress
     if args.dropout is not None:
         config.model.dropout_rate = args.dropout
     if args.epochs is not None:
@@ -273,23 +457,112 @@ def main():
         config.training.learning_rate = args.learning_rate
     if args.early_stopping_patience is not None:
         config.training.early_stopping_patience = args.early_stopping_patience
+    if args.window_dataset:
+        config.training.use_window_dataset = True
+    if args.data_workers is not None:
+        config.training.data_workers = args.data_workers
     if args.intra_threads is not None:
         config.runtime.intra_op_threads = args.intra_threads
     if args.inter_threads is not None:
         config.runtime.inter_op_threads = args.inter_threads
     if args.seed is not None:
         config.runtime.seed = args.seed
+    if args.walk_forward is not None:
+        config.walk_forward.n_folds = args.walk_forward
+    if args.wf_test_size is not None:
+        config.walk_forward.test_size = args.wf_test_size
+    if args.wf_gap is not None:
+        config.walk_forward.gap = args.wf_gap
+    if args.wf_workers is not None:
+        config.walk_forward.workers = args.wf_workers
+    if args.wf_threads is not None:
+        config.walk_forward.threads_per_worker = args.wf_threads
+
+
+def main():
+    """
+    Main entry point
+
+    Giải thích: Giống như "nhân viên lễ tân" - tiếp nhận, chuyển tiếp
+    """
+    # Parse args
+    args = parse_args()
+
+    # Chọn preset
+    preset_map = {
+        'default': get_default_config,
+        'fast': get_fast_config,
+        '1h-light': get_1h_light_config,
+        '4h-balanced': get_4h_balanced_config,
+        'scalping-ultra-fast': get_scalping_ultra_fast_config,
+        'scalping-fast': get_scalping_fast_config,
+        'intraday-light': get_intraday_light_config,
+        'intraday-balanced': get_intraday_balanced_config,
+        'swing-fast': get_swing_fast_config,
+        'swing-balanced': get_swing_balanced_config,
+        'long-term': get_long_term_config,
+        'production': get_production_config,
+        'long-term-tcn': get_long_term_tcn_config,
+        'production-tcn': get_production_tcn_config,
+        'long-term-multires': get_long_term_multires_config,
+        'production-multires': get_production_multires_config,
+        # 30k dataset presets (15m - fixed limit=30000)
+        '30k-w24': get_30k_w24_config,
+        '30k-w48': get_30k_w48_config,
+        '30k-w72': get_30k_w72_config,
+        '30k-w96': get_30k_w96_config,
+        '30k-w144': get_30k_w144_config,
+        '30k-w192': get_30k_w192_config,
+        '30k-w240': get_30k_w240_config,
+        '30k-w336': get_30k_w336_config,
+        '30k-w480': get_30k_w480_config,
+        '30k-w672': get_30k_w672_config,
+    }
+
+    config = preset_map[args.preset]()
+
+    # Override config với CLI args (chỉ khi user truyền vào)
+    sweep = args.sweep is not None or args.sweep_windows is not None
+    if sweep:
+        if args.sweep is not None:
+            configs = get_30k_sweep_configs()
+        else:
+            configs = []
+            for window in args.sweep_windows:
+                sweep_config = copy.deepcopy(config)
+                sweep_config.preprocessing.window_size = window
+                configs.append(sweep_config)
+        for sweep_config in configs:
+            _apply_overrides(sweep_config, args, override_window=False)
+    else:
+        _apply_overrides(config, args)
 
     # In header
     print("\n" + "=" * 70)
     print(" " * 15 + "DỰ BÁO GIÁ BITCOIN VỚI BiLSTM")
     print("=" * 70)
-    print(f"Preset: {args.preset}")
+    if args.sweep is not None:
+        print(f"Sweep: {args.sweep} ({len(configs)} window)")
+    else:
+        print(f"Preset: {args.preset}")
     print("=" * 70)
 
+    if sweep:
+        # In config summary (window đầu tiên, các window khác chỉ khác window_size/model)
+        print(configs[0].summary())
+
+        # Load + scale 1 lần, train từng window
+        run_window_sweep(configs, run_type="cli_sweep")
+        return
+
     # In config summary
     print(config.summary())
 
+    if args.walk_forward is not None:
+        # Các fold train song song, mỗi fold 1 process
+        run_walk_forward(config, run_type="cli_walk_forward")
+        return
+
     # Chạy pipeline
     run_pipeline(config, run_type="cli")
 
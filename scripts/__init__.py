@@ -4,6 +4,7 @@ SCRIPTS MODULE - UTILITY SCRIPTS
 
 Các script utility cho project:
 - clean.py: Dọn dẹp cache, reports, checkpoints
+- compare_model_cost.py: So sánh chi phí train/dự đoán giữa các kiến trúc (multires vs BiLSTM)
 
 Giải thích bằng ví dụ đời sống:
 - Giống như "nhân viên dọn dẹp" - giữ project sạch sẽ
@@ -11,6 +11,7 @@ Usage:
     python -m scripts.clean                    # Xem trước (dry-run)
     python -m scripts.clean --execute          # Thực sự xóa
     python -m scripts.clean --cache --days 7   # Xóa cache > 7 ngày
+    python -m scripts.clean --max-mb 500       # Giữ cache <= 500 MB (xoá ít dùng nhất trước)
     python -m scripts.clean --reports --keep 3 # Giữ lại 3 báo cáo
 """
 
@@ -60,14 +61,19 @@ def print_summary(count: int, size_mb: float, item_type: str = "items", dry_run:
 def clean_cache(*, force: bool = False, older_than_days: int = 30, dry_run: bool = True) -> tuple[int, float]:
     """Xóa cache dữ liệu"""
     from src.config import Paths
+    from src.core.cache import prune_access
+    from src.core.data import PREPARED_CACHE_DIR, _iter_cache_files
     cache_dir = Paths().cache_dir
 
     if not cache_dir.exists():
         print("Không có thư mục cache")
         return 0, 0.0
 
+    prepared_dir = cache_dir / PREPARED_CACHE_DIR
+    prepared_entries = list(prepared_dir.iterdir()) if prepared_dir.exists() else []
+
     candidates: list[Path] = []
-    for file_path in cache_dir.glob("*.csv"):
+    for file_path in list(_iter_cache_files(cache_dir)) + prepared_entries:
         age_days = get_age_days(file_path)
         if force or age_days > older_than_days:
             candidates.append(file_path)
@@ -88,7 +94,10 @@ def clean_cache(*, force: bool = False, older_than_days: int = 30, dry_run: bool
 
         if not dry_run:
             try:
-                file_path.unlink()
+                if file_path.is_dir():
+                    shutil.rmtree(file_path)
+                else:
+                    file_path.unlink()
             except Exception as e:
                 print(f"      Lỗi: {e}")
                 continue
@@ -96,10 +105,46 @@ def clean_cache(*, force: bool = False, older_than_days: int = 30, dry_run: bool
         removed_count += 1
         total_size_mb += size_mb
 
+    if not dry_run:
+        prune_access(cache_dir)
+
     print_summary(removed_count, total_size_mb, "files", dry_run)
     return removed_count, total_size_mb
 
 
+def clean_cache_budget(*, max_mb: int, dry_run: bool = True) -> tuple[int, float]:
+    """Xóa entry cache ít dùng gần đây nhất (LRU) cho tới khi tổng dung lượng <= max_mb"""
+    from src.config import Paths
+    from src.core.cache import enforce_cache_budget, plan_eviction
+    cache_dir = Paths().cache_dir
+
+    if not cache_dir.exists():
+        print("Không có thư mục cache")
+        return 0, 0.0
+
+    max_bytes = max_mb * 1024 * 1024
+    candidates = plan_eviction(cache_dir, max_bytes)
+    if not candidates:
+        print(f"Cache đã nằm trong budget {max_mb} MB")
+        return 0, 0.0
+
+    print_header(f"CACHE DATA (LRU, budget {max_mb} MB)", cache_dir.relative_to(BASE))
+
+    total_size_mb = 0.0
+    for item in candidates:
+        size_mb = item["bytes"] / (1024 * 1024)
+        last_used = datetime.fromtimestamp(item["last_access"]).strftime("%Y-%m-%d %H:%M") if item["last_access"] else "-"
+        print(f"  - {item['entry']} ({len(item['files'])} files)")
+        print(f"      Size: {size_mb:.2f} MB | Dùng lần cuối: {last_used} | Số lần dùng: {item['hits']}")
+        total_size_mb += size_mb
+
+    if not dry_run:
+        enforce_cache_budget(cache_dir, max_bytes)
+
+    print_summary(len(candidates), total_size_mb, "entries", dry_run)
+    return len(candidates), total_size_mb
+
+
 def clean_reports(*, keep: int = 5, dry_run: bool = True) -> tuple[int, float]:
     """Xóa báo cáo cũ"""
     reports_dir = BASE / "reports"
@@ -116,8 +161,9 @@ def clean_reports(*, keep: int = 5, dry_run: bool = True) -> tuple[int, float]:
         if not run_type_dir.is_dir():
             continue
 
+        # Mọi kiến trúc (BiLSTM_*, GRU_*, TCN_*), mỗi folder con là 1 lần chạy
         result_folders = sorted(
-            run_type_dir.glob("BiLSTM_*"),
+            (p for p in run_type_dir.iterdir() if p.is_dir()),
             key=lambda x: x.stat().st_mtime,
             reverse=True
         )
@@ -207,6 +253,7 @@ Ví dụ:
   python -m scripts.clean                    # Xem trước (dry-run)
   python -m scripts.clean --execute          # Thực sự xóa
   python -m scripts.clean --cache --days 7   # Xóa cache > 7 ngày
+  python -m scripts.clean --max-mb 500       # Giữ cache <= 500 MB (xoá ít dùng nhất trước)
   python -m scripts.clean --reports --keep 3 # Giữ lại 3 báo cáo
         """
     )
@@ -219,6 +266,7 @@ Ví dụ:
     parser.add_argument('--data-cache', action='store_true', help='Xóa cache cũ (> --days)')
     parser.add_argument('--data-cache-force', action='store_true', help='Xóa TẤT CẢ cache dữ liệu')
     parser.add_argument('--days', type=int, default=30, help='Số ngày cache cũ (mặc định: 30)')
+    parser.add_argument('--max-mb', type=int, help='Giữ cache <= N MB, xoá entry ít dùng gần đây nhất trước (LRU)')
 
     # Reports flags
     parser.add_argument('--reports', action='store_true', help='Xóa báo cáo cũ')
@@ -238,7 +286,8 @@ def main():
     dry_run = not args.execute
 
     do_all = args.all or not any([
-        args.cache, args.data_cache, args.data_cache_force, args.reports, args.checkpoints, args.keep_reports
+        args.cache, args.data_cache, args.data_cache_force, args.max_mb is not None, args.reports, args.checkpoints,
+        args.keep_reports
     ])
 
     if args.keep_reports is not None:
@@ -262,6 +311,11 @@ def main():
         total_count += count
         total_size_mb += size
 
+    if args.max_mb is not None:
+        count, size = clean_cache_budget(max_mb=args.max_mb, dry_run=dry_run)
+        total_count += count
+        total_size_mb += size
+
     # Reports
     if do_all or args.reports:
         count, size = clean_reports(keep=args.keep, dry_run=dry_run)
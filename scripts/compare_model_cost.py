@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+COMPARE MODEL COST - SO SÁNH CHI PHÍ CÁC KIẾN TRÚC
+-------------------------------------------------------
+
+Giải thích bằng ví dụ đời sống:
+- Giống như "chạy thử 2 xe trên cùng 1 đoạn đường" - cùng dữ liệu, cùng batch, bấm giờ
+- So multires (BiLSTM trên chuỗi đã nén) với build_bilstm_model thường ở window rất dài
+
+Đo trên dữ liệu ngẫu nhiên cùng shape (chi phí không phụ thuộc giá trị):
+- Số tham số
+- Số bước BiLSTM chạy tuần tự
+- Thời gian 1 epoch train (sau 1 epoch khởi động để loại thời gian build graph)
+- Thời gian dự đoán mỗi window
+
+Usage:
+    python -m scripts.compare_model_cost                                  # window 768, units 256 128 64 32
+    python -m scripts.compare_model_cost --window 576 --units 128 64 --samples 256
+    python -m scripts.compare_model_cost --architectures bilstm multires tcn gru
+    python -m scripts.compare_model_cost --compress pool --compress-factor 16
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+
+# Thêm project root vào path để import được src
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+
+from src.config import ModelConfig  # noqa: E402
+from src.core.model import MODEL_BUILDERS, MODEL_NAMES, build_model, multires_length  # noqa: E402
+from src.runtime import configure_tensorflow_runtime, set_random_seed  # noqa: E402
+
+
+def recurrent_steps(architecture: str, window_size: int, model_config: ModelConfig) -> str:
+    """Số bước chạy tuần tự của phần recurrent ("-" nếu không có)"""
+    if architecture in ("bilstm", "gru"):
+        return str(window_size)
+    if architecture == "multires":
+        return str(multires_length(window_size, model_config.recent_steps, model_config.compress_factor))
+    return "-"
+
+
+def measure(architecture: str, args, model_config: ModelConfig, X: np.ndarray, y: np.ndarray) -> dict:
+    """Build + đo chi phí 1 kiến trúc"""
+    set_random_seed(args.seed)
+    model = build_model(
+        architecture,
+        input_shape=X.shape[1:],
+        units=model_config.lstm_units,
+        dropout_rate=model_config.dropout_rate,
+        dense_units=model_config.dense_units,
+        output_units=y.shape[1],
+        **model_config.get_builder_options()
+    )
+
+    # Epoch đầu: build graph / warm-up → không tính
+    model.fit(X, y, epochs=1, batch_size=args.batch_size, verbose=0)
+    t0 = time.perf_counter()
+    model.fit(X, y, epochs=args.epochs, batch_size=args.batch_size, verbose=0)
+    epoch_seconds = (time.perf_counter() - t0) / args.epochs
+
+    model.predict(X[:args.batch_size], verbose=0)
+    t0 = time.perf_counter()
+    model.predict(X, batch_size=args.batch_size, verbose=0)
+    predict_ms = (time.perf_counter() - t0) / len(X) * 1000
+
+    return {
+        "architecture": architecture,
+        "params": model.count_params(),
+        "steps": recurrent_steps(architecture, X.shape[1], model_config),
+        "epoch_seconds": epoch_seconds,
+        "predict_ms": predict_ms,
+    }
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description="So sánh chi phí train/dự đoán của các kiến trúc trên window dài",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--architectures', nargs='+', choices=list(MODEL_BUILDERS), default=['bilstm', 'multires'],
+                        help='Kiến trúc cần so (kiến trúc đầu tiên là mốc so sánh, mặc định: bilstm multires)')
+    parser.add_argument('--window', type=int, default=768, help='Số nến nhìn lại (mặc định: 768 - preset production)')
+    parser.add_argument('--features', type=int, default=5, help='Số features (mặc định: 5)')
+    parser.add_argument('--units', type=int, nargs='+', default=[256, 128, 64, 32],
+                        help='Units mỗi LSTM layer (mặc định: 256 128 64 32 - preset production)')
+    parser.add_argument('--dense-units', type=int, nargs='*', default=[128, 64, 32], help='Dense layers (mặc định: 128 64 32)')
+    parser.add_argument('--predict-steps', type=int, default=1, help='Số horizon (mặc định: 1)')
+    parser.add_argument('--recent-steps', type=int, default=64, help='multires: số nến gần giữ nguyên (mặc định: 64)')
+    parser.add_argument('--compress-factor', type=int, default=8, help='multires: số nến cũ gộp thành 1 bước (mặc định: 8)')
+    parser.add_argument('--compress', choices=['conv', 'pool'], default='conv', help='multires: conv hoặc pool (mặc định: conv)')
+    parser.add_argument('--kernel-size', type=int, default=3, help='tcn: độ rộng kernel (mặc định: 3)')
+    parser.add_argument('--samples', type=int, default=512, help='Số window train (mặc định: 512)')
+    parser.add_argument('--batch-size', type=int, default=32, help='Batch size (mặc định: 32)')
+    parser.add_argument('--epochs', type=int, default=1, help='Số epoch đo (sau 1 epoch khởi động, mặc định: 1)')
+    parser.add_argument('--threads', type=int, default=None, help='Intra-op threads (mặc định: số CPU)')
+    parser.add_argument('--seed', type=int, default=42, help='Seed (mặc định: 42)')
+    args = parser.parse_args()
+
+    configure_tensorflow_runtime(
+        intra_op_threads=args.threads or os.cpu_count() or 1,
+        inter_op_threads=2,
+        enable_xla=False
+    )
+
+    model_config = ModelConfig(
+        lstm_units=args.units,
+        dense_units=args.dense_units,
+        kernel_size=args.kernel_size,
+        recent_steps=args.recent_steps,
+        compress_factor=args.compress_factor,
+        compress=args.compress,
+    )
+
+    rng = np.random.default_rng(args.seed)
+    X = rng.random((args.samples, args.window, args.features), dtype=np.float32)
+    y = rng.random((args.samples, args.predict_steps), dtype=np.float32)
+
+    results = [measure(architecture, args, model_config, X, y) for architecture in args.architectures]
+    base = results[0]
+
+    print("\n" + "=" * 78)
+    print(f"CHI PHÍ THEO KIẾN TRÚC (window {args.window}, {args.features} features, units {args.units}, "
+          f"batch {args.batch_size}, {args.samples} windows)")
+    print("=" * 78)
+    print(f"{'Kiến trúc':<12}{'Tham số':>12}{'Bước tuần tự':>14}{'s/epoch':>10}{'ms/window':>12}{'Nhanh hơn':>12}")
+    print("-" * 78)
+    for r in results:
+        speedup = base["epoch_seconds"] / r["epoch_seconds"]
+        print(
+            f"{MODEL_NAMES[r['architecture']]:<12}{r['params']:>12,}{r['steps']:>14}"
+            f"{r['epoch_seconds']:>10.2f}{r['predict_ms']:>12.3f}{f'{speedup:.1f}x':>12}"
+        )
+    print("=" * 78)
+    print(f"'Nhanh hơn' = s/epoch của {MODEL_NAMES[base['architecture']]} / s/epoch của kiến trúc đó\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ Modules:
 - visualization: Vẽ biểu đồ
 - results: Lưu kết quả
 - pipeline: Pipeline chính (SoC)
+- walk_forward: Walk-forward backtest song song nhiều process
 
 Giải thích bằng ví dụ đời sống:
 - Giống như "tầng trệt" của tòa nhà
@@ -26,6 +27,7 @@ from .config import (
     ModelConfig,
     TrainingConfig,
     RuntimeConfig,
+    WalkForwardConfig,
     VisualizationConfig,
     # Scalping presets (15m)
     get_scalping_ultra_fast_config,
@@ -40,6 +42,12 @@ from .config import (
     get_long_term_config,
     # Production preset (15m)
     get_production_config,
+    # TCN presets (15m - window dài, nhanh trên CPU)
+    get_long_term_tcn_config,
+    get_production_tcn_config,
+    # MultiRes presets (15m - BiLSTM trên chuỗi đã nén)
+    get_long_term_multires_config,
+    get_production_multires_config,
     # 30k dataset presets (15m - Window size từ ngắn đến dài hạn)
     get_30k_w24_config,
     get_30k_w48_config,
@@ -51,13 +59,15 @@ from .config import (
     get_30k_w336_config,
     get_30k_w480_config,
     get_30k_w672_config,
+    get_30k_sweep_configs,
     # Legacy presets (other timeframes)
     get_default_config,
     get_fast_config,
     get_1h_light_config,
     get_4h_balanced_config,
 )
-from .pipeline import run_pipeline
+from .pipeline import run_pipeline, run_window_sweep
+from .walk_forward import run_walk_forward
 
 __all__ = [
     # Config classes
@@ -68,6 +78,7 @@ __all__ = [
     "ModelConfig",
     "TrainingConfig",
     "RuntimeConfig",
+    "WalkForwardConfig",
     "VisualizationConfig",
     # Scalping presets (15m)
     "get_scalping_ultra_fast_config",
@@ -82,6 +93,10 @@ __all__ = [
     "get_long_term_config",
     # Production preset (15m)
     "get_production_config",
+    "get_long_term_tcn_config",
+    "get_production_tcn_config",
+    "get_long_term_multires_config",
+    "get_production_multires_config",
     # 30k dataset presets (15m - Window size từ ngắn đến dài hạn)
     "get_30k_w24_config",
     "get_30k_w48_config",
@@ -93,6 +108,7 @@ __all__ = [
     "get_30k_w336_config",
     "get_30k_w480_config",
     "get_30k_w672_config",
+    "get_30k_sweep_configs",
     # Legacy presets (other timeframes)
     "get_default_config",
     "get_fast_config",
@@ -100,4 +116,6 @@ __all__ = [
     "get_4h_balanced_config",
     # Pipeline
     "run_pipeline",
+    "run_window_sweep",
+    "run_walk_forward",
 ]
@@ -16,7 +16,7 @@ TẬP TRUNG VÀO 15m TIMEFRAME (280K DÒNG DATA)
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 
 # ==================== PROJECT PATHS ====================
@@ -49,33 +49,59 @@ class DataConfig:
     """Cấu hình cho dữ liệu"""
 
     # File dữ liệu
-    data_path: str = None  # None = tự chọn theo timeframe
+    data_path: str = None  # None = tự chọn theo symbol + timeframe
+    symbol: str = "btc"  # File {symbol}_{timeframe}_data_*.csv trong data/
     timeframe: str = "15m"  # Default là 15m để tận dụng data khủng
 
     # Giới hạn dữ liệu
     limit: int = 50000  # Default là 50k dòng cho 15m
 
-    # Features dùng để dự đoán
+    # Khoảng thời gian [start, end) - None = không giới hạn
+    # Ví dụ: start="2024-01-01", end="2024-07-01" (limit áp dụng sau, lấy N dòng cuối trong khoảng)
+    start: Optional[str] = None
+    end: Optional[str] = None
+
+    # Features dùng để dự đoán: cột OHLCV và/hoặc chỉ báo kỹ thuật (core/features.py)
+    # Ví dụ: ["close", "volume", "rsi_14", "macd_12_26_9", "volatility_20", "atr_14"]
+    # Thêm "@{timeframe}" để lấy feature của timeframe lớn hơn (nến đã đóng gần nhất):
+    # ["close", "close@1h", "volatility_20@4h", "rsi_14@1d"]
     features: List[str] = field(default_factory=lambda: ["close"])
 
+    # Cột cần dự đoán (target) - luôn nằm trong features (thiếu → tự thêm vào đầu)
+    target: str = "close"
+
     # Có refresh cache không
     refresh_cache: bool = False
 
+    # Định dạng cache: "parquet" (mặc định), "ipc" (Arrow, memory-map) hoặc "csv"
+    cache_format: str = "parquet"
+
+    # File nguồn chỉ được ghi thêm → chỉ parse phần đuôi mới rồi nối vào cache
+    incremental_cache: bool = True
+
+    # Giới hạn RAM (MB) khi tạo cache từ CSV lớn (ví dụ 1m hàng triệu dòng)
+    # None = đọc cả file 1 lần (nhanh nhất, peak RAM ~ 2 lần file)
+    memory_limit_mb: Optional[int] = None
+
+    # Budget dung lượng thư mục cache (MB) - vượt thì xoá entry ít dùng gần đây nhất (LRU)
+    # None = không giới hạn
+    cache_max_mb: Optional[int] = None
+
     def get_data_file(self) -> Path:
         """Lấy đường dẫn file CSV theo timeframe"""
         if self.data_path:
             return Path(self.data_path)
 
-        tf = self.timeframe.lower()
-        paths = Paths()
+        from .core.data import _default_data_file  # noqa: E402 - Import here to avoid circular dependency
+
+        # Nếu file không tồn tại, fetch_binance_data sẽ gộp từ file timeframe nhỏ hơn
+        return _default_data_file(Paths().data_dir, self.timeframe, self.symbol)
 
-        if tf == "15m":
-            return paths.data_dir / "btc_15m_data_2018_to_2025.csv"
-        if tf == "1h":
-            return paths.data_dir / "btc_1h_data_2018_to_2025.csv"
-        if tf == "4h":
-            return paths.data_dir / "btc_4h_data_2018_to_2025.csv"
-        return paths.data_dir / "btc_1d_data_2018_to_2025.csv"
+    def get_features(self) -> List[str]:
+        """Features đưa vào model (đảm bảo có cột target)"""
+        if self.target in self.features:
+            return list(self.features)
+        return [self.target] + list(self.features)
 
 
 # ==================== PREPROCESSING CONFIG ====================
@@ -86,10 +112,27 @@ class PreprocessingConfig:
 
     # Sliding Window
     window_size: int = 240  # Default: 4 ngày 15m
-    predict_steps: int = 1  # Số bước dự đoán (thường = 1)
+    # Số bước dự đoán (horizon). > 1 = dự đoán trực tiếp nhiều bước:
+    # 1 lần forward ra predict_steps giá (output layer có predict_steps units)
+    predict_steps: int = 1
+
+    # Giảm số window train mỗi epoch (window cạnh nhau gần như trùng nhau):
+    # - stride: chỉ lấy window bắt đầu tại mỗi stride nến (vẫn là view, không copy)
+    # - subsample: mỗi epoch train 1 phần ngẫu nhiên khác nhau của các window
+    #   (< 1 → tự dùng WindowDataset, không tạo mảng con)
+    stride: int = 1
+    subsample: float = 1.0
 
     # Scaling
-    scaler_type: str = "minmax"  # minmax hoặc standard
+    scaler_type: str = "minmax"  # minmax, standard hoặc robust
+
+    # Kiểu dữ liệu xuyên suốt polars → scaler → windows → Keras
+    # float32 = kiểu Keras dùng (nửa RAM so với float64, không phải đổi kiểu mỗi epoch)
+    dtype: str = "float32"
+
+    # Cache dữ liệu đã chuẩn bị (chuỗi đã scale + scaler) theo hash dữ liệu + config
+    # → chạy lại cùng dữ liệu/config (sweep) bỏ qua bước fit scaler/split
+    cache_prepared: bool = True
 
     # Train/Val/Test split
     train_ratio: float = 0.7
@@ -101,9 +144,13 @@ class PreprocessingConfig:
 # Giống như "thiết kế kiến trúc" - model có cấu trúc nào
 @dataclass
 class ModelConfig:
-    """Cấu hình cho model BiLSTM"""
+    """Cấu hình cho model (BiLSTM / GRU / TCN)"""
+
+    # Kiến trúc: "bilstm" (mặc định), "gru", "tcn" (Conv1D nhân quả giãn - nhanh trên CPU)
+    # hoặc "multires" (BiLSTM trên chuỗi đã nén lịch sử cũ - window rất dài)
+    architecture: str = "bilstm"
 
-    # LSTM layers
+    # LSTM layers (gru: units mỗi GRU layer, tcn: số filters = lstm_units[0])
     lstm_units: List[int] = field(default_factory=lambda: [64, 32])
 
     # Dropout
@@ -112,9 +159,27 @@ class ModelConfig:
     # Dense layers
     dense_units: List[int] = field(default_factory=lambda: [32])
 
-    # Output
+    # Output (pipeline/walk-forward luôn build với preprocessing.predict_steps: mỗi unit là 1 horizon)
     output_units: int = 1
 
+    # TCN: độ rộng kernel (số level tự tính để receptive field ≥ window_size)
+    kernel_size: int = 3
+
+    # MultiRes: giữ recent_steps nến gần nhất, nén phần cũ hơn compress_factor nến → 1 bước
+    # bằng "conv" (Conv1D stride, học được) hoặc "pool" (trung bình)
+    recent_steps: int = 64
+    compress_factor: int = 8
+    compress: str = "conv"
+
+    def get_builder_options(self) -> Dict[str, object]:
+        """Tham số riêng của từng kiến trúc cho build_model (kiến trúc không dùng thì bỏ qua)"""
+        return {
+            "kernel_size": self.kernel_size,
+            "recent_steps": self.recent_steps,
+            "compress_factor": self.compress_factor,
+            "compress": self.compress,
+        }
+
     def get_input_shape(self, window_size: int, n_features: int) -> Tuple[int, int]:
         """Lấy shape đầu vào cho model"""
         return (window_size, n_features)
@@ -136,6 +201,13 @@ class TrainingConfig:
     # Learning rate
     learning_rate: float = 0.001
 
+    # Sinh windows theo từng batch (WindowDataset) thay vì đưa cả mảng X vào model.fit
+    # → RAM tỉ lệ với độ dài chuỗi, không nhân thêm window_size (nên bật cho window lớn)
+    use_window_dataset: bool = False
+    data_workers: int = 1  # Số worker chuẩn bị batch song song
+    data_use_multiprocessing: bool = False  # True = process, False = thread
+    data_max_queue_size: int = 10  # Số batch chuẩn bị sẵn (prefetch)
+
     # Checkpointing
     save_best_model: bool = True
     checkpoint_dir: str = None  # None = auto
@@ -167,6 +239,27 @@ class RuntimeConfig:
     use_gpu: bool = False  # False = chỉ dùng CPU
 
 
+# ==================== WALK-FORWARD CONFIG ====================
+# Giống như "lịch thi thử nhiều đợt" - backtest theo thời gian thế nào
+@dataclass
+class WalkForwardConfig:
+    """Cấu hình cho walk-forward backtest (src/walk_forward.py)"""
+
+    # Fold: [train] gap [val] gap [test], test các fold nối tiếp nhau tới cuối chuỗi
+    n_folds: int = 5
+    test_size: Optional[int] = None  # None = n_rows // (n_folds + 3)
+    val_size: Optional[int] = None  # None = test_size
+    gap: int = 0  # Số nến embargo giữa các phần
+    expanding: bool = True  # False = train trượt, dài train_size nến
+    train_size: Optional[int] = None
+
+    # Song song: mỗi fold train trong 1 process riêng (spawn)
+    workers: Optional[int] = None  # None = min(n_folds, số CPU // 2)
+    # Threads TensorFlow mỗi process (None = runtime.intra_op_threads // workers)
+    # → tổng số thread không vượt quá số core
+    threads_per_worker: Optional[int] = None
+
+
 # ==================== VISUALIZATION CONFIG ====================
 # Giống như "thiết kế slide" - hiển thị thế nào
 @dataclass
@@ -195,6 +288,7 @@ class Config:
     model: ModelConfig = field(default_factory=ModelConfig)
     training: TrainingConfig = field(default_factory=TrainingConfig)
     runtime: RuntimeConfig = field(default_factory=RuntimeConfig)
+    walk_forward: WalkForwardConfig = field(default_factory=WalkForwardConfig)
     visualization: VisualizationConfig = field(default_factory=VisualizationConfig)
 
     @classmethod
@@ -205,20 +299,42 @@ class Config:
         # Data args
         if "data_path" in kwargs:
             config.data.data_path = kwargs["data_path"]
+        if "symbol" in kwargs:
+            config.data.symbol = kwargs["symbol"]
         if "timeframe" in kwargs:
             config.data.timeframe = kwargs["timeframe"]
         if "limit" in kwargs:
             config.data.limit = kwargs["limit"]
+        if "start" in kwargs:
+            config.data.start = kwargs["start"]
+        if "end" in kwargs:
+            config.data.end = kwargs["end"]
         if "refresh_cache" in kwargs:
             config.data.refresh_cache = kwargs["refresh_cache"]
         if "features" in kwargs:
             config.data.features = kwargs["features"]
+        if "target" in kwargs:
+            config.data.target = kwargs["target"]
+        if "cache_format" in kwargs:
+            config.data.cache_format = kwargs["cache_format"]
+        if "memory_limit_mb" in kwargs:
+            config.data.memory_limit_mb = kwargs["memory_limit_mb"]
+        if "cache_max_mb" in kwargs:
+            config.data.cache_max_mb = kwargs["cache_max_mb"]
 
         # Preprocessing args
         if "window" in kwargs:
             config.preprocessing.window_size = kwargs["window"]
+        if "predict_steps" in kwargs:
+            config.preprocessing.predict_steps = kwargs["predict_steps"]
+        if "stride" in kwargs:
+            config.preprocessing.stride = kwargs["stride"]
+        if "subsample" in kwargs:
+            config.preprocessing.subsample = kwargs["subsample"]
 
         # Model args
+        if "architecture" in kwargs:
+            config.model.architecture = kwargs["architecture"]
         if "lstm_units" in kwargs:
             config.model.lstm_units = kwargs["lstm_units"]
         if "dropout" in kwargs:
@@ -229,6 +345,10 @@ class Config:
             config.training.epochs = kwargs["epochs"]
         if "batch_size" in kwargs:
             config.training.batch_size = kwargs["batch_size"]
+        if "window_dataset" in kwargs:
+            config.training.use_window_dataset = kwargs["window_dataset"]
+        if "data_workers" in kwargs:
+            config.training.data_workers = kwargs["data_workers"]
 
         # Runtime args
         if "intra_threads" in kwargs:
@@ -247,24 +367,38 @@ class Config:
             "",
             "DATA:",
             f"  File: {self.data.get_data_file()}",
+            f"  Symbol: {self.data.symbol}",
             f"  Timeframe: {self.data.timeframe}",
             f"  Limit: {self.data.limit} lines",
-            f"  Features: {self.data.features}",
+            f"  Range: [{self.data.start or '-'}, {self.data.end or '-'})",
+            f"  Features: {self.data.get_features()}",
+            f"  Target: {self.data.target}",
             f"  Refresh cache: {self.data.refresh_cache}",
+            f"  Cache format: {self.data.cache_format}",
+            f"  Memory limit: {f'{self.data.memory_limit_mb} MB' if self.data.memory_limit_mb else '-'}",
+            f"  Cache budget: {f'{self.data.cache_max_mb} MB' if self.data.cache_max_mb else '-'}",
             "",
             "PREPROCESSING:",
             f"  Window size: {self.preprocessing.window_size}",
+            f"  Predict steps: {self.preprocessing.predict_steps}",
+            f"  Stride / subsample: {self.preprocessing.stride} / {self.preprocessing.subsample:.0%}",
             f"  Scaler: {self.preprocessing.scaler_type}",
+            f"  Dtype: {self.preprocessing.dtype}",
+            f"  Prepared cache: {self.preprocessing.cache_prepared}",
             f"  Train/Val/Test: {self.preprocessing.train_ratio:.0%}/{self.preprocessing.val_ratio:.0%}/{(1-self.preprocessing.train_ratio-self.preprocessing.val_ratio):.0%}",
             "",
             "MODEL:",
-            f"  LSTM units: {self.model.lstm_units}",
+            f"  Architecture: {self.model.architecture}",
+            f"  Units: {self.model.lstm_units}" + (f" (kernel {self.model.kernel_size})" if self.model.architecture == "tcn" else ""),
+            *([f"  MultiRes: {self.model.recent_steps} nến gần + phần cũ nén /{self.model.compress_factor} ({self.model.compress})"]
+              if self.model.architecture == "multires" else []),
             f"  Dropout: {self.model.dropout_rate}",
             f"  Dense units: {self.model.dense_units}",
             "",
             "TRAINING:",
             f"  Epochs: {self.training.epochs}",
             f"  Batch size: {self.training.batch_size}",
+            f"  Window dataset: {self.training.use_window_dataset} (workers: {self.training.data_workers})",
             f"  Learning rate: {self.training.learning_rate}",
             "",
             "RUNTIME:",
@@ -273,6 +407,10 @@ class Config:
             f"  XLA: {self.runtime.enable_xla}",
             f"  Seed: {self.runtime.seed}",
             "",
+            "WALK-FORWARD (--walk-forward):",
+            f"  Folds: {self.walk_forward.n_folds} ({'mở rộng' if self.walk_forward.expanding else 'trượt'}, gap {self.walk_forward.gap})",
+            f"  Workers × threads: {self.walk_forward.workers or 'auto'} × {self.walk_forward.threads_per_worker or 'auto'}",
+            "",
             "=" * 70,
         ]
         return "\n".join(lines)
@@ -358,6 +496,8 @@ def get_swing_balanced_config() -> Config:
     config.model.lstm_units = [128, 64, 32]
     config.model.dense_units = [64, 32]
     config.runtime.intra_op_threads = 12
+    config.training.use_window_dataset = True
+    config.training.data_workers = 2
     return config
 
 
@@ -372,6 +512,8 @@ def get_long_term_config() -> Config:
     config.model.lstm_units = [256, 128, 64, 32]
     config.model.dense_units = [128, 64]
     config.runtime.intra_op_threads = 12
+    config.training.use_window_dataset = True
+    config.training.data_workers = 2
     return config
 
 
@@ -386,6 +528,50 @@ def get_production_config() -> Config:
     config.model.lstm_units = [256, 128, 64, 32]
     config.model.dense_units = [128, 64, 32]
     config.runtime.intra_op_threads = 12
+    config.training.use_window_dataset = True
+    config.training.data_workers = 2
+    return config
+
+
+# ==================== TCN PRESETS (15m - Window dài, nhanh trên CPU) ====================
+# Cùng dữ liệu/window với long-term/production nhưng backbone Conv1D nhân quả giãn:
+# cả window tính song song thay vì 576-768 bước LSTM tuần tự
+def get_long_term_tcn_config() -> Config:
+    """Long-term TCN - như long-term, backbone TCN (receptive field ≥ 576 nến)"""
+    config = get_long_term_config()
+    config.model.architecture = "tcn"
+    config.model.lstm_units = [64]  # 64 filters mỗi Conv1D
+    config.model.kernel_size = 3
+    return config
+
+
+def get_production_tcn_config() -> Config:
+    """Production TCN - như production, backbone TCN (receptive field ≥ 768 nến)"""
+    config = get_production_config()
+    config.model.architecture = "tcn"
+    config.model.lstm_units = [128]  # 128 filters mỗi Conv1D
+    config.model.kernel_size = 3
+    return config
+
+
+# ==================== MULTIRES PRESETS (15m - Window dài, BiLSTM trên chuỗi đã nén) ====================
+# Cùng dữ liệu/window/units với long-term/production, BiLSTM chỉ chạy trên
+# recent_steps nến gần + lịch sử cũ nén /compress_factor (576 → 128, 768 → 152 bước)
+def get_long_term_multires_config() -> Config:
+    """Long-term MultiRes - như long-term, BiLSTM chạy trên 128 bước thay vì 576"""
+    config = get_long_term_config()
+    config.model.architecture = "multires"
+    config.model.recent_steps = 64
+    config.model.compress_factor = 8
+    return config
+
+
+def get_production_multires_config() -> Config:
+    """Production MultiRes - như production, BiLSTM chạy trên 152 bước thay vì 768"""
+    config = get_production_config()
+    config.model.architecture = "multires"
+    config.model.recent_steps = 64
+    config.model.compress_factor = 8
     return config
 
 
@@ -523,6 +709,26 @@ def get_30k_w672_config() -> Config:
     return config
 
 
+def get_30k_sweep_configs() -> List[Config]:
+    """
+    30k dataset - Cả 10 window (24 → 672) cho run_window_sweep
+
+    Cùng data + preprocessing (chỉ khác window_size) → load + scale 1 lần cho cả sweep
+    """
+    return [
+        get_30k_w24_config(),
+        get_30k_w48_config(),
+        get_30k_w72_config(),
+        get_30k_w96_config(),
+        get_30k_w144_config(),
+        get_30k_w192_config(),
+        get_30k_w240_config(),
+        get_30k_w336_config(),
+        get_30k_w480_config(),
+        get_30k_w672_config(),
+    ]
+
+
 # ==================== LEGACY PRESETS (Cho các timeframe khác) ====================
 def get_default_config() -> Config:
     """Config mặc định - dành cho 15m timeframe (default)"""
@@ -4,8 +4,13 @@ CORE BUSINESS LOGIC
 
 Module này chứa logic chính của project:
 - data.py: Đọc/ghi dữ liệu
-- preprocessing.py: Xử lý dữ liệu (windowing, scaling)
-- model.py: Xây dựng model BiLSTM
+- resample.py: Gộp nến sang timeframe lớn hơn (15m → 1h/4h/1d)
+- catalog.py: Danh mục + load song song nhiều symbol
+- features.py: Chỉ báo kỹ thuật (RSI, MACD, ATR...) dạng polars expression, tính 1 lần quét
+- cache.py: Budget dung lượng cache, xoá entry ít dùng gần đây nhất (LRU)
+- preprocessing.py: Xử lý dữ liệu (windowing, scaling, chia fold walk-forward)
+- dataset.py: Sinh windows theo từng batch cho model.fit (keras PyDataset)
+- model.py: Xây dựng model (BiLSTM / GRU / TCN, registry MODEL_BUILDERS)
 - metrics.py: Tính toán metrics
 
 Giải thích bằng ví dụ đời sống:
@@ -14,16 +19,38 @@ Giải thích bằng ví dụ đời sống:
 - Tất cả hoạt động nhịp nhàng để tạo ra món ăn (model dự đoán)
 """
 
-from .data import fetch_binance_data, clear_cache
+from .data import PREPARED_CACHE_DIR, fetch_binance_data, clear_cache
+from .resample import resample_ohlcv
+from .catalog import discover_datasets, load_datasets, symbol_to_pair
+from .cache import cache_usage, enforce_cache_budget
+from .features import INDICATORS, add_indicators
 from .preprocessing import (
     create_windows,
     split_data,
     DataScaler,
-    prepare_data_for_lstm
+    prepare_data_for_lstm,
+    with_windows,
+    feature_matrix,
+    Fold,
+    walk_forward_splits,
+    fold_windows,
+    iter_walk_forward
+)
+from .dataset import WindowDataset, make_window_datasets
+from .model import (
+    MODEL_BUILDERS,
+    MODEL_NAMES,
+    build_model,
+    build_bilstm_model,
+    build_gru_model,
+    build_tcn_model,
+    build_multires_bilstm_model,
+    multires_length,
+    print_model_summary
 )
-from .model import build_bilstm_model, print_model_summary
 from .metrics import (
     evaluate_model,
+    regression_metrics,
     print_sample_predictions,
     calculate_direction_accuracy
 )
@@ -32,16 +59,41 @@ __all__ = [
     # Data
     "fetch_binance_data",
     "clear_cache",
+    "PREPARED_CACHE_DIR",
+    "resample_ohlcv",
+    "discover_datasets",
+    "load_datasets",
+    "symbol_to_pair",
+    "cache_usage",
+    "enforce_cache_budget",
+    "INDICATORS",
+    "add_indicators",
     # Preprocessing
     "create_windows",
     "split_data",
     "DataScaler",
     "prepare_data_for_lstm",
+    "with_windows",
+    "feature_matrix",
+    "Fold",
+    "walk_forward_splits",
+    "fold_windows",
+    "iter_walk_forward",
+    "WindowDataset",
+    "make_window_datasets",
     # Model
+    "MODEL_BUILDERS",
+    "MODEL_NAMES",
+    "build_model",
     "build_bilstm_model",
+    "build_gru_model",
+    "build_tcn_model",
+    "build_multires_bilstm_model",
+    "multires_length",
     "print_model_summary",
     # Metrics
     "evaluate_model",
+    "regression_metrics",
     "print_sample_predictions",
     "calculate_direction_accuracy",
 ]
@@ -0,0 +1,223 @@
+"""
+CACHE MODULE - QUẢN LÝ DUNG LƯỢNG CACHE (LRU)
+---------------------------------------------------
+
+Giải thích bằng ví dụ đời sống:
+- Giống như "tủ lạnh có giới hạn" - đầy thì bỏ món lâu rồi không đụng tới trước
+- Mỗi lần lấy món ra ăn → ghi lại ngày dùng gần nhất
+
+Khái niệm:
+- Entry: 1 file cache đã chuẩn hoá ({...}.normalized.{ext}) + các file đi kèm
+  (manifest, index thời gian, file tạm) → luôn xoá cùng nhau
+- Entry dữ liệu đã chuẩn bị: 1 thư mục prepared/{key} (chuỗi đã scale, xem preprocessing.py),
+  tên entry là "prepared/{key}"
+- Access manifest (cache_access.json): thời điểm dùng gần nhất + số lần dùng của mỗi entry
+- Budget: tổng dung lượng tối đa của thư mục cache, vượt → xoá entry ít dùng gần đây nhất (LRU)
+
+Trách nhiệm (SoC - Separation of Concerns):
+- Chỉ theo dõi truy cập + xoá bớt entry, không đọc/ghi nội dung cache (việc đó của data.py)
+"""
+
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# File ghi lại lịch sử truy cập các entry trong thư mục cache
+ACCESS_MANIFEST = "cache_access.json"
+
+# Tên entry = phần tên file tới hết ".normalized.{ext}" (file đi kèm thêm đuôi phía sau)
+_ENTRY_PATTERN = re.compile(r"^(?P<entry>.+?\.normalized\.[a-z0-9]+)(?:\..+)?$")
+
+# Manifest của từng entry (cache kiểu cũ theo limit không có file này)
+_ENTRY_MANIFEST_SUFFIX = ".manifest.json"
+
+# Đang ghi dở (file tạm / thư mục khối) → không xoá
+_IN_PROGRESS_SUFFIXES = (".tmp", ".parts")
+
+# Thư mục con chứa dữ liệu đã chuẩn bị (mỗi entry là 1 thư mục {key}, ghi dở: {key}.tmp{pid})
+PREPARED_CACHE_DIR = "prepared"
+_PREPARED_TMP_MARKER = ".tmp"
+
+# Nhiều thread (load_datasets) cùng cập nhật access manifest
+_lock = threading.Lock()
+
+
+def _entry_name(path: Path) -> Optional[str]:
+    """Tên entry của 1 file trong thư mục cache (None nếu không phải file cache)"""
+    match = _ENTRY_PATTERN.match(path.name)
+    return match["entry"] if match else None
+
+
+def _locate_entry(path: Path) -> Optional[Tuple[Path, str]]:
+    """(thư mục cache, tên entry) của 1 file cache hoặc 1 thư mục prepared/{key}"""
+    if path.parent.name == PREPARED_CACHE_DIR:
+        return path.parent.parent, f"{PREPARED_CACHE_DIR}/{path.name.split(_PREPARED_TMP_MARKER)[0]}"
+    name = _entry_name(path)
+    return (path.parent, name) if name is not None else None
+
+
+def _path_size(path: Path) -> int:
+    """Kích thước file hoặc thư mục (bytes)"""
+    try:
+        if path.is_dir():
+            return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def cache_entries(cache_dir: Path) -> Dict[str, List[Path]]:
+    """
+    Gom các file trong thư mục cache theo entry
+
+    Returns:
+        {tên entry: [file chính, manifest, index, ...]}
+    """
+    entries: Dict[str, List[Path]] = {}
+    if not cache_dir.exists():
+        return entries
+    for path in sorted(cache_dir.iterdir()):
+        name = _entry_name(path)
+        if name is not None:
+            entries.setdefault(name, []).append(path)
+    prepared_dir = cache_dir / PREPARED_CACHE_DIR
+    if prepared_dir.is_dir():
+        for path in sorted(prepared_dir.iterdir()):
+            _, name = _locate_entry(path)
+            entries.setdefault(name, []).append(path)
+    return entries
+
+
+def _load_access(cache_dir: Path) -> Dict[str, Dict]:
+    """Đọc access manifest ({} nếu chưa có hoặc hỏng)"""
+    path = cache_dir / ACCESS_MANIFEST
+    if not path.exists():
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_access(cache_dir: Path, access: Dict[str, Dict]) -> None:
+    """Ghi access manifest (file tạm + os.replace để process khác không đọc phải file dở)"""
+    path = cache_dir / ACCESS_MANIFEST
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(access, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def record_access(cache_path: Path) -> None:
+    """Ghi nhận entry vừa được dùng (cập nhật thời điểm + số lần dùng)"""
+    located = _locate_entry(cache_path)
+    if located is None:
+        return
+    cache_dir, name = located
+    with _lock:
+        access = _load_access(cache_dir)
+        record = access.get(name, {})
+        access[name] = {"last_access": time.time(), "hits": record.get("hits", 0) + 1}
+        _save_access(cache_dir, access)
+
+
+def cache_usage(cache_dir: Path) -> List[Dict]:
+    """
+    Dung lượng + lần dùng gần nhất của từng entry, sắp xếp từ ít dùng gần đây nhất (LRU trước)
+
+    - Entry chưa có trong access manifest → dùng mtime của file (thư mục với prepared/{key})
+    - Cache kiểu cũ (không có manifest, ví dụ file theo từng limit) không còn được đọc
+      → xếp đầu danh sách xoá
+    """
+    access = _load_access(cache_dir)
+    usage = []
+    for name, files in cache_entries(cache_dir).items():
+        record = access.get(name)
+        if record is not None:
+            last_access = record["last_access"]
+        elif name.startswith(f"{PREPARED_CACHE_DIR}/") or any(f.name.endswith(_ENTRY_MANIFEST_SUFFIX) for f in files):
+            last_access = max(f.stat().st_mtime for f in files)
+        else:
+            last_access = 0.0
+        usage.append({
+            "entry": name,
+            "files": files,
+            "bytes": sum(_path_size(f) for f in files),
+            "last_access": last_access,
+            "hits": (record or {}).get("hits", 0),
+            "in_progress": any(
+                f.name.endswith(_IN_PROGRESS_SUFFIXES)
+                or (f.parent.name == PREPARED_CACHE_DIR and _PREPARED_TMP_MARKER in f.name)
+                for f in files
+            ),
+        })
+    return sorted(usage, key=lambda item: item["last_access"])
+
+
+def plan_eviction(cache_dir: Path, max_bytes: int, keep: Iterable[str] = ()) -> List[Dict]:
+    """
+    Chọn các entry cần xoá để tổng dung lượng <= max_bytes (không xoá gì cả)
+
+    Args:
+        cache_dir: Thư mục cache
+        max_bytes: Budget (bytes)
+        keep: Tên entry không được xoá (ví dụ entry vừa đọc)
+    """
+    usage = cache_usage(cache_dir)
+    total = sum(item["bytes"] for item in usage)
+    keep = set(keep)
+
+    evict = []
+    for item in usage:
+        if total <= max_bytes:
+            break
+        if item["entry"] in keep or item["in_progress"]:
+            continue
+        evict.append(item)
+        total -= item["bytes"]
+    return evict
+
+
+def _remove_entry(item: Dict) -> None:
+    """Xoá file chính + mọi file đi kèm của 1 entry"""
+    for path in item["files"]:
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+
+
+def prune_access(cache_dir: Path) -> None:
+    """Bỏ khỏi access manifest các entry không còn trên đĩa"""
+    with _lock:
+        access = _load_access(cache_dir)
+        existing = cache_entries(cache_dir)
+        pruned = {name: record for name, record in access.items() if name in existing}
+        if not pruned:
+            (cache_dir / ACCESS_MANIFEST).unlink(missing_ok=True)
+        elif pruned != access:
+            _save_access(cache_dir, pruned)
+
+
+def enforce_cache_budget(cache_dir: Path, max_bytes: int, keep: Iterable[str] = ()) -> List[str]:
+    """
+    Xoá entry ít dùng gần đây nhất cho tới khi thư mục cache nằm trong budget
+
+    Returns:
+        Tên các entry đã xoá
+    """
+    evicted = plan_eviction(cache_dir, max_bytes, keep)
+    for item in evicted:
+        _remove_entry(item)
+    if evicted:
+        prune_access(cache_dir)
+        freed_mb = sum(item["bytes"] for item in evicted) / (1024 * 1024)
+        print(f"Cache vượt {max_bytes / (1024 * 1024):.0f} MB → xoá {len(evicted)} entry ít dùng ({freed_mb:.1f} MB)")
+    return [item["entry"] for item in evicted]
@@ -0,0 +1,157 @@
+"""
+CATALOG MODULE - DANH MỤC DATASET NHIỀU SYMBOL
+---------------------------------------------------
+
+Giải thích bằng ví dụ đời sống:
+- Giống như "mục lục thư viện" - biết kho có những cặp coin nào, timeframe nào
+- Muốn lấy 50 cặp → gọi nhiều "nhân viên kho" lấy cùng lúc thay vì xếp hàng từng người
+
+Quy ước tên file: {symbol}_{timeframe}_data_*.csv
+Ví dụ: btc_15m_data_2018_to_2025.csv, eth_4h_data_2018_to_2025.csv
+
+Trách nhiệm (SoC - Separation of Concerns):
+- Tìm file theo symbol/timeframe
+- Load song song nhiều symbol (mỗi symbol dùng cache riêng của fetch_binance_data)
+"""
+
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import polars as pl
+
+from .data import fetch_binance_data
+from .resample import TIMEFRAME_MINUTES, can_resample
+
+
+# {symbol}_{timeframe}_data_*.csv
+_DATASET_PATTERN = re.compile(r"^(?P<symbol>[a-z0-9]+)_(?P<timeframe>\d+[mhdw])_data_.*\.csv$")
+
+
+def symbol_to_pair(symbol: str, quote: str = "USDT") -> str:
+    """
+    Tên cặp giao dịch từ symbol trong tên file
+
+    Ví dụ: "btc" → "BTC/USDT", "ethusdt" → "ETH/USDT"
+    """
+    base = symbol.upper()
+    if base.endswith(quote) and len(base) > len(quote):
+        base = base[:-len(quote)]
+    return f"{base}/{quote}"
+
+
+def discover_datasets(data_dir: Optional[Path] = None) -> Dict[str, Dict[str, Path]]:
+    """
+    Quét thư mục data, tìm tất cả file {symbol}_{timeframe}_data_*.csv
+
+    Args:
+        data_dir: Thư mục chứa file data (mặc định: project/data/)
+
+    Returns:
+        {symbol: {timeframe: path}}
+        Ví dụ: {"btc": {"1d": Path(...), "4h": Path(...)}}
+    """
+    from ..config import Paths  # noqa: E402 - Import here to avoid circular dependency
+
+    data_dir = Paths().data_dir if data_dir is None else Path(data_dir)
+
+    catalog: Dict[str, Dict[str, Path]] = {}
+    for path in sorted(data_dir.glob("*_data_*.csv")):
+        match = _DATASET_PATTERN.match(path.name.lower())
+        if match is None or match["timeframe"] not in TIMEFRAME_MINUTES:
+            continue
+        catalog.setdefault(match["symbol"], {}).setdefault(match["timeframe"], path)
+
+    return catalog
+
+
+def available_symbols(timeframe: str, data_dir: Optional[Path] = None) -> List[str]:
+    """
+    Các symbol dùng được cho timeframe (có file đúng timeframe hoặc gộp được từ file mịn hơn)
+    """
+    tf = timeframe.lower()
+    return [
+        symbol
+        for symbol, files in discover_datasets(data_dir).items()
+        if tf in files or any(can_resample(src_tf, tf) for src_tf in files)
+    ]
+
+
+def load_datasets(
+    symbols: Optional[List[str]] = None,
+    timeframe: str = "15m",
+    limit: int = 50000,
+    data_dir: Optional[Path] = None,
+    max_workers: Optional[int] = None,
+    **fetch_kwargs
+) -> Dict[str, pl.DataFrame]:
+    """
+    Load + normalize nhiều symbol song song
+
+    Giải thích:
+    - Mỗi symbol là 1 lần gọi fetch_binance_data (cache riêng theo tên file)
+    - Chạy bằng thread pool: polars nhả GIL khi đọc/parse → các thread chạy song song
+      thật sự, tổng thời gian bị giới hạn bởi tốc độ đọc đĩa chứ không phải cộng dồn
+
+    Args:
+        symbols: List symbol (None = tất cả symbol tìm thấy cho timeframe)
+        timeframe: Timeframe
+        limit: Lấy N dòng cuối của mỗi symbol
+        data_dir: Thư mục chứa file data
+        max_workers: Số thread (None = min(32, số symbol))
+        **fetch_kwargs: Tham số thêm cho fetch_binance_data (cache_dir, cache_format, features, start, end...)
+
+    Returns:
+        {symbol: DataFrame} - chỉ gồm các symbol load thành công
+    """
+    if symbols is None:
+        symbols = available_symbols(timeframe, data_dir)
+    symbols = list(dict.fromkeys(s.lower() for s in symbols))
+
+    if not symbols:
+        print(f"Không tìm thấy dataset nào cho timeframe {timeframe}")
+        return {}
+
+    workers = max_workers or min(32, len(symbols))
+    print(f"Đang load {len(symbols)} symbol ({timeframe}) với {workers} threads...")
+
+    t0 = time.perf_counter()
+    datasets: Dict[str, pl.DataFrame] = {}
+    errors: Dict[str, str] = {}
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="load") as pool:
+        futures = {
+            pool.submit(
+                fetch_binance_data,
+                data_dir=data_dir,
+                timeframe=timeframe,
+                limit=limit,
+                symbol=symbol,
+                **fetch_kwargs
+            ): symbol
+            for symbol in symbols
+        }
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                datasets[symbol] = future.result()
+            except (FileNotFoundError, ValueError) as e:
+                errors[symbol] = str(e)
+
+    elapsed = time.perf_counter() - t0
+    print(f"Đã load {len(datasets)}/{len(symbols)} symbol trong {elapsed:.2f}s")
+    for symbol, message in sorted(errors.items()):
+        print(f"   Lỗi {symbol}: {message}")
+
+    # Giữ thứ tự như danh sách symbols
+    return {s: datasets[s] for s in symbols if s in datasets}
+
+
+if __name__ == "__main__":
+    # Test
+    print(discover_datasets())
+    dfs = load_datasets(timeframe="1d", limit=100)
+    for sym, df in dfs.items():
+        print(symbol_to_pair(sym), df.shape)
@@ -10,15 +10,65 @@ Giải thích bằng ví dụ đời sống:
 Trách nhiệm (SoC - Separation of Concerns):
 - Đọc file CSV
 - Chuẩn hoá format
-- Cache để lần sau đọc nhanh
+- Cache để lần sau đọc nhanh (Parquet/Arrow IPC - dạng cột, có kiểu sẵn)
+- Tự phát hiện file nguồn thay đổi (fingerprint trong manifest) → rebuild cache
+- File nguồn chỉ được ghi thêm (append) → chỉ parse phần đuôi mới
+- Index thời gian đã sort → lấy khoảng [start, end) bằng binary search
+- Thiếu file cho timeframe → gộp (resample) từ file timeframe nhỏ hơn
+- File rất lớn (1m nhiều triệu dòng) → đọc theo từng khối, giới hạn RAM
+- Giới hạn dung lượng thư mục cache → xoá entry ít dùng gần đây nhất (cache.py)
 """
 
-from datetime import datetime
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple, Union
 
+import numpy as np
 import polars as pl
 
+from .cache import PREPARED_CACHE_DIR, enforce_cache_budget, prune_access, record_access
+from .features import INDICATOR_INPUTS, add_indicators, parse_feature, warmup_rows
+from .resample import TIMEFRAME_MINUTES, can_resample, resample_ohlcv, timeframe_minutes
+
+try:
+    import resource  # Chỉ có trên Unix (đo peak RSS)
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+
+# Định dạng cache hỗ trợ → đuôi file
+# - parquet: nén tốt, đọc nhanh (mặc định)
+# - ipc: Arrow IPC/Feather không nén → memory-map, gần như không tốn parse
+# - csv: giữ tương thích với cache cũ (chậm, phải parse text mỗi lần)
+CACHE_FORMATS = {
+    "parquet": ".parquet",
+    "ipc": ".arrow",
+    "csv": ".csv",
+}
+
+# Manifest đi kèm mỗi file cache: lưu fingerprint của file nguồn
+MANIFEST_SUFFIX = ".manifest.json"
+
+# Index thời gian (int64 microseconds, đã sort) đi kèm mỗi file cache
+INDEX_SUFFIX = ".index.npy"
+
+# Số byte đầu/cuối file nguồn dùng để hash (đủ để phát hiện thay đổi, đọc rất nhanh)
+FINGERPRINT_BLOCK_BYTES = 64 * 1024
+
+# Đọc theo khối: 1 byte CSV thô tốn khoảng chừng này byte RAM lúc parse + normalize
+# (bytes gốc + bản ghép header + DataFrame 12 cột + DataFrame đã chuẩn hoá)
+CHUNK_MEMORY_FACTOR = 4
+
+# Khối nhỏ nhất (tránh quá nhiều file tạm khi giới hạn RAM rất thấp)
+MIN_CHUNK_BYTES = 1024 * 1024
+
 
 def _infer_timeframe_from_filename(path: Path) -> Optional[str]:
     """
@@ -28,6 +78,10 @@ def _infer_timeframe_from_filename(path: Path) -> Optional[str]:
             btc_1d_data_2018_to_2025.csv → 1d
     """
     name = path.name.lower()
+    # Ưu tiên token đứng riêng giữa dấu "_" (tránh "1h" khớp nhầm trong "btc_11h...")
+    for token in re.split(r"[_.\-]", name):
+        if token in TIMEFRAME_MINUTES:
+            return token
     # Thử theo thứ tự từ dài đến ngắn để tránh ghi đè không chính xác
     if "15m" in name:
         return "15m"
@@ -40,6 +94,265 @@ def _infer_timeframe_from_filename(path: Path) -> Optional[str]:
     return None
 
 
+def _default_data_file(data_dir: Path, timeframe: str, symbol: str = "btc") -> Path:
+    """
+    File CSV mặc định cho symbol + timeframe (ví dụ data/btc_15m_data_2018_to_2025.csv)
+
+    Nếu không có đúng tên mặc định → lấy file {symbol}_{tf}_data_*.csv đầu tiên tìm thấy
+    """
+    tf = (timeframe or "15m").lower()
+    if tf not in TIMEFRAME_MINUTES:
+        tf = "1d"
+    symbol = (symbol or "btc").lower()
+    default = data_dir / f"{symbol}_{tf}_data_2018_to_2025.csv"
+    if default.exists():
+        return default
+    matches = sorted(data_dir.glob(f"{symbol}_{tf}_data_*.csv"))
+    return matches[0] if matches else default
+
+
+def _find_resample_source(data_dir: Path, timeframe: str, symbol: str = "btc") -> Optional[Tuple[Path, str]]:
+    """
+    Tìm file timeframe nhỏ nhất (mịn nhất) có thể gộp ra timeframe cần
+
+    Ví dụ: cần 1h, có btc_15m_... và btc_4h_... → chọn 15m (4h không gộp ra 1h được)
+
+    Returns:
+        (đường dẫn file, timeframe của file) hoặc None
+    """
+    tf = (timeframe or "15m").lower()
+    if tf not in TIMEFRAME_MINUTES:
+        return None
+
+    candidates = []
+    for path in data_dir.glob(f"{(symbol or 'btc').lower()}_*_data_*.csv"):
+        source_tf = _infer_timeframe_from_filename(path)
+        if source_tf and can_resample(source_tf, tf):
+            candidates.append((TIMEFRAME_MINUTES[source_tf], path.name, path, source_tf))
+
+    if not candidates:
+        return None
+    _, _, path, source_tf = min(candidates)
+    return path, source_tf
+
+
+def _cache_path(cache_dir: Path, stem: str, timeframe: str, cache_format: str, kind: str = "all") -> Path:
+    """Tên file cache: {stem}_{timeframe}_{kind}.normalized{.parquet|.arrow|.csv}"""
+    return cache_dir / f"{stem}_{timeframe}_{kind}.normalized{CACHE_FORMATS[cache_format]}"
+
+
+# Schema chuẩn sau khi normalize
+NORMALIZED_COLUMNS = ["datetime", "open", "high", "low", "close", "volume"]
+
+# Cột trong CSV Binance export → cột chuẩn (các cột khác như Close time,
+# Quote asset volume, Number of trades, Taker..., Ignore không bao giờ được đọc)
+BINANCE_COLUMN_MAP = {
+    "Open time": "datetime",
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Volume": "volume",
+}
+
+# Schema cố định của Binance export → polars không cần đoán kiểu (không tốn pass infer).
+# Thời gian đọc dạng String rồi parse bằng 1 format duy nhất đã phát hiện trước.
+BINANCE_SCHEMA = {
+    "Open time": pl.String,
+    "Open": pl.Float64,
+    "High": pl.Float64,
+    "Low": pl.Float64,
+    "Close": pl.Float64,
+    "Volume": pl.Float64,
+    "Close time": pl.String,
+    "Quote asset volume": pl.Float64,
+    "Number of trades": pl.Int64,
+    "Taker buy base asset volume": pl.Float64,
+    "Taker buy quote asset volume": pl.Float64,
+    "Ignore": pl.String,
+}
+
+# Các format thời gian hỗ trợ (thử theo thứ tự, chọn format parse được nhiều mẫu nhất)
+TIME_FORMATS = [
+    "%Y-%m-%d %H:%M:%S%.f UTC",
+    "%Y-%m-%d %H:%M:%S%.f",
+    "%Y-%m-%dT%H:%M:%S%.f",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+]
+
+# Thời gian dạng số (Binance API trả về epoch) → đơn vị theo số chữ số
+EPOCH_UNITS = {10: "s", 13: "ms", 16: "us"}
+
+# Số dòng đầu file dùng để phát hiện format thời gian
+TIME_FORMAT_SAMPLE_ROWS = 1000
+
+# Trạng thái từng dòng khi normalize (để đếm và báo cáo dòng lỗi)
+_ROW_OK, _ROW_MISSING_TIME, _ROW_INVALID_TIME, _ROW_MISSING_CLOSE = 0, 1, 2, 3
+
+
+def _parse_time_expr(expr: pl.Expr, time_format: str) -> pl.Expr:
+    """Expression parse cột thời gian (String) theo đúng 1 format → Datetime[us] không timezone"""
+    if time_format.startswith("epoch_"):
+        unit = time_format.split("_", 1)[1]
+        parsed = pl.from_epoch(expr.cast(pl.Int64, strict=False), time_unit=unit)
+    else:
+        parsed = expr.str.strptime(pl.Datetime("us"), format=time_format, strict=False)
+    return parsed.cast(pl.Datetime("us")).dt.replace_time_zone(None)
+
+
+def _detect_time_format(samples: List[str]) -> str:
+    """
+    Phát hiện format thời gian từ một mẫu nhiều dòng (không chỉ dòng đầu)
+
+    - Đa số là số nguyên → epoch (s/ms/us theo số chữ số)
+    - Còn lại → thử từng format trong TIME_FORMATS, chọn format parse được nhiều mẫu nhất
+
+    Raises:
+        ValueError: Không format nào parse được mẫu
+    """
+    samples = [s for s in samples if s]
+    if not samples:
+        raise ValueError("Không có giá trị thời gian nào để phát hiện format")
+
+    digits = [s for s in samples if s.isdigit()]
+    if len(digits) * 2 > len(samples):
+        n_digits = max(len(s) for s in digits)
+        unit = EPOCH_UNITS.get(n_digits, "ms" if n_digits > 10 else "s")
+        return f"epoch_{unit}"
+
+    series = pl.Series("t", samples, dtype=pl.String)
+    best_format, best_parsed = None, 0
+    for fmt in TIME_FORMATS:
+        parsed = len(series) - series.str.strptime(pl.Datetime("us"), format=fmt, strict=False).null_count()
+        if parsed > best_parsed:
+            best_format, best_parsed = fmt, parsed
+        if parsed == len(series):
+            break
+
+    if best_format is None:
+        raise ValueError(
+            f"Không nhận dạng được format thời gian. Ví dụ: {samples[:3]}. "
+            f"Hỗ trợ: {TIME_FORMATS} hoặc epoch (s/ms/us)"
+        )
+    return best_format
+
+
+def _normalize_lazy(
+    lf_raw: pl.LazyFrame,
+    columns: Optional[List[str]] = None,
+    keep_status: bool = False,
+    time_format: Optional[str] = None
+) -> pl.LazyFrame:
+    """
+    Chuẩn hoá (lazy) CSV kiểu "Binance export" về schema thống nhất
+
+    Chỉ select các cột cần (projection pushdown) → polars bỏ qua các cột còn lại
+    ngay lúc đọc file.
+
+    Args:
+        lf_raw: LazyFrame từ pl.scan_csv hoặc DataFrame.lazy()
+        columns: Cột chuẩn cần giữ (None = tất cả NORMALIZED_COLUMNS)
+        keep_status: True → giữ mọi dòng + cột "_status" (chưa lọc/sort) để đếm dòng lỗi,
+            dùng với _finish_normalized
+        time_format: Format thời gian đã biết (vd từ manifest khi ingest phần mới);
+            None = phát hiện từ mẫu
+    """
+    if columns is None:
+        columns = NORMALIZED_COLUMNS
+    # Luôn cần datetime (sort/filter) và close (lọc dòng hỏng)
+    keep = ["datetime"] + [c for c in NORMALIZED_COLUMNS[1:] if c in columns or c == "close"]
+    raw_to_norm = {raw: norm for raw, norm in BINANCE_COLUMN_MAP.items() if norm in keep}
+
+    # Kiểm tra cột bắt buộc
+    available = lf_raw.collect_schema().names()
+    missing = [c for c in raw_to_norm if c not in available]
+    if missing:
+        raise ValueError(
+            f"CSV thiếu cột bắt buộc: {missing}. "
+            f"Hiện có: {list(available)}"
+        )
+
+    lf = lf_raw.select([pl.col(raw).alias(norm) for raw, norm in raw_to_norm.items()])
+
+    # Strip khoảng trắng, lấy mẫu nhiều dòng để chọn 1 format thời gian duy nhất
+    lf = lf.with_columns(pl.col("datetime").cast(pl.String).str.strip_chars())
+    if time_format is None:
+        samples = (
+            lf.select("datetime").head(TIME_FORMAT_SAMPLE_ROWS).collect()
+            .get_column("datetime").drop_nulls().to_list()
+        )
+        time_format = _detect_time_format(samples)
+
+    raw_time = pl.col("datetime")
+    parsed_time = _parse_time_expr(raw_time, time_format)
+    status = (
+        pl.when(raw_time.is_null() | (raw_time == "")).then(pl.lit(_ROW_MISSING_TIME))
+        .when(parsed_time.is_null()).then(pl.lit(_ROW_INVALID_TIME))
+        .when(pl.col("close").is_null()).then(pl.lit(_ROW_MISSING_CLOSE))
+        .otherwise(pl.lit(_ROW_OK))
+        .cast(pl.Int8)
+        .alias("_status")
+    )
+
+    lf = lf.with_columns(
+        [parsed_time.alias("datetime"), status]
+        + [pl.col(c).cast(pl.Float64) for c in keep[1:]]
+    ).select([c for c in NORMALIZED_COLUMNS if c in columns or c == "datetime"] + ["_status"])
+
+    if keep_status:
+        return lf.with_columns(pl.lit(time_format, dtype=pl.Categorical).alias("_time_format"))
+    return _finish_lazy(lf)
+
+
+def _finish_lazy(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """Bỏ dòng lỗi, sort theo thời gian, bỏ cột trạng thái"""
+    return (
+        lf.filter(pl.col("_status") == _ROW_OK)
+        .sort("datetime")
+        .drop([c for c in ("_status", "_time_format") if c in lf.collect_schema().names()])
+    )
+
+
+def _status_report(df: pl.DataFrame) -> Dict:
+    """Đếm dòng lỗi theo lý do (DataFrame từ _normalize_lazy(keep_status=True))"""
+    counts = df.get_column("_status").value_counts()
+    by_status = dict(zip(counts.get_column("_status").to_list(), counts.get_column("count").to_list()))
+
+    report = {
+        "rows": len(df),
+        "time_format": df.get_column("_time_format")[0] if len(df) > 0 else None,
+        "missing_time": by_status.get(_ROW_MISSING_TIME, 0),
+        "invalid_time": by_status.get(_ROW_INVALID_TIME, 0),
+        "missing_close": by_status.get(_ROW_MISSING_CLOSE, 0),
+    }
+    report["dropped"] = report["missing_time"] + report["invalid_time"] + report["missing_close"]
+    return report
+
+
+def _print_parse_report(report: Dict, source: str = "") -> None:
+    """In format thời gian + cảnh báo nếu có dòng lỗi"""
+    print(f"Format thời gian: {report['time_format']}")
+    if report["dropped"] > 0:
+        print(
+            f"Cảnh báo: bỏ {report['dropped']}/{report['rows']} dòng lỗi{f' trong {source}' if source else ''} "
+            f"(thiếu thời gian: {report['missing_time']}, sai format thời gian: {report['invalid_time']}, "
+            f"thiếu close: {report['missing_close']})"
+        )
+
+
+def _finish_normalized(df: pl.DataFrame, source: str = "") -> Tuple[pl.DataFrame, Dict]:
+    """
+    Đếm + báo cáo dòng lỗi, rồi lọc/sort (DataFrame từ _normalize_lazy(keep_status=True))
+
+    Returns:
+        (DataFrame sạch, report) với report gồm số dòng thiếu/sai thời gian, thiếu close
+    """
+    report = _status_report(df)
+    _print_parse_report(report, source)
+    return _finish_lazy(df.lazy()).collect(), report
+
+
 def _normalize_binance_export_csv(df_raw: pl.DataFrame) -> pl.DataFrame:
     """
     Chuẩn hoá CSV kiểu "Binance export" về schema thống nhất:
@@ -49,60 +362,572 @@ def _normalize_binance_export_csv(df_raw: pl.DataFrame) -> pl.DataFrame:
     """
     if df_raw is None or len(df_raw) == 0:
         return pl.DataFrame(
-            schema=["datetime", "open", "high", "low", "close", "volume"]
+            schema={c: (pl.Datetime("us") if c == "datetime" else pl.Float64) for c in NORMALIZED_COLUMNS}
         )
 
-    # Kiểm tra cột bắt buộc
-    required = ["Open time", "Open", "High", "Low", "Close", "Volume"]
-    columns = df_raw.columns
-    missing = [c for c in required if c not in columns]
-    if missing:
-        raise ValueError(
-            f"CSV thiếu cột bắt buộc: {missing}. "
-            f"Hiện có: {list(columns)}"
+    df, _ = _finish_normalized(_normalize_lazy(df_raw.lazy(), keep_status=True).collect())
+    return df
+
+
+def _resolve_columns(features: Optional[List[str]]) -> List[str]:
+    """
+    Cột cần trả về cho list features (luôn kèm datetime)
+
+    Cột OHLCV theo thứ tự chuẩn, sau đó là các chỉ báo (features.py) theo thứ tự đã cho
+    """
+    if features is None:
+        return NORMALIZED_COLUMNS
+    indicators = [f for f in dict.fromkeys(features) if f not in NORMALIZED_COLUMNS]
+    for name in indicators:
+        parse_feature(name)  # ValueError nếu không phải chỉ báo đã đăng ký
+    return ["datetime"] + [c for c in NORMALIZED_COLUMNS[1:] if c in features] + indicators
+
+
+# Feature từ timeframe lớn hơn: "{feature}@{timeframe}", ví dụ "close@1h", "volatility_20@4h"
+CONTEXT_SEPARATOR = "@"
+
+
+def _split_context_features(
+    features: Optional[List[str]], base_timeframe: str
+) -> Tuple[Optional[List[str]], Dict[str, List[str]]]:
+    """
+    Tách features thành (features của timeframe gốc, {timeframe lớn: [feature]})
+
+    Raises:
+        ValueError: timeframe không lớn hơn timeframe gốc
+    """
+    if features is None or not any(CONTEXT_SEPARATOR in f for f in features):
+        return features, {}
+
+    base_minutes = timeframe_minutes(base_timeframe)
+    base, context = [], {}
+    for name in features:
+        if CONTEXT_SEPARATOR not in name:
+            base.append(name)
+            continue
+        feature, tf = name.rsplit(CONTEXT_SEPARATOR, 1)
+        tf = tf.lower()
+        if timeframe_minutes(tf) <= base_minutes:
+            raise ValueError(
+                f"Feature {name}: timeframe {tf} phải lớn hơn timeframe gốc {base_timeframe}"
+            )
+        context.setdefault(tf, []).append(feature)
+    return base, context
+
+
+def _join_context(
+    df: pl.DataFrame,
+    base_timeframe: str,
+    context: Dict[str, List[str]],
+    **fetch_kwargs
+) -> pl.DataFrame:
+    """
+    Gắn feature của các timeframe lớn hơn vào từng nến gốc bằng join_asof (backward)
+
+    Không nhìn trước tương lai: 1 nến chỉ "biết" được khi đã đóng
+    → so khớp theo thời điểm ĐÓNG nến (datetime + độ dài nến), không phải thời điểm mở.
+    Ví dụ nến 15m 10:15 (đóng 10:30) chỉ thấy nến 1h 09:00 (đóng 10:00), chưa thấy nến 1h 10:00.
+
+    Mọi timeframe được nối trong 1 LazyFrame, collect 1 lần.
+
+    Args:
+        df: DataFrame timeframe gốc (có datetime, đã sort)
+        base_timeframe: Timeframe gốc
+        context: {timeframe lớn: [feature]} (từ _split_context_features)
+        **fetch_kwargs: Tham số fetch_binance_data để load/gộp timeframe lớn (cache_dir, symbol...).
+            Có data_path → nến lớn được gộp từ chính file đó (source_timeframe=base_timeframe),
+            không lấy file {symbol}_* trong data_dir
+
+    Returns:
+        df + cột "{feature}@{timeframe}"; bỏ các dòng đầu chưa có nến lớn nào đóng
+    """
+    base_close = pl.col("datetime") + pl.duration(minutes=timeframe_minutes(base_timeframe))
+    lf = df.lazy().with_columns(base_close.alias("_available_at"))
+    first = df.get_column("datetime")[0]
+    if fetch_kwargs.get("data_path") is not None:
+        fetch_kwargs["source_timeframe"] = base_timeframe
+
+    added = []
+    for tf, features in context.items():
+        minutes = timeframe_minutes(tf)
+        # Lấy từ trước nến gốc đầu tiên 2 nến lớn → nến đầu đã có giá trị
+        coarse = fetch_binance_data(
+            timeframe=tf,
+            limit=0,
+            features=features,
+            start=first - timedelta(minutes=2 * minutes),
+            **fetch_kwargs
+        )
+        names = {f: f"{f}{CONTEXT_SEPARATOR}{tf}" for f in features}
+        right = coarse.lazy().select(
+            (pl.col("datetime") + pl.duration(minutes=minutes)).alias(f"_closed_{tf}"),
+            *[pl.col(f).alias(alias) for f, alias in names.items()]
         )
+        lf = lf.join_asof(right, left_on="_available_at", right_on=f"_closed_{tf}", strategy="backward")
+        lf = lf.drop(f"_closed_{tf}")
+        added.extend(names.values())
 
-    # Strip khoảng trắng và parse datetime
-    df_raw = df_raw.with_columns([
-        pl.col("Open time").str.strip_chars()
-    ])
+    out = lf.drop("_available_at").collect()
+    skipped = warmup_rows(out, added)
+    if skipped:
+        out = out.slice(skipped)
+        print(f"Bỏ {skipped} dòng đầu chưa có nến {'/'.join(context)} nào đóng")
+    print(f"Đã gắn {len(added)} feature từ timeframe lớn hơn: {added}")
+    return out
 
-    first_sample = df_raw.select(pl.col("Open time")).row(0)[0]
-    has_utc = " UTC" in first_sample
 
-    if has_utc:
-        df_parsed = df_raw.with_columns([
-            pl.col("Open time").str.strptime(pl.Datetime, format="%Y-%m-%d %H:%M:%S%.f UTC", strict=False)
-        ])
-    else:
-        df_parsed = df_raw.with_columns([
-            pl.col("Open time").str.strptime(pl.Datetime, format="%Y-%m-%d %H:%M:%S%.f", strict=False)
-        ])
-
-    # Chuẩn hoá cột
-    out = (
-        df_parsed
-        .rename({
-            "Open time": "datetime",
-            "Open": "open",
-            "High": "high",
-            "Low": "low",
-            "Close": "close",
-            "Volume": "volume"
-        })
-        .with_columns([
-            pl.col("datetime").dt.replace_time_zone(None),
-            pl.col("open").cast(pl.Float64),
-            pl.col("high").cast(pl.Float64),
-            pl.col("low").cast(pl.Float64),
-            pl.col("close").cast(pl.Float64),
-            pl.col("volume").cast(pl.Float64)
-        ])
-        .filter(pl.col("datetime").is_not_null() & pl.col("close").is_not_null())
-        .sort("datetime")
+def _indicator_columns(columns: List[str]) -> List[str]:
+    """Các cột chỉ báo (không phải cột OHLCV gốc)"""
+    return [c for c in columns if c not in NORMALIZED_COLUMNS]
+
+
+def _slice_lazy(
+    lf: pl.LazyFrame,
+    columns: List[str],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: Optional[int] = None
+) -> pl.LazyFrame:
+    """
+    Projection + lọc khoảng thời gian [start, end) + lấy N dòng cuối (lazy)
+
+    Tất cả được đẩy xuống scan → polars chỉ đọc đúng cột/đoạn cần
+    """
+    lf = lf.select(columns)
+    if start is not None:
+        lf = lf.filter(pl.col("datetime") >= start)
+    if end is not None:
+        lf = lf.filter(pl.col("datetime") < end)
+    if isinstance(limit, int) and limit > 0:
+        lf = lf.tail(limit)
+    return lf
+
+
+def _source_fingerprint(path: Path, block_bytes: int = FINGERPRINT_BLOCK_BYTES) -> Dict:
+    """
+    Fingerprint rẻ của file nguồn: size, mtime, hash block đầu và block cuối
+
+    Giải thích: Giống như "kiểm tra tem niêm phong" - không cần mở cả thùng hàng,
+    chỉ xem kích thước + hai đầu thùng là biết có ai thay đổi không
+    """
+    stat = path.stat()
+    size = stat.st_size
+    with open(path, "rb") as f:
+        head = f.read(block_bytes)
+        f.seek(max(0, size - block_bytes))
+        tail = f.read(block_bytes)
+
+    return {
+        "size": size,
+        "mtime_ns": stat.st_mtime_ns,
+        "head_hash": hashlib.blake2b(head, digest_size=16).hexdigest(),
+        "tail_hash": hashlib.blake2b(tail, digest_size=16).hexdigest(),
+    }
+
+
+def _hash_range(path: Path, start: int, end: int) -> str:
+    """Hash đoạn byte [start, end) của file"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(max(0, end - start))
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _complete_lines_offset(path: Path, size: int, block_bytes: int = FINGERPRINT_BLOCK_BYTES) -> int:
+    """
+    Offset ngay sau ký tự xuống dòng cuối cùng
+
+    Dòng cuối chưa có "\n" có thể đang được ghi dở → để lần append sau xử lý
+    """
+    with open(path, "rb") as f:
+        end = size
+        while end > 0:
+            start = max(0, end - block_bytes)
+            f.seek(start)
+            pos = f.read(end - start).rfind(b"\n")
+            if pos >= 0:
+                return start + pos + 1
+            end = start
+    return 0
+
+
+def _ingest_state(path: Path, fingerprint: Dict, block_bytes: int = FINGERPRINT_BLOCK_BYTES) -> Dict:
+    """
+    Trạng thái "đã đọc tới đâu" của file nguồn, lưu trong manifest
+
+    - bytes: số byte đã normalize vào cache (luôn kết thúc ở cuối dòng)
+    - head_hash: hash block đầu (header + dữ liệu đầu tiên)
+    - anchor_hash: hash block ngay trước mốc `bytes`
+    """
+    ingested = _complete_lines_offset(path, fingerprint["size"], block_bytes)
+    return {
+        "bytes": ingested,
+        "head_hash": _hash_range(path, 0, min(block_bytes, ingested)),
+        "anchor_hash": _hash_range(path, max(0, ingested - block_bytes), ingested),
+    }
+
+
+def _append_only_offset(path: Path, manifest: Optional[Dict], fingerprint: Dict,
+                        block_bytes: int = FINGERPRINT_BLOCK_BYTES) -> Optional[int]:
+    """
+    Kiểm tra file nguồn có phải chỉ được ghi thêm vào cuối không
+
+    Returns:
+        Offset bắt đầu phần mới (None nếu không phải append-only → phải rebuild)
+    """
+    ingest = (manifest or {}).get("ingest")
+    if not ingest:
+        return None
+
+    ingested = ingest["bytes"]
+    if ingested <= 0 or fingerprint["size"] <= ingested:
+        return None
+
+    # Phần đầu và đoạn ngay trước mốc cũ phải giữ nguyên
+    if _hash_range(path, 0, min(block_bytes, ingested)) != ingest["head_hash"]:
+        return None
+    if _hash_range(path, max(0, ingested - block_bytes), ingested) != ingest["anchor_hash"]:
+        return None
+
+    return ingested
+
+
+def _parse_csv_block(header: bytes, body: bytes) -> pl.DataFrame:
+    """Parse 1 đoạn CSV (ghép lại header để polars biết tên cột) với schema cố định"""
+    return pl.read_csv(io.BytesIO(header + body), schema_overrides=BINANCE_SCHEMA, infer_schema_length=0)
+
+
+def _read_csv_tail(path: Path, start: int, end: int) -> pl.DataFrame:
+    """Đọc đoạn byte [start, end) của CSV"""
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(start)
+        body = f.read(end - start)
+    return _parse_csv_block(header, body)
+
+
+def _iter_csv_blocks(path: Path, block_bytes: int):
+    """
+    Đọc CSV theo từng khối ~block_bytes, mỗi khối kết thúc đúng ở cuối dòng
+
+    Yields:
+        (header, body) - body là các dòng đầy đủ (không bao gồm header)
+    """
+    with open(path, "rb") as f:
+        header = f.readline()
+        carry = b""
+        while True:
+            block = f.read(block_bytes)
+            if not block:
+                break
+            block = carry + block
+            cut = block.rfind(b"\n") + 1
+            if cut == 0:
+                # Chưa gặp hết dòng nào → đọc tiếp
+                carry = block
+                continue
+            carry = block[cut:]
+            yield header, block[:cut]
+        if carry.strip():
+            # Dòng cuối không có "\n"
+            yield header, carry
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak RSS của cả process từ lúc khởi động (MB), None nếu hệ điều hành không hỗ trợ"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux trả về KB, macOS trả về bytes
+    return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+
+def _proc_status_mb(field: str) -> Optional[float]:
+    """Đọc 1 dòng bộ nhớ (VmRSS, VmHWM) của /proc/self/status (MB), None nếu không có (không phải Linux)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def _start_rss_window() -> Tuple[Optional[float], bool]:
+    """
+    Bắt đầu đo RSS cho 1 đoạn code
+
+    ru_maxrss là peak của cả process (sau khi import TensorFlow đã ~700 MB) → không đo
+    được riêng việc tạo cache. Linux: ghi "5" vào /proc/self/clear_refs → reset peak (VmHWM)
+    về RSS hiện tại, peak đọc sau đó là peak của riêng đoạn code này.
+
+    Returns:
+        (RSS hiện tại MB, đã reset được peak chưa)
+    """
+    rss = _proc_status_mb("VmRSS")
+    if rss is None:
+        return None, False
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return rss, False
+    return rss, True
+
+
+def _rss_window_stats(rss_before: Optional[float], peak_reset: bool) -> Dict:
+    """
+    Bộ nhớ dùng trong đoạn code từ _start_rss_window
+
+    Returns:
+        rss_before_mb, peak_rss_mb, rss_growth_mb (peak - trước, None nếu không đo riêng được),
+        peak_scope: "build" (peak của riêng đoạn code) hoặc "process" (peak cả process)
+    """
+    if peak_reset:
+        peak = _proc_status_mb("VmHWM")
+        if peak is not None:
+            return {
+                "rss_before_mb": round(rss_before, 1),
+                "peak_rss_mb": round(peak, 1),
+                "rss_growth_mb": round(max(0.0, peak - rss_before), 1),
+                "peak_scope": "build",
+            }
+    peak = _peak_rss_mb()
+    return {
+        "rss_before_mb": None if rss_before is None else round(rss_before, 1),
+        "peak_rss_mb": None if peak is None else round(peak, 1),
+        "rss_growth_mb": None,
+        "peak_scope": "process",
+    }
+
+
+def _manifest_path(cache_path: Path) -> Path:
+    """Đường dẫn manifest đi kèm file cache"""
+    return cache_path.with_name(cache_path.name + MANIFEST_SUFFIX)
+
+
+def _load_manifest(cache_path: Path) -> Optional[Dict]:
+    """Đọc manifest của cache (None nếu chưa có hoặc hỏng)"""
+    path = _manifest_path(cache_path)
+    if not path.exists():
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_manifest(cache_path: Path, manifest: Dict) -> None:
+    """Ghi manifest cạnh file cache"""
+    with open(_manifest_path(cache_path), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def _is_cache_fresh(cache_path: Path, manifest: Optional[Dict], fingerprint: Dict) -> bool:
+    """
+    Cache còn dùng được không?
+
+    - Không có manifest (cache kiểu cũ) → coi như cũ, rebuild
+    - Size + mtime + hash đầu/cuối khớp → nội dung không đổi
+    - mtime khác → coi như đã sửa (hash đầu/cuối không thấy được sửa ở giữa file cùng size)
+      → kiểm tra append-only hoặc rebuild
+    """
+    if not cache_path.exists() or manifest is None:
+        return False
+
+    cached = manifest.get("source", {})
+    return all(
+        cached.get(key) == fingerprint[key]
+        for key in ("size", "mtime_ns", "head_hash", "tail_hash")
     )
 
-    return out.select(["datetime", "open", "high", "low", "close", "volume"])
+
+def _write_cache(df: pl.DataFrame, cache_path: Path, cache_format: str) -> None:
+    """
+    Ghi DataFrame đã chuẩn hoá ra cache theo định dạng chọn
+
+    Ghi ra file tạm rồi os.replace → không bao giờ ghi đè lên file đang được
+    memory-map (df có thể đang trỏ vào chính file cache cũ)
+    """
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    if cache_format == "parquet":
+        df.write_parquet(tmp_path, statistics=True)
+    elif cache_format == "ipc":
+        # Không nén để có thể memory-map khi đọc
+        df.write_ipc(tmp_path, compression="uncompressed")
+    else:
+        df.write_csv(tmp_path)
+    os.replace(tmp_path, cache_path)
+
+
+def _sink_cache(lf: pl.LazyFrame, cache_path: Path, cache_format: str) -> None:
+    """
+    Ghi LazyFrame ra cache bằng streaming engine (không cần giữ cả bảng trong RAM)
+
+    Cũng ghi ra file tạm rồi os.replace như _write_cache
+    """
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    if cache_format == "parquet":
+        lf.sink_parquet(tmp_path, statistics=True, engine="streaming")
+    elif cache_format == "ipc":
+        lf.sink_ipc(tmp_path, compression="uncompressed", engine="streaming")
+    else:
+        lf.sink_csv(tmp_path, engine="streaming")
+    os.replace(tmp_path, cache_path)
+
+
+def _feature_cache_path(cache_path: Path, indicators: List[str]) -> Path:
+    """
+    File cache chỉ báo đi kèm file cache dữ liệu: {cache}.features-{hash tên chỉ báo}{ext}
+
+    Tên bắt đầu bằng tên file cache → cache.py coi là file đi kèm của entry
+    (xoá/đo dung lượng cùng nhau)
+    """
+    key = hashlib.blake2b("\n".join(sorted(indicators)).encode(), digest_size=8).hexdigest()
+    return cache_path.with_name(f"{cache_path.name}.features-{key}{cache_path.suffix}")
+
+
+def _ensure_feature_cache(cache_path: Path, cache_format: str, rows: int, indicators: List[str]) -> Path:
+    """
+    Đảm bảo file cache chỉ báo khớp với cache dữ liệu hiện tại (tính lại nếu dữ liệu đổi)
+
+    Tất cả chỉ báo là 1 đồ thị polars lazy duy nhất: đọc high/low/close/volume 1 lần,
+    tính mọi cột trong 1 lần with_columns rồi ghi streaming ra file
+
+    Returns:
+        Đường dẫn file cache chỉ báo (đúng `rows` dòng, cùng thứ tự với cache dữ liệu)
+    """
+    feature_path = _feature_cache_path(cache_path, indicators)
+    # Fingerprint nguồn của cache dữ liệu (cả mtime: cache dữ liệu rebuild → chỉ báo tính lại)
+    source = (_load_manifest(cache_path) or {}).get("source") or {}
+    meta = _load_manifest(feature_path)
+    if (
+        feature_path.exists()
+        and meta is not None
+        and meta.get("rows") == rows
+        and meta.get("source") == source
+        and set(meta.get("indicators", [])) >= set(indicators)
+    ):
+        return feature_path
+
+    t0 = time.perf_counter()
+    lf = add_indicators(_scan_cache(cache_path, cache_format).select(INDICATOR_INPUTS), indicators)
+    _sink_cache(lf.select(indicators), feature_path, cache_format)
+    seconds = time.perf_counter() - t0
+
+    _save_manifest(feature_path, {
+        "indicators": indicators,
+        "rows": rows,
+        "source": source,
+        "seconds": round(seconds, 3),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    })
+    print(f"Đã tính {len(indicators)} chỉ báo trong 1 lần quét ({seconds:.2f}s): {feature_path.name}")
+    return feature_path
+
+
+def _scan_cache(cache_path: Path, cache_format: str) -> pl.LazyFrame:
+    """Scan (lazy) cache: Parquet/IPC giữ nguyên kiểu datetime/float, không cần parse text"""
+    if cache_format == "parquet":
+        return pl.scan_parquet(cache_path)
+    if cache_format == "ipc":
+        return pl.scan_ipc(cache_path, memory_map=True)
+    return pl.scan_csv(cache_path, try_parse_dates=True)
+
+
+def _scan_raw_csv(data_file: Path) -> pl.LazyFrame:
+    """Scan CSV nguồn với schema cố định (không đoán kiểu; cột lạ đọc dạng String)"""
+    return pl.scan_csv(data_file, schema_overrides=BINANCE_SCHEMA, infer_schema_length=0)
+
+
+def _scan_source_csv(data_file: Path, columns: Optional[List[str]] = None) -> pl.LazyFrame:
+    """Scan (lazy) CSV nguồn, chỉ đọc các cột cần rồi normalize"""
+    return _normalize_lazy(_scan_raw_csv(data_file), columns)
+
+
+def _read_source_csv(data_file: Path) -> Tuple[pl.DataFrame, Dict]:
+    """Đọc + normalize toàn bộ CSV nguồn, kèm báo cáo dòng lỗi"""
+    df = _normalize_lazy(_scan_raw_csv(data_file), keep_status=True).collect()
+    return _finish_normalized(df, source=data_file.name)
+
+
+def _index_path(cache_path: Path) -> Path:
+    """Đường dẫn index thời gian đi kèm file cache"""
+    return cache_path.with_name(cache_path.name + INDEX_SUFFIX)
+
+
+def _write_index(df: pl.DataFrame, cache_path: Path) -> None:
+    """Lưu cột datetime (đã sort) dạng int64 microseconds → .npy memory-map được"""
+    _save_index(df.get_column("datetime").dt.epoch("us").to_numpy(), cache_path)
+
+
+def _save_index(index: np.ndarray, cache_path: Path) -> None:
+    """Ghi mảng index (int64 microseconds) ra file tạm rồi os.replace"""
+    tmp_path = cache_path.with_name(cache_path.name + INDEX_SUFFIX + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, index.astype(np.int64, copy=False))
+    os.replace(tmp_path, _index_path(cache_path))
+
+
+def _load_index(cache_path: Path, cache_format: str, rows: int) -> np.ndarray:
+    """
+    Đọc index thời gian (memory-map, không load cả file)
+
+    Thiếu hoặc lệch số dòng với cache → tạo lại từ cột datetime của cache
+    """
+    path = _index_path(cache_path)
+    if path.exists():
+        index = np.load(path, mmap_mode="r")
+        if len(index) == rows:
+            return index
+    df = _scan_cache(cache_path, cache_format).select("datetime").collect()
+    _write_index(df, cache_path)
+    return np.load(path, mmap_mode="r")
+
+
+def _epoch_us(value: datetime) -> int:
+    """datetime (naive, coi như UTC) → microseconds từ epoch"""
+    return (value - datetime(1970, 1, 1)) // timedelta(microseconds=1)
+
+
+def _index_range(
+    index: np.ndarray,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: Optional[int] = None
+) -> Tuple[int, int]:
+    """
+    Tìm đoạn dòng [offset, offset + length) ứng với [start, end) và limit
+
+    Binary search trên index đã sort → O(log n), không phụ thuộc số năm dữ liệu
+
+    Returns:
+        (offset, length)
+    """
+    lo = int(np.searchsorted(index, _epoch_us(start), side="left")) if start is not None else 0
+    hi = int(np.searchsorted(index, _epoch_us(end), side="left")) if end is not None else len(index)
+    hi = max(lo, hi)
+    if isinstance(limit, int) and limit > 0:
+        lo = max(lo, hi - limit)
+    return lo, hi - lo
+
+
+def _to_datetime(value: Optional[Union[str, datetime]]) -> Optional[datetime]:
+    """
+    Chuyển "2024-01-01" / "2024-01-01 12:00" / datetime → datetime naive theo UTC (None giữ nguyên)
+
+    Có múi giờ ("2024-01-01T07:00:00+07:00") → đổi sang UTC rồi bỏ tzinfo
+    (cột datetime của cache là naive UTC)
+    """
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
 
 
 def fetch_binance_data(
@@ -111,25 +936,82 @@ def fetch_binance_data(
     timeframe: str = "15m",
     limit: int = 50000,
     save_cache: bool = True,
-    cache_dir: Optional[Path] = None
+    cache_dir: Optional[Path] = None,
+    cache_format: str = "parquet",
+    incremental: bool = True,
+    features: Optional[List[str]] = None,
+    start: Optional[Union[str, datetime]] = None,
+    end: Optional[Union[str, datetime]] = None,
+    symbol: str = "btc",
+    memory_limit_mb: Optional[int] = None,
+    cache_max_mb: Optional[int] = None,
+    source_timeframe: Optional[str] = None
 ) -> pl.DataFrame:
     """
     Đọc dữ liệu giá từ file CSV local
 
+    Cache lưu TOÀN BỘ lịch sử đã chuẩn hoá (1 file cho mọi limit); mỗi lần đọc
+    chỉ scan đúng cột (features) và đúng đoạn (start/end/limit) cần dùng.
+
     Args:
         data_path: Đường dẫn CSV. Nếu None → chọn theo timeframe
         data_dir: Thư mục chứa file data (mặc định: project/data/)
-        timeframe: Timeframe để chọn file (1d/4h)
+        timeframe: Timeframe để chọn file (15m/1h/4h/1d). Không có file riêng
+            → tự gộp từ file timeframe nhỏ hơn (ví dụ 15m → 1h)
         limit: Lấy N dòng cuối (<=0 → lấy tất cả)
         save_cache: Lưu cache để lần sau đọc nhanh hơn
         cache_dir: Thư mục cache
+        cache_format: Định dạng cache ("parquet", "ipc" hoặc "csv")
+        incremental: Nếu file nguồn chỉ được ghi thêm → chỉ parse phần mới
+            rồi nối vào cache (thay vì đọc lại toàn bộ)
+        features: Chỉ đọc các cột này (+ datetime). None = tất cả OHLCV.
+            Có thể gồm chỉ báo kỹ thuật (features.py, ví dụ "rsi_14", "macd_12_26_9"):
+            tính trên toàn bộ lịch sử trong 1 lần quét, cache cạnh file cache dữ liệu.
+            Các dòng đầu chưa đủ lịch sử để tính chỉ báo bị bỏ.
+            "{feature}@{timeframe}" (ví dụ "close@1h", "volatility_20@1d") = feature của
+            timeframe lớn hơn, gắn vào từng nến bằng join_asof theo thời điểm đóng nến
+            (không nhìn trước tương lai)
+        start: Chỉ lấy nến có datetime >= start
+        end: Chỉ lấy nến có datetime < end
+        symbol: Symbol để chọn file khi data_path=None ({symbol}_{timeframe}_data_*.csv)
+        memory_limit_mb: Giới hạn RAM (MB) khi tạo cache. File nguồn lớn hơn 1 khối
+            → đọc + chuẩn hoá theo từng khối thay vì cả file. None = đọc cả file 1 lần
+        cache_max_mb: Budget dung lượng thư mục cache (MB). Vượt → xoá entry ít dùng
+            gần đây nhất (LRU). None = không giới hạn
+        source_timeframe: Timeframe của file data_path khi cần gộp nó lên timeframe lớn hơn
+            (ví dụ data_path 15m, timeframe 1h - feature "close@1h" của file tuỳ chọn).
+            None = dùng data_path đúng timeframe của nó
+
+    Raises:
+        FileNotFoundError: Không có file dữ liệu (hoặc file để gộp ra timeframe cần)
+        ValueError: source_timeframe không gộp được ra timeframe
 
     Returns:
-        DataFrame với các cột: datetime, open, high, low, close, volume
+        DataFrame với các cột: datetime + features (mặc định datetime, open, high, low, close, volume)
     """
     # Xác định thư mục data và cache
     from ..config import Paths  # noqa: E402 - Import here to avoid circular dependency
 
+    if cache_format not in CACHE_FORMATS:
+        raise ValueError(
+            f"Cache format không hợp lệ: {cache_format}. "
+            f"Chọn một trong: {list(CACHE_FORMATS)}"
+        )
+
+    base_timeframe = (timeframe or "15m").lower()
+    if data_path is not None and source_timeframe is None:
+        base_timeframe = _infer_timeframe_from_filename(Path(data_path)) or base_timeframe
+    features, context = _split_context_features(features, base_timeframe)
+
+    columns = _resolve_columns(features)
+    indicators = _indicator_columns(columns)
+    # Cột OHLCV cần đọc từ nguồn (chỉ báo cần thêm high/low/close/volume)
+    raw_columns = [
+        c for c in NORMALIZED_COLUMNS
+        if c in columns or (indicators and c in INDICATOR_INPUTS)
+    ]
+    start, end = _to_datetime(start), _to_datetime(end)
+
     if data_dir is None:
         data_dir = Paths().data_dir
     else:
@@ -143,57 +1025,97 @@ def fetch_binance_data(
     cache_dir.mkdir(parents=True, exist_ok=True)
 
     # Xác định file dữ liệu
+    resample_source = None
     if data_path is None:
-        tf = (timeframe or "15m").lower()
-        # Chọn file tương ứng với timeframe
-        if tf == "15m":
-            data_file = data_dir / "btc_15m_data_2018_to_2025.csv"
-        elif tf == "1h":
-            data_file = data_dir / "btc_1h_data_2018_to_2025.csv"
-        elif tf == "4h":
-            data_file = data_dir / "btc_4h_data_2018_to_2025.csv"
-        else:
-            data_file = data_dir / "btc_1d_data_2018_to_2025.csv"
+        data_file = _default_data_file(data_dir, timeframe, symbol)
+        if not data_file.exists():
+            # Không có file riêng cho timeframe này → gộp từ file mịn hơn
+            resample_source = _find_resample_source(data_dir, timeframe, symbol)
     else:
         data_file = Path(data_path)
+        if source_timeframe is not None and source_timeframe.lower() != base_timeframe:
+            # Cùng file nguồn, timeframe lớn hơn → gộp nến (không đọc file {symbol}_* khác)
+            source_timeframe = source_timeframe.lower()
+            if not can_resample(source_timeframe, base_timeframe):
+                raise ValueError(
+                    f"Không gộp được nến {source_timeframe} → {timeframe} từ file: {data_file}"
+                )
+            resample_source = (data_file, source_timeframe)
 
-    if not data_file.exists():
+    if resample_source is None and not data_file.exists():
         raise FileNotFoundError(f"Không tìm thấy file data: {data_file}")
+    if resample_source is not None and not resample_source[0].exists():
+        raise FileNotFoundError(f"Không tìm thấy file data: {resample_source[0]}")
 
-    inferred_tf = _infer_timeframe_from_filename(data_file) or (timeframe or "15m")
+    if resample_source is not None:
+        source_file, source_tf = resample_source
+        target_tf = timeframe.lower()
+        if data_path is None:
+            print(f"Không có {data_file.name} → gộp nến {source_tf} → {target_tf} từ {source_file}")
+        else:
+            print(f"Gộp nến {source_tf} → {target_tf} từ {source_file}")
+        # Cache riêng cho từng timeframe đã gộp (tính 1 lần, dùng lại)
+        cache_path = _cache_path(cache_dir, source_file.stem, target_tf, cache_format, kind="resampled")
 
-    # Tên file cache
-    stem = data_file.stem
-    lim = int(limit) if isinstance(limit, int) else limit
-    cache_filename = f"{stem}_{inferred_tf}_{lim if lim and lim > 0 else 'all'}.normalized.csv"
-    cache_path = cache_dir / cache_filename
+        if save_cache:
+            rows = _ensure_resampled_cache(
+                source_file, source_tf, cache_path, cache_format, target_tf, incremental, memory_limit_mb
+            )
+        else:
+            resampled = resample_ohlcv(
+                _scan_source_csv(source_file).collect(), target_tf, source_timeframe=source_tf
+            )
+            lf = add_indicators(resampled.lazy(), indicators)
+    else:
+        inferred_tf = _infer_timeframe_from_filename(data_file) or (timeframe or "15m")
+
+        # Tên file cache (toàn bộ lịch sử, limit áp dụng lúc đọc)
+        cache_path = _cache_path(cache_dir, data_file.stem, inferred_tf, cache_format)
 
-    # Đọc từ cache nếu có
-    if save_cache and cache_path.exists():
+        if save_cache:
+            rows = _ensure_cache(data_file, cache_path, cache_format, inferred_tf, incremental, memory_limit_mb)
+        else:
+            print(f"Đang đọc dữ liệu từ CSV: {data_file}")
+            print(f"Timeframe (từ tên file): {inferred_tf}")
+            lf = add_indicators(_scan_source_csv(data_file, raw_columns), indicators)
+
+    if save_cache:
         print(f"Đang đọc dữ liệu từ cache: {cache_path}")
-        df = pl.read_csv(cache_path, try_parse_dates=True)
-        return df
+        # Binary search trên index → chỉ đọc đúng đoạn dòng cần
+        index = _load_index(cache_path, cache_format, rows)
+        offset, length = _index_range(index, start=start, end=end, limit=limit)
+        lf = _scan_cache(cache_path, cache_format)
+        if indicators:
+            # Cột chỉ báo nằm trong file riêng, cùng thứ tự dòng với cache → ghép ngang
+            feature_path = _ensure_feature_cache(cache_path, cache_format, rows, indicators)
+            lf = pl.concat([lf, _scan_cache(feature_path, cache_format)], how="horizontal")
+        df = lf.slice(offset, length).select(columns).collect()
+        record_access(cache_path)
+        if cache_max_mb:
+            enforce_cache_budget(cache_dir, cache_max_mb * 1024 * 1024, keep=[cache_path.name])
+    else:
+        df = _slice_lazy(lf, columns, start=start, end=end, limit=limit).collect()
 
-    print(f"Đang đọc dữ liệu từ CSV: {data_file}")
-    print(f"Timeframe (từ tên file): {inferred_tf}")
+    # Đầu lịch sử: chỉ báo chưa đủ nến để tính (null) → bỏ
+    skipped = warmup_rows(df, indicators)
+    if skipped:
+        df = df.slice(skipped)
+        print(f"Bỏ {skipped} dòng đầu chưa đủ lịch sử để tính chỉ báo")
 
-    raw = pl.read_csv(data_file)
-    df = _normalize_binance_export_csv(raw)
+    if context and len(df) > 0:
+        df = _join_context(
+            df, base_timeframe, context,
+            data_path=data_path, data_dir=data_dir, symbol=symbol, save_cache=save_cache, cache_dir=cache_dir,
+            cache_format=cache_format, incremental=incremental, end=end,
+            memory_limit_mb=memory_limit_mb, cache_max_mb=cache_max_mb
+        )
 
     if len(df) == 0:
         raise ValueError(
-            f"DataFrame rỗng sau khi normalize. "
-            f"Vui lòng kiểm tra file: {data_file}"
+            f"DataFrame rỗng sau khi normalize/lọc. "
+            f"Vui lòng kiểm tra file: {data_file} (start={start}, end={end})"
         )
 
-    if isinstance(limit, int) and limit > 0 and len(df) > limit:
-        df = df.tail(limit)
-
-    # Lưu cache
-    if save_cache:
-        df.write_csv(cache_path)
-        print(f"Đã lưu cache vào: {cache_path}")
-
     print(f"Đã tải {len(df)} dòng dữ liệu")
     try:
         print(f"   Thời gian: {df.select('datetime').row(0)[0]} đến {df.select('datetime').row(-1)[0]}")
@@ -203,6 +1125,293 @@ def fetch_binance_data(
     return df
 
 
+def _ensure_cache(
+    data_file: Path,
+    cache_path: Path,
+    cache_format: str,
+    timeframe: str,
+    incremental: bool = True,
+    memory_limit_mb: Optional[int] = None
+) -> int:
+    """
+    Đảm bảo cache (toàn bộ lịch sử) khớp với file nguồn
+
+    - Fingerprint khớp → dùng luôn
+    - File nguồn chỉ được ghi thêm → cập nhật tăng dần
+    - Còn lại → đọc lại CSV (chỉ 6 cột cần) và ghi cache mới
+      (có memory_limit_mb và file lớn → đọc theo từng khối)
+
+    Returns:
+        Số dòng trong cache
+    """
+    fingerprint = _source_fingerprint(data_file)
+    manifest = _load_manifest(cache_path)
+
+    if _is_cache_fresh(cache_path, manifest, fingerprint):
+        return manifest["rows"]
+
+    if cache_path.exists():
+        append_offset = _append_only_offset(data_file, manifest, fingerprint) if incremental else None
+        if append_offset is not None:
+            return _append_to_cache(data_file, cache_path, cache_format, manifest, fingerprint, append_offset)
+        print(f"Cache không khớp với file nguồn (đã thay đổi hoặc thiếu manifest): {cache_path}")
+
+    print(f"Đang đọc dữ liệu từ CSV: {data_file}")
+    print(f"Timeframe (từ tên file): {timeframe}")
+
+    t0 = time.perf_counter()
+    rss_before, peak_reset = _start_rss_window()
+    block_bytes = _chunk_bytes(memory_limit_mb)
+    if block_bytes is not None and fingerprint["size"] > block_bytes:
+        rows, parse_report, chunks = _build_cache_chunked(data_file, cache_path, cache_format, block_bytes)
+    else:
+        df, parse_report = _read_source_csv(data_file)
+        rows, chunks = len(df), 1
+        if rows > 0:
+            _write_cache(df, cache_path, cache_format)
+            _write_index(df, cache_path)
+        del df
+
+    if rows == 0:
+        raise ValueError(
+            f"DataFrame rỗng sau khi normalize. "
+            f"Vui lòng kiểm tra file: {data_file}"
+        )
+
+    ingest_stats = {
+        "chunks": chunks,
+        "block_bytes": block_bytes,
+        "memory_limit_mb": memory_limit_mb,
+        **_rss_window_stats(rss_before, peak_reset),
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+    _save_manifest(cache_path, {
+        "source_path": str(data_file),
+        "source": fingerprint,
+        "ingest": _ingest_state(data_file, fingerprint),
+        "timeframe": timeframe,
+        "rows": rows,
+        "parse_report": parse_report,
+        "ingest_stats": ingest_stats,
+        "cache_format": cache_format,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    })
+    print(f"Đã lưu cache vào: {cache_path}")
+    limit_note = f" (giới hạn {memory_limit_mb} MB)" if memory_limit_mb else ""
+    if ingest_stats["rss_growth_mb"] is not None:
+        print(
+            f"   {chunks} khối, {ingest_stats['seconds']:.1f}s, RSS tăng tối đa {ingest_stats['rss_growth_mb']:.0f} MB "
+            f"khi tạo cache{limit_note} (trước {ingest_stats['rss_before_mb']:.0f} MB, peak {ingest_stats['peak_rss_mb']:.0f} MB)"
+        )
+    elif ingest_stats["peak_rss_mb"] is not None:
+        print(
+            f"   {chunks} khối, {ingest_stats['seconds']:.1f}s, peak RSS cả process {ingest_stats['peak_rss_mb']:.0f} MB"
+            f"{limit_note} - gồm cả bộ nhớ trước khi tạo cache, không đo riêng được"
+        )
+    return rows
+
+
+def _chunk_bytes(memory_limit_mb: Optional[int]) -> Optional[int]:
+    """Kích thước 1 khối CSV thô sao cho parse + normalize nằm trong giới hạn RAM"""
+    if not memory_limit_mb:
+        return None
+    return max(MIN_CHUNK_BYTES, memory_limit_mb * 1024 * 1024 // CHUNK_MEMORY_FACTOR)
+
+
+def _build_cache_chunked(
+    data_file: Path,
+    cache_path: Path,
+    cache_format: str,
+    block_bytes: int
+) -> Tuple[int, Dict, int]:
+    """
+    Tạo cache theo từng khối (bộ nhớ giới hạn ~ CHUNK_MEMORY_FACTOR x block_bytes)
+
+    Giải thích bằng ví dụ đời sống:
+    - Giống như "chuyển kho bằng xe tải nhỏ" - mỗi chuyến chở 1 khối, dỡ xong mới chở tiếp,
+      không cần bãi đỗ đủ chứa cả kho cùng lúc
+
+    Các bước:
+    1. Đọc 1 khối dòng đầy đủ → parse (schema cố định) → chuẩn hoá → ghi file tạm
+    2. Format thời gian phát hiện ở khối đầu, dùng lại cho các khối sau
+    3. Nối các file tạm bằng streaming sink (chỉ sort nếu dữ liệu không theo thứ tự thời gian)
+
+    Returns:
+        (số dòng, parse report, số khối)
+    """
+    parts_dir = cache_path.with_name(cache_path.name + ".parts")
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    parts_dir.mkdir(parents=True)
+
+    try:
+        parts: List[Path] = []
+        report: Optional[Dict] = None
+        ordered, last_time = True, None
+
+        for header, body in _iter_csv_blocks(data_file, block_bytes):
+            raw = _normalize_lazy(
+                _parse_csv_block(header, body).lazy(), keep_status=True,
+                time_format=report["time_format"] if report else None
+            ).collect()
+            del body
+            report = _merge_reports(report, _status_report(raw))
+
+            clean = _finish_lazy(raw.lazy()).collect()
+            del raw
+            if len(clean) == 0:
+                continue
+
+            first = clean.get_column("datetime")[0]
+            if last_time is not None and first < last_time:
+                ordered = False
+            last_time = clean.get_column("datetime")[-1]
+
+            part = parts_dir / f"part_{len(parts):05d}.parquet"
+            clean.write_parquet(part, compression="uncompressed")
+            parts.append(part)
+            del clean
+
+        if report is None:
+            return 0, {"rows": 0, "time_format": None, "missing_time": 0,
+                       "invalid_time": 0, "missing_close": 0, "dropped": 0}, 0
+        _print_parse_report(report, source=data_file.name)
+        if not parts:
+            return 0, report, 0
+
+        lf = pl.scan_parquet(parts)
+        if not ordered:
+            # Hiếm gặp (file không theo thứ tự thời gian) → cần sort toàn bộ
+            print("Dữ liệu không theo thứ tự thời gian → sort khi ghép các khối")
+            lf = lf.sort("datetime")
+
+        _sink_cache(lf, cache_path, cache_format)
+        datetimes = lf.select("datetime").collect(engine="streaming")
+        _write_index(datetimes, cache_path)
+        return len(datetimes), report, len(parts)
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+
+def _ensure_resampled_cache(
+    source_file: Path,
+    source_timeframe: str,
+    cache_path: Path,
+    cache_format: str,
+    timeframe: str,
+    incremental: bool = True,
+    memory_limit_mb: Optional[int] = None
+) -> int:
+    """
+    Đảm bảo cache của timeframe đã gộp khớp với file nguồn (mịn hơn)
+
+    Gộp từ cache đã chuẩn hoá của file nguồn (không parse lại CSV nếu cache nguồn còn mới)
+
+    Returns:
+        Số dòng trong cache
+    """
+    fingerprint = _source_fingerprint(source_file)
+    manifest = _load_manifest(cache_path)
+
+    if _is_cache_fresh(cache_path, manifest, fingerprint):
+        return manifest["rows"]
+
+    source_cache = _cache_path(cache_path.parent, source_file.stem, source_timeframe, cache_format)
+    _ensure_cache(source_file, source_cache, cache_format, source_timeframe, incremental, memory_limit_mb)
+
+    df = resample_ohlcv(
+        _scan_cache(source_cache, cache_format).collect(),
+        timeframe,
+        source_timeframe=source_timeframe
+    )
+    if len(df) == 0:
+        raise ValueError(
+            f"Không gộp được nến {source_timeframe} → {timeframe} từ file: {source_file}"
+        )
+
+    _write_cache(df, cache_path, cache_format)
+    _write_index(df, cache_path)
+    _save_manifest(cache_path, {
+        "source_path": str(source_file),
+        "source": fingerprint,
+        "resampled_from": source_timeframe,
+        "timeframe": timeframe,
+        "rows": len(df),
+        "cache_format": cache_format,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    })
+    print(f"Đã gộp {len(df)} nến {timeframe} và lưu cache vào: {cache_path}")
+    return len(df)
+
+
+def _iter_cache_files(cache_dir: Path):
+    """Liệt kê tất cả file cache (mọi định dạng trong CACHE_FORMATS + manifest + index)"""
+    for suffix in sorted(set(CACHE_FORMATS.values())) + [MANIFEST_SUFFIX, INDEX_SUFFIX]:
+        yield from cache_dir.glob(f"*{suffix}")
+
+
+def _merge_reports(total: Optional[Dict], report: Dict) -> Dict:
+    """Cộng dồn 2 báo cáo dòng lỗi"""
+    merged = dict(total or {})
+    for key in ("rows", "missing_time", "invalid_time", "missing_close", "dropped"):
+        merged[key] = merged.get(key, 0) + report.get(key, 0)
+    merged["time_format"] = report.get("time_format") or merged.get("time_format")
+    return merged
+
+
+def _append_to_cache(
+    data_file: Path,
+    cache_path: Path,
+    cache_format: str,
+    manifest: Dict,
+    fingerprint: Dict,
+    append_offset: int
+) -> int:
+    """
+    Cập nhật cache tăng dần: chỉ parse + normalize phần đuôi mới của CSV
+
+    Giải thích: Giống như "nhập thêm hàng vào kho" - không kiểm kê lại từ đầu,
+    chỉ ghi sổ các thùng mới về
+    """
+    ingest = _ingest_state(data_file, fingerprint)
+    # Không load cache cũ vào RAM: scan lazy + index (memory-map) để biết nến cuối
+    cached = _scan_cache(cache_path, cache_format)
+    schema = cached.collect_schema()
+    index = _load_index(cache_path, cache_format, manifest["rows"])
+
+    print(f"File nguồn được ghi thêm {ingest['bytes'] - append_offset} bytes → cập nhật cache tăng dần")
+    new_rows = pl.DataFrame(schema=schema)
+    if ingest["bytes"] > append_offset:
+        tail = _read_csv_tail(data_file, append_offset, ingest["bytes"])
+        if len(tail) > 0:
+            new_rows, parse_report = _finish_normalized(
+                _normalize_lazy(
+                    tail.lazy(), keep_status=True,
+                    time_format=(manifest.get("parse_report") or {}).get("time_format")
+                ).collect(),
+                source=data_file.name
+            )
+            manifest["parse_report"] = _merge_reports(manifest.get("parse_report"), parse_report)
+
+    # Chỉ giữ nến mới hơn nến cuối trong cache (tránh trùng lặp)
+    if len(index) > 0 and len(new_rows) > 0:
+        new_rows = new_rows.filter(pl.col("datetime").dt.epoch("us") > int(index[-1]))
+    new_rows = new_rows.select(list(schema)).cast(schema)
+
+    new_index = np.concatenate([index, new_rows.get_column("datetime").dt.epoch("us").to_numpy()])
+    _sink_cache(pl.concat([cached, new_rows.lazy()], how="vertical"), cache_path, cache_format)
+    _save_index(new_index, cache_path)
+    manifest.update({
+        "source": fingerprint,
+        "ingest": ingest,
+        "rows": len(new_index),
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+    })
+    _save_manifest(cache_path, manifest)
+
+    print(f"Đã thêm {len(new_rows)} dòng mới vào cache: {cache_path}")
+    return len(new_index)
+
+
 def clear_cache(cache_dir: Optional[Path] = None, older_than_days: Optional[int] = None) -> int:
     """
     Xóa cache dữ liệu
@@ -227,7 +1436,7 @@ def clear_cache(cache_dir: Optional[Path] = None, older_than_days: Optional[int]
     deleted_count = 0
     current_time = datetime.now().timestamp()
 
-    for file_path in cache_dir.glob("*.csv"):
+    for file_path in _iter_cache_files(cache_dir):
         if older_than_days is None:
             file_path.unlink()
             deleted_count += 1
@@ -237,6 +1446,17 @@ def clear_cache(cache_dir: Optional[Path] = None, older_than_days: Optional[int]
                 file_path.unlink()
                 deleted_count += 1
 
+    # Dữ liệu đã chuẩn bị (mỗi entry là 1 thư mục)
+    prepared_dir = cache_dir / PREPARED_CACHE_DIR
+    if prepared_dir.exists():
+        for entry in prepared_dir.iterdir():
+            file_age_days = (current_time - entry.stat().st_mtime) / 86400
+            if older_than_days is None or file_age_days > older_than_days:
+                shutil.rmtree(entry, ignore_errors=True)
+                deleted_count += 1
+
+    prune_access(cache_dir)
+
     if deleted_count > 0:
         print(f"Đã xóa {deleted_count} file cache")
     else:
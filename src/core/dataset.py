@@ -0,0 +1,213 @@
+"""
+DATASET MODULE - SINH WINDOWS THEO TỪNG BATCH
+---------------------------------------------------
+
+Giải thích bằng ví dụ đời sống:
+- Giống như "bếp nấu theo order" - chỉ nấu đúng phần khách gọi, không nấu sẵn cả nồi
+- model.fit(X) với X là mảng windows → TensorFlow chép cả khối
+  n_windows × window_size × n_features vào RAM (các window chồng lên nhau 99%+)
+- WindowDataset chỉ giữ chuỗi đã scale (n × n_features) + mảng index vị trí bắt đầu,
+  mỗi batch mới gom đúng các window của batch đó
+
+Bộ nhớ: O(n × n_features) thay vì O(n × window_size × n_features)
+
+Trách nhiệm (SoC - Separation of Concerns):
+- Chỉ cắt windows + xáo trộn thứ tự, không scale/split (việc đó của preprocessing.py)
+"""
+
+import math
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from tensorflow import keras
+
+
+class WindowDataset(keras.utils.PyDataset):
+    """
+    Keras PyDataset sinh (X, y) cho từng batch từ chuỗi đã scale
+
+    Mỗi batch trả về đúng shape như prepare_data_for_lstm:
+    - X: [batch, window_size, n_features]
+    - y: [batch, predict_steps] - cột target của predict_steps bước kế tiếp
+
+    Hỗ trợ:
+    - shuffle: xáo thứ tự window sau mỗi epoch (giống model.fit(shuffle=True))
+    - stride: chỉ lấy window bắt đầu tại mỗi stride vị trí (window cạnh nhau gần như trùng nhau)
+    - subsample: mỗi epoch chỉ train 1 phần ngẫu nhiên của các window, lần lượt theo
+      1 hoán vị ngẫu nhiên → sau ceil(1/subsample) epoch đã phủ hết mọi window,
+      mỗi epoch nhanh hơn tỉ lệ thuận
+    - workers / use_multiprocessing / max_queue_size: keras chuẩn bị trước các batch
+      kế tiếp trong hàng đợi (prefetch) trong lúc model đang train batch hiện tại
+    """
+
+    def __init__(
+        self,
+        series: np.ndarray,
+        window_size: int,
+        predict_steps: int = 1,
+        batch_size: int = 32,
+        shuffle: bool = False,
+        seed: Optional[int] = None,
+        workers: int = 1,
+        use_multiprocessing: bool = False,
+        max_queue_size: int = 10,
+        target_index: int = 0,
+        stride: int = 1,
+        subsample: float = 1.0
+    ):
+        """
+        Args:
+            series: Chuỗi đã scale (shape: [n_samples, n_features] hoặc [n_samples])
+            window_size: Số bước nhìn lại
+            predict_steps: Số bước dự đoán (số horizon của y)
+            batch_size: Số window mỗi batch
+            shuffle: Xáo thứ tự window mỗi epoch
+            seed: Seed cho việc xáo (None = ngẫu nhiên)
+            workers: Số worker chuẩn bị batch song song (1 = tuần tự)
+            use_multiprocessing: Dùng process thay vì thread cho workers
+            max_queue_size: Số batch chuẩn bị sẵn tối đa
+            target_index: Cột target trong series
+            stride: Khoảng cách giữa 2 vị trí bắt đầu window (1 = mọi vị trí)
+            subsample: Tỉ lệ window dùng mỗi epoch (0, 1], chọn ngẫu nhiên lại mỗi epoch
+        """
+        if stride < 1:
+            raise ValueError(f"stride phải >= 1, nhận được: {stride}")
+        if not 0.0 < subsample <= 1.0:
+            raise ValueError(f"subsample phải trong (0, 1], nhận được: {subsample}")
+
+        super().__init__(workers=workers, use_multiprocessing=use_multiprocessing, max_queue_size=max_queue_size)
+
+        series = np.asarray(series)
+        self.series = series.reshape(-1, 1) if series.ndim == 1 else series
+        self.window_size = window_size
+        self.predict_steps = predict_steps
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.target_index = target_index
+        self.stride = stride
+        self.subsample = subsample
+        self._rng = np.random.default_rng(seed)
+
+        # Vị trí bắt đầu của từng window (giống thứ tự của create_windows(stride=...))
+        n_windows = max(0, len(self.series) - window_size - predict_steps + 1)
+        self.all_indices = np.arange(0, n_windows, stride)
+        # Số window mỗi epoch cố định (keras cần __len__ không đổi giữa các epoch)
+        self._epoch_windows = len(self.all_indices)
+        if subsample < 1.0 and self._epoch_windows > 0:
+            self._epoch_windows = max(1, int(round(self._epoch_windows * subsample)))
+        self.indices = self.all_indices
+        self._order = self.all_indices
+        self._cursor = len(self.all_indices)
+
+        # Offset trong 1 window → gom cả batch bằng 1 lần fancy indexing
+        self._x_offsets = np.arange(window_size)
+        self._y_offsets = np.arange(window_size, window_size + predict_steps)
+
+        self._draw_epoch()
+
+    @property
+    def num_windows(self) -> int:
+        """Số window mỗi epoch"""
+        return self._epoch_windows
+
+    def _draw_epoch(self) -> None:
+        """Chọn (và xáo) các window cho epoch kế tiếp"""
+        if self._epoch_windows < len(self.all_indices):
+            # Lấy đoạn kế tiếp của hoán vị; hết hoán vị → xáo hoán vị mới
+            # (đoạn cuối thiếu thì bù bằng đầu hoán vị mới)
+            parts = []
+            needed = self._epoch_windows
+            while needed > 0:
+                if self._cursor >= len(self._order):
+                    self._order = self._rng.permutation(self.all_indices)
+                    self._cursor = 0
+                part = self._order[self._cursor:self._cursor + needed]
+                self._cursor += len(part)
+                needed -= len(part)
+                parts.append(part)
+            self.indices = np.concatenate(parts)
+            if not self.shuffle:
+                self.indices.sort()
+        elif self.shuffle:
+            self.indices = self._rng.permutation(self.all_indices)
+
+    def __len__(self) -> int:
+        """Số batch mỗi epoch"""
+        return math.ceil(self.num_windows / self.batch_size)
+
+    def __getitem__(self, idx: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Gom windows của batch thứ idx"""
+        starts = self.indices[idx * self.batch_size:(idx + 1) * self.batch_size]
+        X = self.series[starts[:, None] + self._x_offsets]
+        y = self.series[starts[:, None] + self._y_offsets, self.target_index]
+        return X, y
+
+    def on_epoch_end(self) -> None:
+        """Xáo lại thứ tự / chọn lại tập con window cho epoch sau"""
+        if self.shuffle or self.subsample < 1.0:
+            self._draw_epoch()
+
+    def __repr__(self) -> str:
+        return (
+            f"WindowDataset(windows={self.num_windows}, window_size={self.window_size}, "
+            f"batch_size={self.batch_size}, shuffle={self.shuffle}, "
+            f"stride={self.stride}, subsample={self.subsample})"
+        )
+
+
+def make_window_datasets(
+    data_dict: Dict,
+    window_size: int,
+    predict_steps: int = 1,
+    batch_size: int = 32,
+    shuffle: bool = True,
+    seed: Optional[int] = None,
+    workers: int = 1,
+    use_multiprocessing: bool = False,
+    max_queue_size: int = 10,
+    stride: int = 1,
+    subsample: float = 1.0
+) -> Tuple[WindowDataset, WindowDataset, WindowDataset]:
+    """
+    Tạo WindowDataset cho train/val/test từ kết quả prepare_data_for_lstm
+
+    Chỉ train được xáo / lấy theo stride / subsample; val/test giữ mọi window
+    theo thứ tự thời gian (để so với y_val/y_test).
+
+    Args:
+        data_dict: Kết quả prepare_data_for_lstm (cần train_series/val_series/test_series)
+        window_size, predict_steps: Như create_windows
+        batch_size: Số window mỗi batch
+        shuffle: Xáo train mỗi epoch
+        seed: Seed cho việc xáo
+        workers, use_multiprocessing, max_queue_size: Prefetch song song (xem WindowDataset)
+        stride, subsample: Giảm số window train mỗi epoch (xem WindowDataset)
+
+    Returns:
+        (train, val, test)
+    """
+    loader_kwargs = dict(
+        window_size=window_size,
+        predict_steps=predict_steps,
+        batch_size=batch_size,
+        workers=workers,
+        use_multiprocessing=use_multiprocessing,
+        max_queue_size=max_queue_size,
+        target_index=data_dict.get("target_index", 0),
+    )
+    train = WindowDataset(
+        data_dict["train_series"], shuffle=shuffle, seed=seed,
+        stride=stride, subsample=subsample, **loader_kwargs
+    )
+    val = WindowDataset(data_dict["val_series"], **loader_kwargs)
+    test = WindowDataset(data_dict["test_series"], **loader_kwargs)
+
+    print("WindowDataset (sinh windows theo batch, không tạo sẵn mảng X):")
+    print(f"   Train: {train.num_windows} windows, {len(train)} batches")
+    if stride > 1 or subsample < 1.0:
+        print(f"      (stride {stride}, mỗi epoch {subsample:.0%} của {len(train.all_indices)} windows)")
+    print(f"   Val:   {val.num_windows} windows, {len(val)} batches")
+    print(f"   Test:  {test.num_windows} windows, {len(test)} batches")
+    print(f"   Workers: {workers} ({'process' if use_multiprocessing else 'thread'}), queue: {max_queue_size}")
+
+    return train, val, test
@@ -0,0 +1,213 @@
+"""
+FEATURES MODULE - CHỈ BÁO KỸ THUẬT (FEATURE ENGINEERING)
+-------------------------------------------------------------
+
+Giải thích bằng ví dụ đời sống:
+- Giống như "sơ chế nguyên liệu" - từ giá thô (OHLCV) làm ra các món phụ: RSI, MACD, ATR...
+- Gọi tên món là có: features=["close", "rsi_14", "macd_12_26_9", "volume_z_20"]
+
+Quy ước tên: {chỉ báo}_{tham số 1}_{tham số 2}... (bỏ tham số → dùng mặc định)
+- "rsi" = "rsi_14", "volatility_50" = độ biến động 50 nến, "macd_8_21_5" = MACD(8, 21, 5)
+
+Hiệu năng:
+- Mỗi chỉ báo là 1 polars expression → tất cả gộp vào 1 lần with_columns trên LazyFrame
+  → polars tối ưu cả đồ thị 1 lần (dùng chung biểu thức con như close.shift(1), chạy song song)
+  → 20 chỉ báo = 1 lần quét dữ liệu, không phải 20 lần
+- Kết quả được cache cạnh file cache dữ liệu (xem data.py), dùng lại tới khi dữ liệu đổi
+
+Trách nhiệm (SoC - Separation of Concerns):
+- Chỉ định nghĩa + dựng expression cho chỉ báo, không đọc/ghi file (việc đó của data.py)
+"""
+
+from typing import Callable, Dict, List, Tuple
+
+import polars as pl
+
+
+# ==================== BUILDING BLOCKS ====================
+def _close() -> pl.Expr:
+    return pl.col("close").cast(pl.Float64)
+
+
+def _wilder(expr: pl.Expr, period: int) -> pl.Expr:
+    """Trung bình trượt kiểu Wilder (RSI, ATR): EMA với alpha = 1/period"""
+    return expr.ewm_mean(alpha=1.0 / period, adjust=False, min_samples=period)
+
+
+def _ema(expr: pl.Expr, span: int) -> pl.Expr:
+    return expr.ewm_mean(span=span, adjust=False, min_samples=span)
+
+
+def _log_return(period: int = 1) -> pl.Expr:
+    return (_close() / _close().shift(period)).log()
+
+
+def _macd_line(fast: int, slow: int) -> pl.Expr:
+    return _ema(_close(), fast) - _ema(_close(), slow)
+
+
+# ==================== INDICATORS ====================
+def _return(period: int = 1) -> pl.Expr:
+    """Lợi nhuận % sau period nến"""
+    return _close().pct_change(period)
+
+
+def _volatility(period: int = 20) -> pl.Expr:
+    """Độ biến động: độ lệch chuẩn của log-return 1 nến trong period nến"""
+    return _log_return(1).rolling_std(period)
+
+
+def _rsi(period: int = 14) -> pl.Expr:
+    """RSI (Wilder): 0-100, > 70 quá mua, < 30 quá bán"""
+    delta = _close().diff()
+    gain = _wilder(delta.clip(lower_bound=0), period)
+    loss = _wilder((-delta).clip(lower_bound=0), period)
+    return 100 - 100 / (1 + gain / loss)
+
+
+def _macd(fast: int = 12, slow: int = 26, signal: int = 9) -> pl.Expr:
+    """MACD = EMA(fast) - EMA(slow)"""
+    return _macd_line(fast, slow)
+
+
+def _macd_signal(fast: int = 12, slow: int = 26, signal: int = 9) -> pl.Expr:
+    """Đường tín hiệu = EMA(signal) của MACD"""
+    return _ema(_macd_line(fast, slow), signal)
+
+
+def _macd_hist(fast: int = 12, slow: int = 26, signal: int = 9) -> pl.Expr:
+    """Histogram = MACD - đường tín hiệu"""
+    line = _macd_line(fast, slow)
+    return line - _ema(line, signal)
+
+
+def _atr(period: int = 14) -> pl.Expr:
+    """ATR (Wilder): biên độ dao động thật trung bình"""
+    prev_close = _close().shift(1)
+    high, low = pl.col("high").cast(pl.Float64), pl.col("low").cast(pl.Float64)
+    true_range = pl.max_horizontal(high - low, (high - prev_close).abs(), (low - prev_close).abs())
+    # Nến đầu tiên chưa có prev_close → chỉ high - low
+    return _wilder(true_range, period)
+
+
+def _volume_z(period: int = 20) -> pl.Expr:
+    """Z-score của volume so với period nến gần nhất"""
+    volume = pl.col("volume").cast(pl.Float64)
+    return (volume - volume.rolling_mean(period)) / volume.rolling_std(period)
+
+
+def _sma(period: int = 20) -> pl.Expr:
+    """Trung bình động đơn giản của close"""
+    return _close().rolling_mean(period)
+
+
+def _ema_indicator(period: int = 20) -> pl.Expr:
+    """Trung bình động hàm mũ của close"""
+    return _ema(_close(), period)
+
+
+# Tên chỉ báo → hàm dựng expression (tham số nguyên, đều có mặc định)
+INDICATORS: Dict[str, Callable[..., pl.Expr]] = {
+    "return": _return,
+    "log_return": _log_return,
+    "volatility": _volatility,
+    "rsi": _rsi,
+    "macd": _macd,
+    "macd_signal": _macd_signal,
+    "macd_hist": _macd_hist,
+    "atr": _atr,
+    "volume_z": _volume_z,
+    "sma": _sma,
+    "ema": _ema_indicator,
+}
+
+# Cột OHLCV mà chỉ báo cần đọc
+INDICATOR_INPUTS = ["high", "low", "close", "volume"]
+
+
+def parse_feature(name: str) -> Tuple[str, Tuple[int, ...]]:
+    """
+    Tách tên feature thành (chỉ báo, tham số)
+
+    Ví dụ: "rsi_14" → ("rsi", (14,)), "macd_signal" → ("macd_signal", ()),
+    "volume_z_50" → ("volume_z", (50,))
+
+    Raises:
+        ValueError: Không phải chỉ báo đã đăng ký / tham số không phải số nguyên dương
+    """
+    # Tên dài trước: "macd_signal_12_26_9" khớp "macd_signal" chứ không phải "macd"
+    for indicator in sorted(INDICATORS, key=len, reverse=True):
+        if name == indicator:
+            return indicator, ()
+        if name.startswith(indicator + "_"):
+            parts = name[len(indicator) + 1:].split("_")
+            if all(p.isdigit() and int(p) > 0 for p in parts):
+                return indicator, tuple(int(p) for p in parts)
+    raise ValueError(
+        f"Feature không hợp lệ: {name}. "
+        f"Chọn cột OHLCV hoặc chỉ báo: {sorted(INDICATORS)} (ví dụ rsi_14, macd_12_26_9)"
+    )
+
+
+def is_indicator(name: str) -> bool:
+    """name có phải chỉ báo (không phải cột OHLCV gốc) không"""
+    try:
+        parse_feature(name)
+    except ValueError:
+        return False
+    return True
+
+
+def indicator_expr(name: str) -> pl.Expr:
+    """Expression của 1 chỉ báo, đặt tên cột đúng bằng name (NaN → null)"""
+    indicator, params = parse_feature(name)
+    try:
+        expr = INDICATORS[indicator](*params)
+    except TypeError:
+        raise ValueError(f"Sai số tham số cho {indicator}: {name}") from None
+    # Chia cho 0 (RSI khi giá đứng yên, z-score khi volume không đổi) → null thay vì NaN/inf
+    return expr.fill_nan(None).alias(name)
+
+
+def add_indicators(frame, names: List[str]):
+    """
+    Thêm các chỉ báo vào DataFrame/LazyFrame trong 1 lần with_columns
+
+    Args:
+        frame: DataFrame/LazyFrame đã chuẩn hoá, sort theo datetime (cần high/low/close/volume)
+        names: Tên các chỉ báo
+
+    Returns:
+        Cùng kiểu với frame, thêm 1 cột cho mỗi chỉ báo. Các dòng đầu (chưa đủ nến để tính)
+        có giá trị null
+    """
+    names = list(dict.fromkeys(names))
+    if not names:
+        return frame
+    return frame.with_columns([indicator_expr(name) for name in names])
+
+
+def warmup_rows(frame: pl.DataFrame, names: List[str]) -> int:
+    """Số dòng đầu còn null ở ít nhất 1 chỉ báo (chưa đủ lịch sử để tính)"""
+    if not names or len(frame) == 0:
+        return 0
+    valid = frame.select(pl.all_horizontal(pl.col(names).is_not_null()).arg_true().first()).item()
+    return len(frame) if valid is None else int(valid)
+
+
+if __name__ == "__main__":
+    # Test
+    import numpy as np
+
+    n = 200
+    close = np.random.randn(n).cumsum() + 100
+    df = pl.DataFrame({
+        "datetime": pl.datetime_range(pl.datetime(2024, 1, 1), pl.datetime(2024, 1, 1) + pl.duration(days=n - 1),
+                                      interval="1d", eager=True),
+        "open": close, "high": close + 1, "low": close - 1, "close": close,
+        "volume": np.random.rand(n) * 1000,
+    })
+    names = ["return", "log_return", "volatility_20", "rsi_14", "macd", "macd_signal", "atr_14", "volume_z_20"]
+    out = add_indicators(df.lazy(), names).collect()
+    print(out.tail())
+    print("Warm-up rows:", warmup_rows(out, names))
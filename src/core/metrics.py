@@ -11,12 +11,14 @@ Các metrics:
 2. RMSE (Root Mean Squared Error): Căn bậc 2 sai số bình phương
 3. MAPE (Mean Absolute Percentage Error): Sai số phần trăm trung bình
 4. Direction Accuracy: Độ chính xác khi dự đoán xu hướng (tăng/giảm)
+
+Multi-horizon (predict_steps > 1): mỗi window dự đoán H bước tới trong 1 lần forward
+→ metrics tính riêng cho từng horizon (bước 1, 2, ..., H) + trung bình tất cả
 """
 
 from typing import Dict, Optional
 
 import numpy as np
-from sklearn.metrics import mean_absolute_error, mean_squared_error
 
 
 def evaluate_model(
@@ -24,7 +26,8 @@ def evaluate_model(
     X_test: np.ndarray,
     y_test: np.ndarray,
     scaler=None,
-    return_predictions: bool = False
+    return_predictions: bool = False,
+    target_index: int = 0
 ) -> Dict:
     """
     Đánh giá model trên test set
@@ -35,61 +38,104 @@ def evaluate_model(
 
     Args:
         model: Model đã được train
-        X_test: Dữ liệu test đầu vào
-        y_test: Dữ liệu test mục tiêu (giá trị thật)
-        scaler: Scaler để inverse transform
+        X_test: Dữ liệu test đầu vào (mảng windows hoặc WindowDataset)
+        y_test: Dữ liệu test mục tiêu (shape: [n, predict_steps] hoặc [n])
+        scaler: Scaler để inverse transform (chỉ dùng scale/offset của cột target)
         return_predictions: Có trả về predictions không
+        target_index: Vị trí cột target trong features lúc fit scaler
 
     Returns:
         Dictionary chứa:
-            - mae: Mean Absolute Error
-            - rmse: Root Mean Squared Error
-            - mape: Mean Absolute Percentage Error
-            - predictions: Dự đoán (nếu return_predictions=True)
-            - y_true: Giá trị thật
+            - mae: Mean Absolute Error (trung bình mọi horizon)
+            - rmse: Root Mean Squared Error (trung bình mọi horizon)
+            - mape: Mean Absolute Percentage Error (trung bình mọi horizon)
+            - horizons: Metrics của từng horizon (step 1..H)
+            - predictions: Dự đoán horizon 1 (nếu return_predictions=True)
+            - y_true: Giá trị thật horizon 1
+            - y_true_horizons, predictions_horizons: [n, H] (khi H > 1)
     """
-    # Dự đoán
-    y_pred_scaled = model.predict(X_test, verbose=0)
-
-    # Flatten
-    y_test_flat = y_test.flatten()
-    y_pred_scaled_flat = y_pred_scaled.flatten()
+    # Dự đoán (giữ cùng dtype với y_test, ví dụ float32 - không nâng lên float64)
+    y_test = np.asarray(y_test)
+    n_samples = len(y_test)
+    y_test_2d = y_test.reshape(n_samples, -1)
+    y_pred_scaled = np.asarray(model.predict(X_test, verbose=0), dtype=y_test.dtype).reshape(n_samples, -1)
 
     # Inverse transform nếu có scaler
     if scaler is not None:
-        y_true = scaler.inverse_transform(y_test_flat.reshape(-1, 1)).flatten()
-        y_pred = scaler.inverse_transform(y_pred_scaled_flat.reshape(-1, 1)).flatten()
+        y_true_2d = _inverse_target(scaler, y_test_2d, target_index)
+        y_pred_2d = _inverse_target(scaler, y_pred_scaled, target_index)
     else:
-        y_true = y_test_flat
-        y_pred = y_pred_scaled_flat
-
-    # Tính metrics
-    mae = mean_absolute_error(y_true, y_pred)
-    rmse = np.sqrt(mean_squared_error(y_true, y_pred))
-    mape = np.mean(np.abs((y_true - y_pred) / (y_true + 1e-8))) * 100
+        y_true_2d = y_test_2d
+        y_pred_2d = y_pred_scaled
+
+    n_horizons = y_true_2d.shape[1]
+    horizons = []
+    for h in range(n_horizons):
+        horizon = regression_metrics(y_true_2d[:, h], y_pred_2d[:, h])
+        # Xu hướng so với giá cuối cùng đã biết (= target horizon 1 của window trước)
+        horizon["direction_accuracy"] = float(calculate_direction_accuracy(
+            y_true_2d[1:, h], y_pred_2d[1:, h], base=y_true_2d[:-1, 0], verbose=False
+        ))
+        horizons.append({"step": h + 1, **horizon})
+
+    overall = regression_metrics(y_true_2d.ravel(), y_pred_2d.ravel())
+    mae, rmse, mape = overall["mae"], overall["rmse"], overall["mape"]
 
     print("\n" + "=" * 60)
     print("KẾT QUẢ ĐÁNH GIÁ TRÊN TEST SET")
     print("=" * 60)
+    if n_horizons > 1:
+        print(f"(Trung bình {n_horizons} horizon)")
     print(f"MAE:  ${mae:.2f}  (Sai số trung bình tuyệt đối)")
     print(f"RMSE: ${rmse:.2f}  (Căn bậc 2 sai số bình phương)")
     print(f"MAPE: {mape:.2f}%  (Sai số phần trăm trung bình)")
+    if n_horizons > 1:
+        print("-" * 60)
+        print(f"{'Horizon':<10} {'MAE':<14} {'RMSE':<14} {'MAPE':<10} {'Xu hướng':<10}")
+        for horizon in horizons:
+            print(
+                f"t+{horizon['step']:<8} ${horizon['mae']:<13.2f} ${horizon['rmse']:<13.2f} "
+                f"{horizon['mape']:<9.2f}% {horizon['direction_accuracy']*100:.2f}%"
+            )
     print("=" * 60 + "\n")
 
     result = {
         "mae": mae,
         "rmse": rmse,
         "mape": mape,
-        "y_true": y_true,
-        "predictions": y_pred
+        "horizons": horizons,
+        "y_true": y_true_2d[:, 0],
+        "predictions": y_pred_2d[:, 0]
     }
+    if n_horizons > 1:
+        result["y_true_horizons"] = y_true_2d
+        result["predictions_horizons"] = y_pred_2d
 
     if return_predictions:
-        result["predictions_scaled"] = y_pred_scaled_flat
+        result["predictions_scaled"] = y_pred_scaled[:, 0]
 
     return result
 
 
+def _inverse_target(scaler, values: np.ndarray, target_index: int = 0) -> np.ndarray:
+    """Inverse transform cột target (giữ nguyên shape [n, H])"""
+    if hasattr(scaler, "inverse_transform_column"):
+        return scaler.inverse_transform_column(values, column=target_index)
+    return scaler.inverse_transform(values.reshape(-1, 1)).reshape(values.shape)
+
+
+def regression_metrics(y_true: np.ndarray, y_pred: np.ndarray) -> Dict:
+    """MAE, RMSE, MAPE cho 1 cặp (thực tế, dự đoán)"""
+    # Tính bằng float64 (tổng nhiều sai số float32 dễ mất chính xác)
+    y_true = np.asarray(y_true, dtype=np.float64)
+    errors = y_true - np.asarray(y_pred, dtype=np.float64)
+    return {
+        "mae": float(np.mean(np.abs(errors))),
+        "rmse": float(np.sqrt(np.mean(errors ** 2))),
+        "mape": float(np.mean(np.abs(errors / (y_true + 1e-8))) * 100),
+    }
+
+
 def print_sample_predictions(
     y_true: np.ndarray,
     y_pred: np.ndarray,
@@ -124,7 +170,9 @@ def print_sample_predictions(
 def calculate_direction_accuracy(
     y_true: np.ndarray,
     y_pred: np.ndarray,
-    threshold: float = 0.0
+    threshold: float = 0.0,
+    base: Optional[np.ndarray] = None,
+    verbose: bool = True
 ) -> float:
     """
     Tính độ chính xác khi dự đoán xu hướng (tăng/giảm)
@@ -137,28 +185,36 @@ def calculate_direction_accuracy(
     - true_direction = actual[t+1] - actual[t] (xu hướng thực tế)
     - pred_direction = pred[t+1] - actual[t] (dự đoán đi từ actual[t])
 
+    Multi-horizon: truyền base = giá cuối cùng đã biết của từng window
+    → true = actual[t+h] - base, pred = pred[t+h] - base
+
     Args:
         y_true: Giá trị thật
         y_pred: Dự đoán
         threshold: Ngưỡng coi là "không đổi"
+        base: Giá gốc để so sánh (cùng độ dài y_true). None = dùng actual[t] như trên
+        verbose: In kết quả
 
     Returns:
         Độ chính xác (0-1)
     """
-    # Xu hướng thực tế
-    true_change = np.diff(y_true)
-
-    # Dự đoán xu hướng
-    pred_change = y_pred[1:] - y_true[:-1]
+    if base is None:
+        # Xu hướng thực tế + dự đoán xu hướng, đều đi từ actual[t]
+        true_change = np.diff(y_true)
+        pred_change = y_pred[1:] - y_true[:-1]
+    else:
+        true_change = y_true - base
+        pred_change = y_pred - base
 
     # Xác định xu hướng (tăng = 1, giảm = -1, không đổi = 0)
     true_direction = np.where(true_change > threshold, 1, np.where(true_change < -threshold, -1, 0))
     pred_direction = np.where(pred_change > threshold, 1, np.where(pred_change < -threshold, -1, 0))
 
     # Tính độ chính xác
-    accuracy = np.mean(true_direction == pred_direction)
+    accuracy = np.mean(true_direction == pred_direction) if len(true_direction) > 0 else 0.0
 
-    print(f"Độ chính xác xu hướng: {accuracy*100:.2f}%")
+    if verbose:
+        print(f"Độ chính xác xu hướng: {accuracy*100:.2f}%")
 
     return accuracy
 
@@ -168,13 +224,11 @@ if __name__ == "__main__":
     y_true = np.array([50000, 51000, 49500, 52000, 52500])
     y_pred = np.array([50500, 50800, 49800, 51800, 52700])
 
-    mae = mean_absolute_error(y_true, y_pred)
-    rmse = np.sqrt(mean_squared_error(y_true, y_pred))
-    mape = np.mean(np.abs((y_true - y_pred) / y_true)) * 100
+    metrics = regression_metrics(y_true, y_pred)
 
-    print(f"MAE: ${mae:.2f}")
-    print(f"RMSE: ${rmse:.2f}")
-    print(f"MAPE: {mape:.2f}%")
+    print(f"MAE: ${metrics['mae']:.2f}")
+    print(f"RMSE: ${metrics['rmse']:.2f}")
+    print(f"MAPE: {metrics['mape']:.2f}%")
 
     print_sample_predictions(y_true, y_pred)
     calculate_direction_accuracy(y_true, y_pred)
@@ -1,6 +1,6 @@
 """
-MODEL MODULE - XÂY DỰNG MODEL BiLSTM
-------------------------------------------
+MODEL MODULE - XÂY DỰNG MODEL (BiLSTM / GRU / TCN)
+-------------------------------------------------------
 
 Giải thích bằng ví dụ đời sống:
 - LSTM giống như "bộ nhớ ngắn hạn" - nhớ thông tin quan trọng
@@ -15,9 +15,21 @@ Lợi ích:
 - Phát hiện pattern tốt hơn
 - Hiểu context từ 2 phía
 - Kết quả thường tốt hơn LSTM thường
+
+Kiến trúc khác (chọn bằng ModelConfig.architecture, xem MODEL_BUILDERS):
+- gru: GRU xếp chồng 1 chiều - ít tham số hơn LSTM, mỗi bước ~2/3 phép tính của BiLSTM
+- tcn: Conv1D nhân quả giãn (dilated causal) - "đọc lướt cả đoạn cùng lúc" thay vì
+  "đọc từng chữ": mọi bước thời gian tính song song → trên CPU mỗi epoch nhanh hơn
+  nhiều lần so với LSTM cùng độ dài window (576-768 nến)
+- multires: BiLSTM chạy trên chuỗi đã nén - K nến gần nhất giữ nguyên, lịch sử cũ hơn
+  gộp (Conv1D stride / pooling) → vẫn thấy hết window, số bước tuần tự giảm nhiều lần
+
+Mọi kiến trúc dùng chung hợp đồng: input [batch, window_size, n_features]
+→ output [batch, output_units], cùng head Dense + compile (Adam, mse, mae)
 """
 
-from typing import List, Tuple
+import inspect
+from typing import Callable, Dict, List, Tuple
 
 import tensorflow as tf
 from tensorflow import keras
@@ -40,7 +52,7 @@ def build_bilstm_model(
         lstm_units: List số units cho mỗi LSTM layer
         dropout_rate: Tỷ lệ dropout (để tránh overfitting)
         dense_units: List số units cho mỗi Dense layer
-        output_units: Số units ở output layer (thường = 1)
+        output_units: Số units ở output layer (= predict_steps: mỗi unit là 1 horizon)
         learning_rate: Learning rate cho optimizer
 
     Returns:
@@ -62,31 +74,251 @@ def build_bilstm_model(
     model.add(layers.Input(shape=input_shape, name="input"))
 
     # BiLSTM layers
-    # Layer 1: return_sequences=True để pass cho LSTM layer tiếp theo
-    model.add(layers.Bidirectional(
-        layers.LSTM(
-            lstm_units[0],
-            return_sequences=len(lstm_units) > 1,
-            name="bilstm_1"
-        ),
-        name="bidirectional_1"
-    ))
-    model.add(layers.Dropout(dropout_rate, name="dropout_1"))
-
-    # Các LSTM layers tiếp theo (nếu có)
-    for i, units in enumerate(lstm_units[1:], start=2):
-        is_last = i == len(lstm_units)
-        model.add(layers.Bidirectional(
+    for layer in _bilstm_layers(lstm_units, dropout_rate):
+        model.add(layer)
+
+    # Dense layers + output
+    _add_head(model, dense_units, dropout_rate, output_units)
+    _compile(model, learning_rate)
+
+    print(f"Đã build model BiLSTM với {len(lstm_units)} LSTM layers")
+
+    return model
+
+
+def _bilstm_layers(lstm_units: List[int], dropout_rate: float) -> List[layers.Layer]:
+    """Các layer BiLSTM (+ Dropout) xếp chồng, layer cuối chỉ trả về bước cuối cùng"""
+    stack = []
+    for i, units in enumerate(lstm_units, start=1):
+        # return_sequences=True để pass cho LSTM layer tiếp theo
+        stack.append(layers.Bidirectional(
             layers.LSTM(
                 units,
-                return_sequences=not is_last,
+                return_sequences=i < len(lstm_units),
                 name=f"bilstm_{i}"
             ),
             name=f"bidirectional_{i}"
         ))
+        stack.append(layers.Dropout(dropout_rate, name=f"dropout_{i}"))
+    return stack
+
+
+def multires_length(window_size: int, recent_steps: int = 64, compress_factor: int = 8) -> int:
+    """
+    Độ dài chuỗi BiLSTM thực sự chạy sau khi nén (build_multires_bilstm_model)
+
+    = ceil((window_size - recent_steps) / compress_factor) + recent_steps
+    """
+    recent_steps = min(recent_steps, window_size)
+    older = window_size - recent_steps
+    return -(-older // compress_factor) + recent_steps
+
+
+def build_multires_bilstm_model(
+    input_shape: Tuple[int, int],
+    units: List[int] = None,
+    dropout_rate: float = 0.2,
+    dense_units: List[int] = None,
+    output_units: int = 1,
+    learning_rate: float = 0.001,
+    recent_steps: int = 64,
+    compress_factor: int = 8,
+    compress: str = "conv"
+) -> models.Model:
+    """
+    Xây dựng model BiLSTM đa phân giải (nén lịch sử cũ, giữ nguyên nến gần)
+
+    Giải thích bằng ví dụ đời sống:
+    - Giống như "nhật ký": tuần này ghi từng ngày, năm ngoái chỉ còn tóm tắt từng tháng
+    - recent_steps nến gần nhất giữ nguyên độ phân giải (chi tiết quan trọng nhất)
+    - Phần lịch sử cũ hơn nén compress_factor nến → 1 bước (vẫn "thấy" toàn bộ lookback)
+    - BiLSTM chạy tuần tự trên chuỗi ngắn hơn nhiều → mỗi epoch nhanh hơn tỉ lệ thuận
+
+    Ví dụ: window 768, recent_steps 64, compress_factor 8
+        → 704 nến cũ nén còn 88 bước + 64 nến gần = 152 bước (thay vì 768)
+
+    Args:
+        input_shape: (window_size, n_features)
+        units: Units mỗi BiLSTM layer (giống lstm_units)
+        dropout_rate, dense_units, output_units, learning_rate: Như build_bilstm_model
+        recent_steps: Số nến gần nhất giữ nguyên (K)
+        compress_factor: Số nến cũ gộp thành 1 bước
+        compress: "conv" (Conv1D stride = compress_factor, học cách tóm tắt)
+            hoặc "pool" (AveragePooling1D, không thêm tham số)
+
+    Returns:
+        Model đã được compile
+    """
+    if units is None:
+        units = [64, 32]
+    if dense_units is None:
+        dense_units = [16]
+    if compress not in ("conv", "pool"):
+        raise ValueError(f"compress phải là 'conv' hoặc 'pool', nhận được: {compress}")
+
+    window_size, n_features = input_shape
+    recent_steps = min(recent_steps, window_size)
+    older_steps = window_size - recent_steps
+
+    inputs = layers.Input(shape=input_shape, name="input")
+    x = layers.Cropping1D((older_steps, 0), name="recent")(inputs)
+    if older_steps > 0:
+        older = layers.Cropping1D((0, recent_steps), name="older")(inputs)
+        if compress == "conv":
+            # Cùng số kênh với input → nối theo trục thời gian với phần gần
+            summary = layers.Conv1D(
+                n_features, compress_factor, strides=compress_factor,
+                padding="same", name="compress_conv"
+            )(older)
+        else:
+            summary = layers.AveragePooling1D(
+                compress_factor, strides=compress_factor, padding="same", name="compress_pool"
+            )(older)
+        x = layers.Concatenate(axis=1, name="multires")([summary, x])
+
+    for layer in _bilstm_layers(units, dropout_rate):
+        x = layer(x)
+
+    head = models.Sequential(name="head")
+    _add_head(head, dense_units, dropout_rate, output_units)
+    model = models.Model(inputs, head(x), name="MultiRes_BiLSTM_Price_Prediction")
+    _compile(model, learning_rate)
+
+    print(
+        f"Đã build model MultiRes BiLSTM với {len(units)} LSTM layers: "
+        f"{window_size} bước → {multires_length(window_size, recent_steps, compress_factor)} bước "
+        f"({recent_steps} gần nhất + lịch sử cũ nén /{compress_factor} bằng {compress})"
+    )
+
+    return model
+
+
+def build_gru_model(
+    input_shape: Tuple[int, int],
+    units: List[int] = None,
+    dropout_rate: float = 0.2,
+    dense_units: List[int] = None,
+    output_units: int = 1,
+    learning_rate: float = 0.001
+) -> models.Sequential:
+    """
+    Xây dựng model GRU xếp chồng (1 chiều)
+
+    Giải thích bằng ví dụ đời sống:
+    - GRU giống LSTM "rút gọn" - 2 cổng thay vì 3, nhớ gần như tốt bằng mà tính nhanh hơn
+    - 1 chiều (không Bidirectional) → nửa số phép tính mỗi bước so với BiLSTM
+
+    Args:
+        input_shape: (window_size, n_features)
+        units: List số units cho mỗi GRU layer (giống lstm_units)
+        dropout_rate, dense_units, output_units, learning_rate: Như build_bilstm_model
+
+    Returns:
+        Model GRU đã được compile
+    """
+    if units is None:
+        units = [64, 32]
+    if dense_units is None:
+        dense_units = [16]
+
+    model = models.Sequential(name="GRU_Price_Prediction")
+    model.add(layers.Input(shape=input_shape, name="input"))
+
+    for i, n_units in enumerate(units, start=1):
+        model.add(layers.GRU(n_units, return_sequences=i < len(units), name=f"gru_{i}"))
         model.add(layers.Dropout(dropout_rate, name=f"dropout_{i}"))
 
-    # Dense layers
+    _add_head(model, dense_units, dropout_rate, output_units)
+    _compile(model, learning_rate)
+
+    print(f"Đã build model GRU với {len(units)} GRU layers")
+
+    return model
+
+
+def tcn_levels(window_size: int, kernel_size: int = 3) -> int:
+    """
+    Số level (dilation 1, 2, 4, ...) để receptive field phủ hết window
+
+    Mỗi level có 2 Conv1D → receptive field = 1 + 2 × (kernel_size - 1) × (2^levels - 1)
+    """
+    levels = 1
+    while 1 + 2 * (kernel_size - 1) * (2 ** levels - 1) < window_size:
+        levels += 1
+    return levels
+
+
+def build_tcn_model(
+    input_shape: Tuple[int, int],
+    units: List[int] = None,
+    dropout_rate: float = 0.2,
+    dense_units: List[int] = None,
+    output_units: int = 1,
+    learning_rate: float = 0.001,
+    kernel_size: int = 3
+) -> models.Model:
+    """
+    Xây dựng model TCN (Temporal Convolutional Network)
+
+    Giải thích bằng ví dụ đời sống:
+    - Giống như "đọc lướt" - mỗi level nhìn xa gấp đôi level trước (dilation 1, 2, 4, 8...)
+    - Nhân quả (causal): bước t chỉ nhìn t và quá khứ, không nhìn trước tương lai
+    - Không có vòng lặp theo thời gian như LSTM → cả window tính song song
+
+    Cấu trúc: các khối residual [Conv1D giãn → Dropout → Conv1D giãn → Dropout] + skip,
+    số level đủ để receptive field ≥ window_size (tcn_levels), output lấy bước cuối cùng
+    (bước duy nhất đã "nhìn" hết window)
+
+    Args:
+        input_shape: (window_size, n_features)
+        units: Số filters = units[0] (dùng chung lstm_units của config)
+        dropout_rate, dense_units, output_units, learning_rate: Như build_bilstm_model
+        kernel_size: Độ rộng kernel của mỗi Conv1D
+
+    Returns:
+        Model TCN đã được compile
+    """
+    if units is None:
+        units = [64, 32]
+    if dense_units is None:
+        dense_units = [16]
+    filters = units[0]
+    window_size = input_shape[0]
+    levels = tcn_levels(window_size, kernel_size)
+
+    inputs = layers.Input(shape=input_shape, name="input")
+    x = inputs
+    for level in range(levels):
+        dilation = 2 ** level
+        residual = x
+        for j in (1, 2):
+            x = layers.Conv1D(
+                filters, kernel_size, padding="causal", dilation_rate=dilation,
+                activation="relu", name=f"tcn_{level + 1}_conv_{j}"
+            )(x)
+            x = layers.Dropout(dropout_rate, name=f"tcn_{level + 1}_dropout_{j}")(x)
+        if residual.shape[-1] != filters:
+            # 1x1 conv để khớp số kênh cho skip connection
+            residual = layers.Conv1D(filters, 1, name=f"tcn_{level + 1}_skip")(residual)
+        x = layers.Add(name=f"tcn_{level + 1}_add")([x, residual])
+
+    # Bước cuối cùng: [batch, window, filters] → [batch, filters]
+    x = layers.Cropping1D((window_size - 1, 0), name="last_step")(x)
+    x = layers.Flatten(name="flatten")(x)
+
+    head = models.Sequential(name="head")
+    _add_head(head, dense_units, dropout_rate, output_units)
+    model = models.Model(inputs, head(x), name="TCN_Price_Prediction")
+    _compile(model, learning_rate)
+
+    receptive_field = 1 + 2 * (kernel_size - 1) * (2 ** levels - 1)
+    print(f"Đã build model TCN với {levels} level (receptive field {receptive_field} bước, {filters} filters)")
+
+    return model
+
+
+def _add_head(model: models.Sequential, dense_units: List[int], dropout_rate: float, output_units: int) -> None:
+    """Dense layers + output layer (dùng chung cho mọi kiến trúc)"""
     for i, units in enumerate(dense_units, start=1):
         model.add(layers.Dense(units, activation='relu', name=f"dense_{i}"))
         model.add(layers.Dropout(dropout_rate * 0.5, name=f"dense_dropout_{i}"))
@@ -94,19 +326,80 @@ def build_bilstm_model(
     # Output layer
     model.add(layers.Dense(output_units, name="output"))
 
-    # Compile model
+
+def _compile(model: keras.Model, learning_rate: float) -> None:
+    """Compile chung cho mọi kiến trúc"""
     model.compile(
         optimizer=keras.optimizers.Adam(learning_rate=learning_rate),
         loss='mse',  # Mean Squared Error - tốt cho regression
         metrics=['mae']  # Mean Absolute Error - dễ hiểu hơn
     )
 
-    print(f"Đã build model BiLSTM với {len(lstm_units)} LSTM layers")
 
-    return model
+# Tên kiến trúc (ModelConfig.architecture) → hàm build
+MODEL_BUILDERS: Dict[str, Callable[..., keras.Model]] = {
+    "bilstm": build_bilstm_model,
+    "gru": build_gru_model,
+    "tcn": build_tcn_model,
+    "multires": build_multires_bilstm_model,
+}
+
+# Tên hiển thị (tên folder kết quả, báo cáo)
+MODEL_NAMES: Dict[str, str] = {
+    "bilstm": "BiLSTM",
+    "gru": "GRU",
+    "tcn": "TCN",
+    "multires": "MultiRes",
+}
+
+
+def build_model(
+    architecture: str,
+    input_shape: Tuple[int, int],
+    units: List[int] = None,
+    dropout_rate: float = 0.2,
+    dense_units: List[int] = None,
+    output_units: int = 1,
+    learning_rate: float = 0.001,
+    **options
+) -> keras.Model:
+    """
+    Build model theo tên kiến trúc trong MODEL_BUILDERS
+
+    Args:
+        architecture: Tên trong MODEL_BUILDERS ("bilstm", "gru", "tcn", "multires")
+        input_shape: (window_size, n_features)
+        units: List units (LSTM/GRU units mỗi layer, TCN: số filters = units[0])
+        dropout_rate, dense_units, output_units, learning_rate: Như build_bilstm_model
+        **options: Tham số riêng của kiến trúc (ví dụ kernel_size cho tcn,
+            recent_steps/compress_factor/compress cho multires),
+            kiến trúc không dùng thì bỏ qua
+
+    Returns:
+        Model đã compile
+
+    Raises:
+        ValueError: Kiến trúc chưa đăng ký
+    """
+    name = (architecture or "").lower()
+    if name not in MODEL_BUILDERS:
+        raise ValueError(f"Kiến trúc không hỗ trợ: {architecture}. Chọn một trong: {list(MODEL_BUILDERS)}")
+
+    builder = MODEL_BUILDERS[name]
+    accepted = inspect.signature(builder).parameters
+    options = {key: value for key, value in options.items() if key in accepted}
+    return builder(
+        input_shape,
+        units,
+        dropout_rate=dropout_rate,
+        dense_units=dense_units,
+        output_units=output_units,
+        learning_rate=learning_rate,
+        **options
+    )
 
 
-def print_model_summary(model: models.Sequential) -> None:
+def print_model_summary(model: keras.Model) -> None:
     """
     In thông tin chi tiết về model
 
@@ -132,5 +425,6 @@ def print_model_summary(model: models.Sequential) -> None:
 if __name__ == "__main__":
     # Test function
     input_shape = (60, 1)
-    model = build_bilstm_model(input_shape=input_shape)
-    print_model_summary(model)
+    for architecture in MODEL_BUILDERS:
+        model = build_model(architecture, input_shape=input_shape)
+        print_model_summary(model)
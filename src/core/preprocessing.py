@@ -8,25 +8,50 @@ Giải thích bằng ví dụ đời sống:
 
 Các bước:
 1. Windowing: Tạo sliding windows (nhìn lại lịch sử)
-2. Scaling: Chuẩn hoá về range 0-1
+2. Scaling: Chuẩn hoá về range 0-1 (minmax) / mean 0 (standard) / median 0 (robust)
 3. Splitting: Chia train/val/test
 
+Walk-forward (nhiều fold): mỗi fold chỉ là các khoảng index trên cùng 1 chuỗi gốc,
+scaler fit lại trên đoạn train của fold, windows là view → không copy dữ liệu theo fold
+
+Cache (tuỳ chọn): chuỗi đã scale + tham số scaler lưu dạng .npy theo hash
+(dữ liệu + config) → lần chạy sau với cùng dữ liệu/config bỏ qua bước 2-3
+
 Trách nhiệm (SoC - Separation of Concerns):
 - Chỉ xử lý dữ liệu, không làm gì khác
 """
 
-from typing import Dict, List, Tuple
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
 import polars as pl
-from sklearn.preprocessing import MinMaxScaler, StandardScaler
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .cache import PREPARED_CACHE_DIR, enforce_cache_budget, record_access
+
+
+# Kiểu numpy → kiểu polars tương ứng (để cast trước khi to_numpy)
+_POLARS_DTYPES = {
+    "float32": pl.Float32,
+    "float64": pl.Float64,
+}
 
 
 # ==================== WINDOWING ====================
 def create_windows(
     data: np.ndarray,
     window_size: int = 60,
-    predict_steps: int = 1
+    predict_steps: int = 1,
+    copy: bool = False,
+    stride: int = 1,
+    target_index: Optional[int] = None
 ) -> Tuple[np.ndarray, np.ndarray]:
     """
     Tạo sliding windows từ dữ liệu
@@ -36,14 +61,24 @@ def create_windows(
     - Mỗi lần nhìn 60 ngày qua để dự đoán ngày mai
     - Cửa sổ trượt từ đầu đến cuối
 
+    Zero-copy: X và y là strided view trên chính `data` (sliding_window_view)
+    → không có vòng lặp Python, không nhân bản dữ liệu (bộ nhớ O(n) thay vì
+    O(n × window_size)). View là read-only và trỏ vào `data`; cần mảng độc lập
+    (ví dụ để sửa tại chỗ, hoặc giải phóng `data`) → truyền copy=True.
+
     Args:
-        data: Dữ liệu đầu vào (shape: [n_samples, n_features])
+        data: Dữ liệu đầu vào (shape: [n_samples, n_features] hoặc [n_samples])
         window_size: Số bước nhìn lại (past days)
         predict_steps: Số bước dự đoán (future days)
+        copy: True → trả về mảng C-contiguous riêng (tốn n_windows × window_size × n_features phần tử)
+        stride: Khoảng cách giữa 2 window liên tiếp (1 = mọi vị trí). Vẫn là view
+            (chỉ nhân bước nhảy của trục đầu), không tạo dữ liệu mới
+        target_index: Cột target (data 2D) → y chỉ gồm cột này. None = giữ mọi cột
 
     Returns:
         X: Dữ liệu đầu vào (shape: [n_windows, window_size, n_features])
-        y: Dữ liệu mục tiêu (shape: [n_windows, predict_steps])
+        y: Dữ liệu mục tiêu (shape: [n_windows, predict_steps, n_features],
+            hoặc [n_windows, predict_steps] khi có target_index)
 
     Ví dụ:
         data = [10, 20, 30, 40, 50, 60, 70]
@@ -52,17 +87,36 @@ def create_windows(
         Kết quả:
         X = [[10, 20, 30], [20, 30, 40], [30, 40, 50], [40, 50, 60]]
         y = [[40], [50], [60], [70]]
-    """
-    X, y = [], []
-    n_windows = len(data) - window_size - predict_steps + 1
 
-    for i in range(n_windows):
-        X.append(data[i:i + window_size])
-        y.append(data[i + window_size:i + window_size + predict_steps])
+        stride = 2 → X = [[10, 20, 30], [30, 40, 50]], y = [[40], [60]]
+    """
+    if stride < 1:
+        raise ValueError(f"stride phải >= 1, nhận được: {stride}")
 
-    X = np.array(X)
-    y = np.array(y)
+    data = np.asarray(data)
+    n_windows = len(data) - window_size - predict_steps + 1
 
+    # Chỉ cột target vào y (view theo cột, không copy)
+    target = data if target_index is None or data.ndim == 1 else data[:, target_index]
+
+    if n_windows <= 0:
+        return (
+            np.empty((0, window_size) + data.shape[1:], dtype=data.dtype),
+            np.empty((0, predict_steps) + target.shape[1:], dtype=data.dtype),
+        )
+
+    # sliding_window_view đặt trục cửa sổ ở cuối: [n, n_features, window] → đổi về [n, window, n_features]
+    X = sliding_window_view(data[:n_windows + window_size - 1], window_size, axis=0)
+    y = sliding_window_view(target[window_size:], predict_steps, axis=0)[:n_windows]
+    if data.ndim > 1:
+        X = np.moveaxis(X, -1, 1)
+    if target.ndim > 1:
+        y = np.moveaxis(y, -1, 1)
+    if stride > 1:
+        X, y = X[::stride], y[::stride]
+
+    if copy:
+        return np.ascontiguousarray(X), np.ascontiguousarray(y)
     return X, y
 
 
@@ -108,52 +162,170 @@ def split_data(
 # ==================== SCALING ====================
 class DataScaler:
     """
-    Class để xử lý scaling dữ liệu
+    Class để xử lý scaling dữ liệu (thuần numpy, không cần sklearn)
 
     Giải thích bằng ví dụ đời sống:
     - Giống như "đổi đơn vị đo" - $50,000 → 0.5 (nếu scale 0-1)
     - Model học nhanh hơn khi số nhỏ và đồng nhất
+
+    Mọi loại scaler đều quy về 1 công thức: scaled = (x - center_) / scale_
+    - minmax:   center_ = min,    scale_ = max - min      → khoảng [0, 1]
+    - standard: center_ = mean,   scale_ = độ lệch chuẩn  → mean 0, std 1
+    - robust:   center_ = median, scale_ = IQR (Q3 - Q1)  → ít bị ảnh hưởng bởi giá đột biến
+
+    Tính năng:
+    - partial_fit: fit dần theo từng khối (dữ liệu lớn / streaming), không cần giữ cả chuỗi
+    - transform(copy=False): scale tại chỗ trên chính mảng float32 (không tạo bản sao)
+    - save/load: lưu tham số ra .json hoặc .npz → process suy luận chỉ cần file này
     """
 
-    def __init__(self, scaler_type: str = "minmax"):
+    SCALER_TYPES = ("minmax", "standard", "robust")
+
+    # Robust (median/IQR) cần giữ mẫu để tính phân vị: tối đa bấy nhiêu dòng
+    # (ít hơn → chính xác tuyệt đối, nhiều hơn → lấy mẫu ngẫu nhiên đều - reservoir sampling)
+    ROBUST_SAMPLE_SIZE = 200_000
+
+    def __init__(self, scaler_type: str = "minmax", dtype: Optional[str] = None):
         """
         Args:
-            scaler_type: "minmax" hoặc "standard"
+            scaler_type: "minmax", "standard" hoặc "robust"
+            dtype: Kiểu dữ liệu đầu ra ("float32"/"float64"). None = giữ kiểu của dữ liệu vào
         """
+        if scaler_type not in self.SCALER_TYPES:
+            raise ValueError(
+                f"Scaler type không hợp lệ: {scaler_type}. "
+                f"Chọn một trong: {list(self.SCALER_TYPES)}."
+            )
+
         self.scaler_type = scaler_type
-        self.scaler = None
+        self.dtype = np.dtype(dtype) if dtype is not None else None
+
+        # Tham số đã fit (dùng trong transform)
+        self.center_: Optional[np.ndarray] = None
+        self.scale_: Optional[np.ndarray] = None
+
+        # Thống kê cộng dồn của partial_fit (float64 để không mất chính xác khi cộng nhiều khối)
+        self.n_samples_seen_ = 0
+        self._min: Optional[np.ndarray] = None
+        self._max: Optional[np.ndarray] = None
+        self._mean: Optional[np.ndarray] = None
+        self._m2: Optional[np.ndarray] = None  # Tổng bình phương độ lệch (thuật toán Chan/Welford)
+        self._sample: Optional[np.ndarray] = None
+        self._rng = np.random.default_rng(0)
+
+    @property
+    def is_fitted(self) -> bool:
+        """Đã fit chưa"""
+        return self.center_ is not None
+
+    def fit(self, data: np.ndarray) -> "DataScaler":
+        """Fit từ đầu trên toàn bộ dữ liệu (bỏ thống kê cũ)"""
+        self._reset()
+        return self.partial_fit(data)
+
+    def partial_fit(self, data: np.ndarray) -> "DataScaler":
+        """
+        Cập nhật thống kê với 1 khối dữ liệu mới (gọi nhiều lần cho dữ liệu lớn)
 
-        if scaler_type == "minmax":
-            self.scaler = MinMaxScaler(feature_range=(0, 1))
-        elif scaler_type == "standard":
-            self.scaler = StandardScaler()
-        else:
+        Kết quả sau nhiều khối = fit 1 lần trên cả chuỗi (robust: xem ROBUST_SAMPLE_SIZE)
+
+        Args:
+            data: Khối dữ liệu (2D array: [n_samples, n_features] hoặc 1D)
+        """
+        block = self._as_2d(data)
+        n = len(block)
+        if n == 0:
+            return self
+        if self.n_samples_seen_ and block.shape[1] != len(self._mean):
             raise ValueError(
-                f"Scaler type không hợp lệ: {scaler_type}. "
-                "Chọn 'minmax' hoặc 'standard'."
+                f"Số features không khớp: đã fit {len(self._mean)}, khối mới có {block.shape[1]}"
             )
 
-    def fit_transform(self, data: np.ndarray) -> np.ndarray:
+        block64 = block.astype(np.float64, copy=False)
+        block_min, block_max = block64.min(axis=0), block64.max(axis=0)
+        block_mean = block64.mean(axis=0)
+        block_m2 = ((block64 - block_mean) ** 2).sum(axis=0)
+
+        if self.n_samples_seen_ == 0:
+            self._min, self._max = block_min, block_max
+            self._mean, self._m2 = block_mean, block_m2
+        else:
+            # Gộp (mean, M2) của 2 phần - Chan et al.
+            total = self.n_samples_seen_ + n
+            delta = block_mean - self._mean
+            self._mean = self._mean + delta * n / total
+            self._m2 = self._m2 + block_m2 + delta ** 2 * self.n_samples_seen_ * n / total
+            self._min = np.minimum(self._min, block_min)
+            self._max = np.maximum(self._max, block_max)
+
+        if self.scaler_type == "robust":
+            self._update_sample(block)
+
+        self.n_samples_seen_ += n
+        self._update_params()
+        return self
+
+    def _update_sample(self, block: np.ndarray) -> None:
+        """Reservoir sampling: giữ tối đa ROBUST_SAMPLE_SIZE dòng, mỗi dòng đã thấy có cùng xác suất"""
+        seen = self.n_samples_seen_
+        capacity = self.ROBUST_SAMPLE_SIZE
+        sample = block[:0] if self._sample is None else self._sample
+
+        free = max(0, capacity - len(sample))
+        sample = np.concatenate([sample, block[:free]])
+        rest = block[free:]
+        if len(rest) > 0:
+            # Dòng thứ i (đếm từ 0 trên cả chuỗi) thay vào vị trí ngẫu nhiên nếu rơi vào [0, capacity)
+            positions = seen + free + np.arange(len(rest))
+            slots = (self._rng.random(len(rest)) * (positions + 1)).astype(np.int64)
+            keep = slots < capacity
+            sample[slots[keep]] = rest[keep]
+        self._sample = sample
+
+    def _update_params(self) -> None:
+        """Tính center_/scale_ từ thống kê hiện có"""
+        if self.scaler_type == "minmax":
+            center, scale = self._min, self._max - self._min
+        elif self.scaler_type == "standard":
+            center, scale = self._mean, np.sqrt(self._m2 / self.n_samples_seen_)
+        else:
+            q1, median, q3 = np.percentile(self._sample.astype(np.float64), [25, 50, 75], axis=0)
+            center, scale = median, q3 - q1
+
+        # Cột hằng số → scale 1 (tránh chia cho 0)
+        scale = np.where(scale == 0, 1.0, scale)
+        self.center_ = center.astype(self._param_dtype())
+        self.scale_ = scale.astype(self._param_dtype())
+
+    def _reset(self) -> None:
+        """Bỏ hết thống kê đã fit"""
+        self.n_samples_seen_ = 0
+        self._min = self._max = self._mean = self._m2 = self._sample = None
+        self.center_ = self.scale_ = None
+
+    def _param_dtype(self) -> np.dtype:
+        """Kiểu của tham số = kiểu đầu ra (float32 → phép scale không nâng lên float64)"""
+        return self.dtype if self.dtype is not None else np.dtype(np.float64)
+
+    def fit_transform(self, data: np.ndarray, copy: bool = True) -> np.ndarray:
         """
         Fit scaler và transform dữ liệu (dùng cho training)
 
         Args:
             data: Dữ liệu đầu vào (2D array: [n_samples, n_features])
+            copy: False → scale tại chỗ (xem transform)
 
         Returns:
             Dữ liệu đã được scale
         """
-        if len(data.shape) == 1:
-            data = data.reshape(-1, 1)
-
-        scaled_data = self.scaler.fit_transform(data)
+        scaled_data = self.fit(data).transform(data, copy=copy)
 
         print(f"Đã fit và transform dữ liệu với {self.scaler_type} scaler")
         print(f"   Min: {scaled_data.min():.4f}, Max: {scaled_data.max():.4f}")
 
         return scaled_data
 
-    def transform(self, data: np.ndarray) -> np.ndarray:
+    def transform(self, data: np.ndarray, copy: bool = True, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Transform dữ liệu (dùng cho validation/test)
 
@@ -161,14 +333,25 @@ class DataScaler:
 
         Args:
             data: Dữ liệu đầu vào
+            copy: False → scale tại chỗ nếu data đã đúng dtype và ghi được
+                (không tốn thêm RAM, data bị ghi đè)
+            out: Mảng (cùng shape 2D) để ghi kết quả vào, thay vì tạo mảng mới
 
         Returns:
             Dữ liệu đã được scale
         """
-        if len(data.shape) == 1:
-            data = data.reshape(-1, 1)
-
-        return self.scaler.transform(data)
+        self._check_fitted()
+        data = self._as_2d(data)
+        if out is not None:
+            # Ghi vào buffer có sẵn (ví dụ 1 buffer dùng lại cho mọi fold walk-forward)
+            np.subtract(data, self.center_, out=out)
+            out /= self.scale_
+            return out
+        if copy or not data.flags.writeable:
+            return (data - self.center_) / self.scale_
+        data -= self.center_
+        data /= self.scale_
+        return data
 
     def inverse_transform(self, data: np.ndarray) -> np.ndarray:
         """
@@ -180,37 +363,417 @@ class DataScaler:
         Returns:
             Dữ liệu gốc
         """
-        if len(data.shape) == 1:
-            data = data.reshape(-1, 1)
+        self._check_fitted()
+        data = self._as_2d(data)
+        if data.shape[1] != len(self.scale_):
+            raise ValueError(
+                f"Dữ liệu có {data.shape[1]} cột nhưng scaler được fit trên {len(self.scale_)} features. "
+                "Giải mã riêng cột target → dùng inverse_transform_column(data, column=target_index)."
+            )
+        return (data * self.scale_ + self.center_).flatten()
 
-        return self.scaler.inverse_transform(data).flatten()
+    def inverse_transform_column(self, data: np.ndarray, column: int = 0) -> np.ndarray:
+        """
+        Transform ngược cho 1 cột (ví dụ cột target) khi scaler được fit trên nhiều features
+
+        Args:
+            data: Giá trị đã scale của cột đó (shape bất kỳ, giữ nguyên shape)
+            column: Vị trí cột trong features lúc fit
+
+        Returns:
+            Giá trị gốc, cùng shape với data
+        """
+        self._check_fitted()
+        data = np.asarray(data, dtype=self.dtype)
+        return data * self.scale_[column] + self.center_[column]
+
+    def _check_fitted(self) -> None:
+        if not self.is_fitted:
+            raise RuntimeError("Scaler chưa được fit. Gọi fit()/partial_fit() hoặc load() trước.")
+
+    def _as_2d(self, data: np.ndarray) -> np.ndarray:
+        """Đưa về 2D + đúng dtype (đã đúng dtype thì không copy)"""
+        data = np.asarray(data, dtype=self.dtype)
+        if data.ndim == 1:
+            data = data.reshape(-1, 1)
+        return data
 
     def get_params(self) -> Dict:
-        """Lấy params của scaler"""
-        if hasattr(self.scaler, 'data_min_'):
-            return {
-                "scaler_type": self.scaler_type,
-                "data_min_": self.scaler.data_min_.tolist(),
-                "data_max_": self.scaler.data_max_.tolist(),
-                "data_range_": self.scaler.data_range_.tolist(),
-            }
-        elif hasattr(self.scaler, 'mean_'):
-            return {
-                "scaler_type": self.scaler_type,
-                "mean_": self.scaler.mean_.tolist(),
-                "scale_": self.scaler.scale_.tolist(),
-            }
-        return {"scaler_type": self.scaler_type}
+        """Lấy params của scaler (JSON-serializable, đủ để dựng lại bằng from_params)"""
+        params = {"scaler_type": self.scaler_type}
+        if not self.is_fitted:
+            return params
+
+        params.update({
+            "center_": self.center_.tolist(),
+            "scale_": self.scale_.tolist(),
+            "n_samples_seen_": int(self.n_samples_seen_),
+        })
+        if self.scaler_type == "minmax":
+            params.update({"data_min_": self._min.tolist(), "data_max_": self._max.tolist()})
+        elif self.scaler_type == "standard":
+            params.update({"mean_": self._mean.tolist(), "var_": (self._m2 / self.n_samples_seen_).tolist()})
+        return params
+
+    @classmethod
+    def from_params(cls, params: Dict, dtype: Optional[str] = None) -> "DataScaler":
+        """
+        Dựng lại scaler đã fit từ get_params() (không cần fit lại trên dữ liệu)
+
+        Scaler dựng lại dùng được ngay cho transform/inverse_transform. partial_fit tiếp
+        được với minmax/standard (robust cần mẫu dữ liệu gốc → không lưu).
+
+        Args:
+            params: Kết quả get_params()
+            dtype: Như __init__ (tham số được khôi phục đúng kiểu này)
+        """
+        scaler = cls(scaler_type=params["scaler_type"], dtype=dtype)
+
+        if "center_" in params:
+            center, scale = params["center_"], params["scale_"]
+        elif scaler.scaler_type == "minmax":
+            # Params cũ (bản dùng sklearn): data_min_/data_range_
+            center, scale = params["data_min_"], params["data_range_"]
+        else:
+            center, scale = params["mean_"], params["scale_"]
+        scaler.center_ = np.asarray(center, dtype=scaler._param_dtype())
+        scaler.scale_ = np.asarray(scale, dtype=scaler._param_dtype())
+
+        # Khôi phục thống kê cộng dồn (cho partial_fit tiếp)
+        n = int(params.get("n_samples_seen_", 0))
+        if n and scaler.scaler_type == "minmax":
+            scaler._min = np.asarray(params["data_min_"], dtype=np.float64)
+            scaler._max = np.asarray(params["data_max_"], dtype=np.float64)
+            scaler._mean = np.zeros_like(scaler._min)
+            scaler._m2 = np.zeros_like(scaler._min)
+            scaler.n_samples_seen_ = n
+        elif n and scaler.scaler_type == "standard":
+            scaler._mean = np.asarray(params["mean_"], dtype=np.float64)
+            scaler._m2 = np.asarray(params["var_"], dtype=np.float64) * n
+            scaler._min = np.full_like(scaler._mean, np.inf)
+            scaler._max = np.full_like(scaler._mean, -np.inf)
+            scaler.n_samples_seen_ = n
+        return scaler
+
+    def save(self, path: Path) -> Path:
+        """
+        Lưu scaler đã fit ra file (.json hoặc .npz, theo đuôi file)
+
+        Ghi file tạm + os.replace → không để lại file ghi dở
+        """
+        self._check_fitted()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.stem}.tmp{os.getpid()}{path.suffix}")
+
+        params = self.get_params()
+        if path.suffix == ".npz":
+            np.savez(
+                tmp_path,
+                **{k: np.asarray(v) for k, v in params.items()},
+                dtype=np.asarray(self._param_dtype().name)
+            )
+        else:
+            with open(tmp_path, "w") as f:
+                json.dump({**params, "dtype": self._param_dtype().name}, f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "DataScaler":
+        """Đọc scaler đã lưu bằng save() (không cần dữ liệu train)"""
+        path = Path(path)
+        if path.suffix == ".npz":
+            with np.load(path) as f:
+                params = {k: f[k].tolist() for k in f.files}
+        else:
+            with open(path) as f:
+                params = json.load(f)
+        return cls.from_params(params, dtype=params.pop("dtype", None))
+
+
+# ==================== PREPARED DATASET CACHE ====================
+# Chuỗi đã scale của train/val/test + tham số scaler, lưu theo hash (dữ liệu + config)
+# → windows dựng lại bằng create_windows (zero-copy view trên file .npy memory-map)
+PREPARED_SPLITS = ("train", "val", "test")
+
+
+def prepared_cache_key(feature_data: np.ndarray, config: Dict) -> str:
+    """
+    Hash của (nội dung feature matrix + config tiền xử lý)
+
+    Hash đúng bytes dữ liệu (không dựa vào tên file/limit) → dữ liệu đổi 1 giá trị
+    là ra key khác, không bao giờ dùng nhầm cache cũ
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps(config, sort_keys=True).encode())
+    h.update(str(feature_data.shape).encode())
+    h.update(np.ascontiguousarray(feature_data).data)
+    return h.hexdigest()
+
+
+def _load_prepared(cache_dir: Path, key: str, dtype: str) -> Optional[Tuple[List[np.ndarray], DataScaler]]:
+    """Đọc chuỗi đã scale (memory-map) + scaler từ cache (None nếu chưa có/hỏng)"""
+    entry = cache_dir / key
+    try:
+        with open(entry / "meta.json") as f:
+            meta = json.load(f)
+        series = [np.load(entry / f"{split}.npy", mmap_mode="r") for split in PREPARED_SPLITS]
+    except (OSError, ValueError):
+        return None
+    record_access(entry)
+    return series, DataScaler.from_params(meta["scaler"], dtype=dtype)
+
+
+def _save_prepared(cache_dir: Path, key: str, series: List[np.ndarray], scaler: DataScaler, config: Dict) -> None:
+    """Ghi cache vào thư mục tạm rồi đổi tên (không để lại entry ghi dở)"""
+    entry = cache_dir / key
+    tmp_entry = cache_dir / f"{key}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_entry, ignore_errors=True)
+    tmp_entry.mkdir(parents=True)
+
+    for split, data in zip(PREPARED_SPLITS, series):
+        np.save(tmp_entry / f"{split}.npy", np.ascontiguousarray(data))
+    with open(tmp_entry / "meta.json", "w") as f:
+        json.dump({
+            "config": config,
+            "scaler": scaler.get_params(),
+            "rows": [len(data) for data in series],
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+        }, f, indent=2)
+
+    try:
+        os.replace(tmp_entry, entry)
+    except OSError:
+        # Process khác vừa ghi cùng key (cùng nội dung) → bỏ bản của mình
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+    record_access(entry)
+
+
+# ==================== WALK-FORWARD ====================
+@dataclass(frozen=True)
+class Fold:
+    """
+    1 fold walk-forward = các khoảng dòng [start, end) trên chuỗi gốc
+
+    Khoảng là dòng TARGET (dòng được dự đoán): window của val/test được nhìn lại
+    window_size dòng trước đó (quá khứ đã biết), nhưng target không bao giờ trùng nhau.
+    gap (embargo) = số dòng bỏ trống giữa train → val và val → test
+    """
+
+    index: int
+    train_start: int
+    train_end: int
+    val_start: int
+    val_end: int
+    test_start: int
+    test_end: int
+
+    @property
+    def train(self) -> slice:
+        return slice(self.train_start, self.train_end)
+
+    @property
+    def val(self) -> slice:
+        return slice(self.val_start, self.val_end)
+
+    @property
+    def test(self) -> slice:
+        return slice(self.test_start, self.test_end)
+
+    def __str__(self) -> str:
+        return (
+            f"Fold {self.index}: train [{self.train_start}, {self.train_end}) "
+            f"val [{self.val_start}, {self.val_end}) test [{self.test_start}, {self.test_end})"
+        )
+
+
+def walk_forward_splits(
+    n_rows: int,
+    n_folds: int = 5,
+    val_size: Optional[int] = None,
+    test_size: Optional[int] = None,
+    gap: int = 0,
+    train_size: Optional[int] = None,
+    expanding: bool = True
+) -> List[Fold]:
+    """
+    Chia chuỗi thành các fold walk-forward (chỉ tính index, không đụng tới dữ liệu)
+
+    Giải thích bằng ví dụ đời sống:
+    - Giống như "thi thử nhiều đợt" - học tới tháng 3 thi tháng 4, học tới tháng 4 thi tháng 5...
+    - Mỗi đợt chỉ được học phần TRƯỚC đề thi → đánh giá đúng như khi chạy thật
+
+    Bố cục mỗi fold (test các fold nối tiếp nhau, fold cuối kết thúc ở cuối chuỗi):
+        [train] gap [val] gap [test]
+    - expanding=True: train luôn bắt đầu từ dòng 0 (càng về sau học càng nhiều)
+    - expanding=False: train trượt, dài đúng train_size dòng
+
+    Args:
+        n_rows: Số dòng của chuỗi gốc
+        n_folds: Số fold
+        val_size: Số dòng val mỗi fold (None = bằng test_size)
+        test_size: Số dòng test mỗi fold (None = n_rows // (n_folds + 3))
+        gap: Số dòng embargo giữa các phần
+        train_size: Số dòng train (bắt buộc khi expanding=False)
+        expanding: Train mở rộng (True) hay cửa sổ trượt (False)
+
+    Returns:
+        List Fold, theo thứ tự thời gian
+
+    Raises:
+        ValueError: Không đủ dòng cho fold đầu tiên
+    """
+    if n_folds < 1:
+        raise ValueError(f"n_folds phải >= 1, nhận được: {n_folds}")
+    if test_size is None:
+        test_size = n_rows // (n_folds + 3)
+    if val_size is None:
+        val_size = test_size
+    if not expanding and not train_size:
+        raise ValueError("expanding=False cần train_size")
+
+    folds = []
+    for k in range(n_folds):
+        test_end = n_rows - (n_folds - 1 - k) * test_size
+        test_start = test_end - test_size
+        val_end = test_start - gap
+        val_start = val_end - val_size
+        train_end = val_start - gap
+        train_start = 0 if expanding else train_end - train_size
+        if train_start < 0 or train_end <= train_start or val_size <= 0 or test_size <= 0:
+            raise ValueError(
+                f"Không đủ dữ liệu cho {n_folds} fold: {n_rows} dòng, "
+                f"val {val_size}, test {test_size}, gap {gap}, train {train_size or 'mở rộng'}"
+            )
+        folds.append(Fold(k, train_start, train_end, val_start, val_end, test_start, test_end))
+    return folds
+
+
+def fold_windows(
+    series: np.ndarray,
+    fold: Fold,
+    window_size: int,
+    predict_steps: int = 1,
+    target_index: int = 0,
+    stride: int = 1
+) -> Dict[str, np.ndarray]:
+    """
+    X/y của train/val/test trong 1 fold - toàn bộ là view trên `series` (không copy)
+
+    Window thuộc 1 phần khi MỌI target của nó nằm trong khoảng của phần đó
+    → vị trí bắt đầu window liên tục → X_all[s0:s1] vẫn là view
+
+    Args:
+        series: Chuỗi đã scale (cả chuỗi, không cắt theo fold)
+        fold: Fold từ walk_forward_splits
+        window_size, predict_steps, target_index: Như create_windows
+        stride: Chỉ áp dụng cho train
+    """
+    X_all, y_all = create_windows(series, window_size, predict_steps, target_index=target_index)
+
+    def _starts(rows: slice) -> slice:
+        # Window bắt đầu ở s dự đoán dòng [s + window_size, s + window_size + predict_steps)
+        first = max(0, rows.start - window_size)
+        last = max(first, rows.stop - window_size - predict_steps + 1)
+        return slice(first, min(last, len(X_all)))
+
+    train, val, test = _starts(fold.train), _starts(fold.val), _starts(fold.test)
+    train = slice(train.start, train.stop, stride)
+    return {
+        "X_train": X_all[train], "y_train": y_all[train],
+        "X_val": X_all[val], "y_val": y_all[val],
+        "X_test": X_all[test], "y_test": y_all[test],
+    }
+
+
+def iter_walk_forward(
+    feature_data: np.ndarray,
+    folds: List[Fold],
+    window_size: int,
+    predict_steps: int = 1,
+    scaler_type: str = "minmax",
+    dtype: str = "float32",
+    target_index: int = 0,
+    stride: int = 1
+) -> Iterator[Tuple[Fold, DataScaler, Dict[str, np.ndarray]]]:
+    """
+    Duyệt các fold: fit scaler trên đoạn train của fold, scale cả chuỗi vào 1 buffer dùng chung
+
+    Bộ nhớ: đúng 1 chuỗi đã scale (n × n_features) cho mọi fold - fold sau ghi đè buffer
+    của fold trước. Windows của 1 fold chỉ hợp lệ tới khi lấy fold kế tiếp
+    (cần giữ lại → copy, hoặc dùng scaler trả về để scale lại).
+
+    Scaler chỉ thấy dữ liệu train của fold → không rò rỉ thông tin val/test vào scaling
+
+    Args:
+        feature_data: Dữ liệu gốc chưa scale (shape: [n_rows, n_features])
+        folds: Kết quả walk_forward_splits
+        window_size, predict_steps, target_index, stride: Như fold_windows
+        scaler_type, dtype: Như DataScaler
+
+    Yields:
+        (fold, scaler đã fit cho fold, dict X_*/y_* như prepare_data_for_lstm)
+    """
+    raw = np.asarray(feature_data, dtype=dtype)
+    raw = raw.reshape(-1, 1) if raw.ndim == 1 else raw
+    scaled = np.empty_like(raw)
+
+    for fold in folds:
+        scaler = DataScaler(scaler_type=scaler_type, dtype=dtype).fit(raw[fold.train])
+        scaler.transform(raw, out=scaled)
+        yield fold, scaler, fold_windows(scaled, fold, window_size, predict_steps, target_index, stride)
 
 
 # ==================== COMPLETE PIPELINE ====================
+def feature_matrix(
+    df: pl.DataFrame,
+    features: Optional[List[str]] = None,
+    target: Optional[str] = None,
+    dtype: str = "float32"
+) -> Tuple[np.ndarray, List[str], int]:
+    """
+    Lấy ma trận features (chưa scale) từ DataFrame
+
+    Cast ngay trong polars → to_numpy không tạo bản float64 trung gian
+
+    Args:
+        df: DataFrame với các cột features
+        features: List features (None = ["close"])
+        target: Cột cần dự đoán (None = feature đầu tiên, không có trong features → thêm vào đầu)
+        dtype: float32 / float64
+
+    Returns:
+        (feature_data [n_rows, n_features], features, target_index)
+    """
+    if features is None:
+        features = ["close"]
+    if target is None:
+        target = features[0]
+    elif target not in features:
+        features = [target] + list(features)
+    features = list(features)
+
+    np_dtype = np.dtype(dtype)
+    if np_dtype.name not in _POLARS_DTYPES:
+        raise ValueError(f"dtype không hỗ trợ: {dtype}. Chọn một trong: {list(_POLARS_DTYPES)}")
+    feature_data = df.select(pl.col(features).cast(_POLARS_DTYPES[np_dtype.name])).to_numpy()
+    return feature_data, features, features.index(target)
+
+
 def prepare_data_for_lstm(
     df: pl.DataFrame,
     features: List[str] = None,
     window_size: int = 60,
     scaler_type: str = "minmax",
     train_ratio: float = 0.7,
-    val_ratio: float = 0.15
+    val_ratio: float = 0.15,
+    dtype: str = "float32",
+    predict_steps: int = 1,
+    cache_dir: Optional[Path] = None,
+    stride: int = 1,
+    target: Optional[str] = None,
+    cache_max_mb: Optional[int] = None
 ) -> Dict:
     """
     Pipeline hoàn chỉnh để chuẩn bị dữ liệu cho LSTM
@@ -226,49 +789,133 @@ def prepare_data_for_lstm(
         scaler_type: Loại scaler
         train_ratio: Tỷ lệ train
         val_ratio: Tỷ lệ validation
+        dtype: Kiểu dữ liệu xuyên suốt (lấy từ polars, scale, windows).
+            float32 = đúng kiểu Keras dùng → nửa RAM, không phải đổi kiểu mỗi epoch
+        predict_steps: Số bước dự đoán
+        cache_dir: Thư mục cache dữ liệu đã chuẩn bị (None = không cache).
+            Cùng dữ liệu + cùng config → đọc lại chuỗi đã scale, bỏ qua fit scaler/split
+        stride: Khoảng cách giữa 2 window train liên tiếp (val/test luôn lấy mọi vị trí
+            để đánh giá đầy đủ). Không ảnh hưởng cache (cache lưu chuỗi, không lưu windows)
+        target: Cột cần dự đoán (None = feature đầu tiên). Không có trong features → thêm vào đầu.
+            y chỉ chứa cột này; giải mã dự đoán bằng scaler.inverse_transform_column(..., target_index)
+        cache_max_mb: Budget dung lượng cả thư mục cache (thư mục cha của cache_dir = {cache}/prepared),
+            tính chung với cache dữ liệu. Vượt → xoá entry ít dùng gần đây nhất (LRU). None = không giới hạn
 
     Returns:
         Dictionary chứa tất cả dữ liệu đã chuẩn bị
+        (y_*: shape [n_windows, predict_steps] - giá trị target của từng horizon;
+        target/target_index: cột target và vị trí của nó trong features)
     """
-    if features is None:
-        features = ["close"]
-    
     print("\n" + "=" * 70)
     print("CHUẨN BỊ DỮ LIỆU CHO LSTM")
     print("=" * 70 + "\n")
 
     # 1. Lấy features từ DataFrame
-    feature_data = df.select(features).to_numpy()
+    feature_data, features, target_index = feature_matrix(df, features, target, dtype)
+    target = features[target_index]
+    np_dtype = feature_data.dtype
 
-    print(f"Shape dữ liệu gốc: {feature_data.shape}")
+    print(f"Shape dữ liệu gốc: {feature_data.shape} ({feature_data.dtype})")
     print(f"   Features: {features}")
+    print(f"   Target: {target} (cột {target_index})")
+
+    # Cache chỉ lưu chuỗi đã scale → key không phụ thuộc window_size/predict_steps
+    # (mọi window dùng chung 1 entry)
+    prep_config = {
+        "features": list(features),
+        "scaler_type": scaler_type,
+        "train_ratio": train_ratio,
+        "val_ratio": val_ratio,
+        "dtype": np_dtype.name,
+    }
+    cached = None
+    if cache_dir is not None:
+        cache_dir = Path(cache_dir)
+        key = prepared_cache_key(feature_data, prep_config)
+        cached = _load_prepared(cache_dir, key, np_dtype.name)
+
+    if cached is not None:
+        (train_data, val_data, test_data), scaler = cached
+        print(f"Dùng dữ liệu đã chuẩn bị từ cache: {cache_dir / key}")
+        print(f"   Train/Val/Test: {len(train_data)}/{len(val_data)}/{len(test_data)} mẫu")
+    else:
+        # 2. Scaling
+        scaler = DataScaler(scaler_type=scaler_type, dtype=np_dtype.name)
+        # feature_data là bản riêng vừa lấy từ polars (key cache đã tính ở trên) → scale tại chỗ
+        scaled_data = scaler.fit_transform(feature_data, copy=False)
+
+        # 3. Chia train/val/test (TRƯỚC khi tạo windows!)
+        train_data, val_data, test_data = split_data(scaled_data, train_ratio, val_ratio)
+
+        if cache_dir is not None:
+            _save_prepared(cache_dir, key, [train_data, val_data, test_data], scaler, prep_config)
+            print(f"Đã lưu dữ liệu đã chuẩn bị vào cache: {cache_dir / key}")
+
+    if cache_dir is not None and cache_max_mb:
+        enforce_cache_budget(cache_dir.parent, cache_max_mb * 1024 * 1024, keep=[f"{PREPARED_CACHE_DIR}/{key}"])
+
+    prepared = {
+        # Chuỗi đã scale của từng phần (cho WindowDataset - sinh windows theo batch)
+        "train_series": train_data,
+        "val_series": val_data,
+        "test_series": test_data,
+        "scaler": scaler,
+        "features": list(features),
+        "target": target,
+        "target_index": target_index,
+    }
+
+    # 4. Tạo windows (view, không copy)
+    return with_windows(prepared, window_size, predict_steps, stride=stride)
+
+
+def with_windows(
+    prepared: Dict,
+    window_size: int,
+    predict_steps: int = 1,
+    stride: int = 1
+) -> Dict:
+    """
+    Tạo (lại) X_*/y_* cho 1 window_size từ chuỗi đã scale của prepare_data_for_lstm
+
+    Giải thích bằng ví dụ đời sống:
+    - Giống như "đổi khung ảnh" - cùng 1 bức ảnh (chuỗi đã scale), chỉ đổi kích cỡ khung nhìn
+    - Sweep nhiều window_size chỉ load + scale 1 lần, mỗi window là 1 view mới trên cùng buffer
 
-    # 2. Scaling
-    scaler = DataScaler(scaler_type=scaler_type)
-    scaled_data = scaler.fit_transform(feature_data)
+    y[i] = predict_steps giá trị kế tiếp của riêng cột target → 1 lần forward
+    dự đoán cả H bước (multi-horizon), vẫn là view trên chuỗi đã scale
 
-    # 3. Chia train/val/test (TRƯỚC khi tạo windows!)
-    train_data, val_data, test_data = split_data(scaled_data, train_ratio, val_ratio)
+    Args:
+        prepared: Kết quả prepare_data_for_lstm (cần *_series, target_index)
+        window_size, predict_steps: Như create_windows
+        stride: Như create_windows (chỉ áp dụng cho train)
 
-    # 4. Tạo windows
-    X_train, y_train = create_windows(train_data, window_size)
-    X_val, y_val = create_windows(val_data, window_size)
-    X_test, y_test = create_windows(test_data, window_size)
+    Returns:
+        Dict mới: các key của prepared + X_*/y_* theo window_size (chuỗi/scaler dùng chung)
+    """
+    target_index = prepared["target_index"]
+    X_train, y_train = create_windows(
+        prepared["train_series"], window_size, predict_steps, stride=stride, target_index=target_index
+    )
+    X_val, y_val = create_windows(prepared["val_series"], window_size, predict_steps, target_index=target_index)
+    X_test, y_test = create_windows(prepared["test_series"], window_size, predict_steps, target_index=target_index)
 
-    print("\nDữ liệu sau khi tạo windows:")
+    print(f"\nDữ liệu sau khi tạo windows (window_size={window_size}):")
+    if stride > 1:
+        print(f"   Stride train: {stride} (lấy 1 window mỗi {stride} vị trí)")
     print(f"   X_train: {X_train.shape}, y_train: {y_train.shape}")
     print(f"   X_val:   {X_val.shape}, y_val: {y_val.shape}")
     print(f"   X_test:  {X_test.shape}, y_test: {y_test.shape}")
     print("")
 
     return {
+        **prepared,
         "X_train": X_train,
         "y_train": y_train,
         "X_val": X_val,
         "y_val": y_val,
         "X_test": X_test,
         "y_test": y_test,
-        "scaler": scaler,
     }
 
 
@@ -0,0 +1,133 @@
+"""
+RESAMPLE MODULE - GỘP NẾN SANG TIMEFRAME LỚN HƠN
+------------------------------------------------------
+
+Giải thích bằng ví dụ đời sống:
+- Giống như "gộp sổ chi tiêu theo ngày thành sổ theo tuần"
+- Có nến 15m → tự gộp ra nến 1h/4h/1d, không cần export từng file riêng
+
+Quy tắc gộp OHLCV (chuẩn sàn giao dịch):
+- open: giá mở của nến đầu tiên trong khung
+- high: giá cao nhất trong khung
+- low: giá thấp nhất trong khung
+- close: giá đóng của nến cuối cùng trong khung
+- volume: tổng volume trong khung
+
+Trách nhiệm (SoC - Separation of Concerns):
+- Chỉ gộp nến, không đọc/ghi file (việc đó của data.py)
+"""
+
+from typing import Optional
+
+import polars as pl
+
+
+# Timeframe hỗ trợ → số phút (dùng để so sánh "mịn hơn"/"thô hơn")
+TIMEFRAME_MINUTES = {
+    "1m": 1,
+    "3m": 3,
+    "5m": 5,
+    "15m": 15,
+    "30m": 30,
+    "1h": 60,
+    "2h": 120,
+    "4h": 240,
+    "6h": 360,
+    "12h": 720,
+    "1d": 1440,
+}
+
+
+def timeframe_minutes(timeframe: str) -> int:
+    """Số phút của 1 nến (ValueError nếu timeframe không hỗ trợ)"""
+    tf = (timeframe or "").lower()
+    if tf not in TIMEFRAME_MINUTES:
+        raise ValueError(
+            f"Timeframe không hỗ trợ: {timeframe}. "
+            f"Chọn một trong: {list(TIMEFRAME_MINUTES)}"
+        )
+    return TIMEFRAME_MINUTES[tf]
+
+
+def can_resample(source_timeframe: str, target_timeframe: str) -> bool:
+    """Có gộp được từ source sang target không (target thô hơn và chia hết)"""
+    src = timeframe_minutes(source_timeframe)
+    dst = timeframe_minutes(target_timeframe)
+    return dst > src and dst % src == 0
+
+
+def resample_ohlcv(
+    df: pl.DataFrame,
+    timeframe: str,
+    source_timeframe: Optional[str] = None,
+    drop_incomplete: bool = True
+) -> pl.DataFrame:
+    """
+    Gộp nến OHLCV sang timeframe lớn hơn bằng polars group_by_dynamic
+
+    Args:
+        df: DataFrame đã chuẩn hoá (datetime, open, high, low, close, volume), đã sort
+        timeframe: Timeframe đích (ví dụ "1h", "4h", "1d")
+        source_timeframe: Timeframe gốc (để phát hiện nến đầu/cuối chưa đủ)
+        drop_incomplete: Bỏ nến đầu/cuối nếu chưa đủ số nến con (dữ liệu bắt đầu giữa khung
+            → open sai; khung cuối đang chạy dở → close sai). Nến ở giữa thiếu nến con
+            (sàn bảo trì) vẫn giữ để chuỗi không bị thủng
+
+    Returns:
+        DataFrame cùng schema, mỗi dòng là 1 nến của timeframe đích
+
+    Ví dụ:
+        4 nến 15m: 00:00, 00:15, 00:30, 00:45 → 1 nến 1h lúc 00:00
+        open = open(00:00), close = close(00:45), high/low = max/min, volume = tổng
+    """
+    minutes = timeframe_minutes(timeframe)
+
+    out = (
+        df.lazy()
+        .sort("datetime")
+        .group_by_dynamic("datetime", every=f"{minutes}m", closed="left", label="left")
+        .agg([
+            pl.col("open").first(),
+            pl.col("high").max(),
+            pl.col("low").min(),
+            pl.col("close").last(),
+            pl.col("volume").sum(),
+            pl.len().alias("_n_bars"),
+        ])
+        .collect()
+    )
+
+    # Nến đầu có thể thiếu phần mở (vd file 15m bắt đầu lúc 00:15 → open nến 1h 00:00 sai),
+    # nến cuối có thể chưa đóng (vd file 15m dừng lúc 10:30 → nến 1d hôm đó chưa đủ)
+    if drop_incomplete and source_timeframe is not None and len(out) > 0:
+        expected = minutes // timeframe_minutes(source_timeframe)
+        n_bars = out.get_column("_n_bars")
+        first = 1 if n_bars[0] < expected else 0
+        last = len(out) - 1 if n_bars[-1] < expected else len(out)
+        out = out.slice(first, max(0, last - first))
+
+    return out.drop("_n_bars")
+
+
+if __name__ == "__main__":
+    # Test
+    import numpy as np
+
+    dates = pl.datetime_range(
+        pl.datetime(2024, 1, 1),
+        pl.datetime(2024, 1, 2, 10, 30),
+        interval="15m",
+        eager=True
+    )
+    close = np.random.randn(len(dates)).cumsum() + 40000
+    df = pl.DataFrame({
+        "datetime": dates,
+        "open": close,
+        "high": close + 10,
+        "low": close - 10,
+        "close": close,
+        "volume": np.ones(len(dates)),
+    })
+
+    print(resample_ohlcv(df, "1h", source_timeframe="15m").head())
+    print(resample_ohlcv(df, "1d", source_timeframe="15m"))
@@ -15,30 +15,39 @@ Flow:
 5. STEP 5: Evaluate & visualize
 6. STEP 6: Save results
 
+Sweep window_size (run_window_sweep): STEP 1-2 chạy 1 lần, STEP 3-6 chạy cho từng window
+
 Trách nhiệm (SoC):
 - Orchestrate toàn bộ process
 - Không chứa logic cụ thể (logic ở các module khác)
 """
 
-from typing import Dict, Optional
+import dataclasses
+from typing import Dict, List, Optional
 
 # Import từ các module khác
 from .config import Config
 from .runtime import configure_tensorflow_runtime, print_tensorflow_info, set_random_seed
 from .core import (
+    PREPARED_CACHE_DIR,
     fetch_binance_data,
     prepare_data_for_lstm,
-    build_bilstm_model,
+    with_windows,
+    MODEL_NAMES,
+    build_model,
     print_model_summary,
     evaluate_model,
     print_sample_predictions,
     calculate_direction_accuracy,
+    symbol_to_pair,
+    make_window_datasets,
 )
 from .training import train_model
 from .visualization import (
     plot_training_history,
     plot_predictions,
     plot_all_in_one,
+    plot_horizon_metrics,
 )
 from .results import (
     create_results_folder,
@@ -70,6 +79,92 @@ def run_pipeline(config: Optional[Config] = None, run_type: str = "main") -> Dic
         config = Config()
 
     # 2. Setup runtime
+    setup_runtime(config)
+
+    # 3. STEP 1-2: Load + xử lý dữ liệu
+    data_info = load_data(config)
+    data_dict = prepare_data(config, data_info["df"])
+
+    # 4. STEP 3-6: Model → train → đánh giá → lưu
+    return train_and_report(config, data_dict, data_info, run_type=run_type)
+
+
+def run_window_sweep(configs: List[Config], run_type: str = "sweep") -> List[Dict]:
+    """
+    Chạy nhiều window_size trên cùng 1 lần load + scale dữ liệu
+
+    Giải thích bằng ví dụ đời sống:
+    - Giống như "thử nhiều cỡ khuôn trên cùng 1 mẻ bột" - nhào bột 1 lần, mỗi khuôn chỉ tốn công nướng
+    - run_pipeline cho từng window → load CSV + scale lại mỗi lần
+    - Sweep: load + scale 1 lần, mỗi window chỉ là 1 view mới (with_windows) trên cùng buffer
+      → mỗi cấu hình chỉ trả chi phí train
+
+    Args:
+        configs: Các cấu hình, chỉ được khác nhau ở preprocessing.window_size
+                 (và model/training); data + phần còn lại của preprocessing phải giống nhau
+        run_type: Loại chạy (tiền tố folder kết quả)
+
+    Returns:
+        List kết quả của từng window (giống run_pipeline), theo thứ tự configs
+
+    Raises:
+        ValueError: configs rỗng hoặc khác nhau ở phần dữ liệu dùng chung
+    """
+    if not configs:
+        raise ValueError("Cần ít nhất 1 config cho sweep")
+
+    base = configs[0]
+    shared_data = dataclasses.asdict(base.data)
+    shared_prep = {**dataclasses.asdict(base.preprocessing), "window_size": None}
+    for config in configs[1:]:
+        if dataclasses.asdict(config.data) != shared_data:
+            raise ValueError("Sweep cần mọi config dùng chung config.data")
+        if {**dataclasses.asdict(config.preprocessing), "window_size": None} != shared_prep:
+            raise ValueError("Sweep chỉ cho phép khác nhau preprocessing.window_size")
+
+    windows = [config.preprocessing.window_size for config in configs]
+    print(f"Sweep window_size: {windows} (load + scale 1 lần)")
+
+    # STEP 1-2: 1 lần cho cả sweep
+    setup_runtime(base)
+    data_info = load_data(base)
+    prepared = prepare_data(base, data_info["df"])
+
+    # STEP 3-6: mỗi window chỉ tạo view mới + train
+    results = []
+    for i, config in enumerate(configs, 1):
+        print("\n" + "#" * 70)
+        print(f"SWEEP {i}/{len(configs)}: window_size = {config.preprocessing.window_size}")
+        print("#" * 70)
+
+        # Mỗi lần train bắt đầu từ cùng seed → kết quả giống chạy run_pipeline riêng lẻ
+        set_random_seed(config.runtime.seed, deterministic=True)
+        data_dict = with_windows(
+            prepared,
+            config.preprocessing.window_size,
+            config.preprocessing.predict_steps,
+            stride=config.preprocessing.stride
+        )
+        results.append(train_and_report(config, data_dict, data_info, run_type=run_type))
+
+    print("\n" + "=" * 70)
+    print("TỔNG KẾT SWEEP")
+    print("=" * 70)
+    print(f"{'Window':<10}{'Best val loss':<16}{'MAE':<14}{'Train (s)':<12}")
+    for config, result in zip(configs, results):
+        print(
+            f"{config.preprocessing.window_size:<10}"
+            f"{result['config']['best_val_loss']:<16.6f}"
+            f"{result['metrics']['mae']:<14.2f}"
+            f"{result['config']['train_seconds']:<12.2f}"
+        )
+    print("=" * 70 + "\n")
+
+    return results
+
+
+def setup_runtime(config: Config) -> None:
+    """Seed + cấu hình TensorFlow runtime theo config.runtime"""
     set_random_seed(config.runtime.seed, deterministic=True)
     configure_tensorflow_runtime(
         intra_op_threads=config.runtime.intra_op_threads,
@@ -79,7 +174,14 @@ def run_pipeline(config: Optional[Config] = None, run_type: str = "main") -> Dic
     )
     print_tensorflow_info()
 
-    # 3. STEP 1: LOAD DATA
+
+def load_data(config: Config) -> Dict:
+    """
+    STEP 1: Load dữ liệu theo config.data
+
+    Returns:
+        Dictionary chứa df + thông tin dữ liệu (data_file, data_rows, data_start, data_end)
+    """
     print("\n" + "=" * 70)
     print("BƯỚC 1: LOAD DỮ LIỆU")
     print("=" * 70 + "\n")
@@ -89,11 +191,20 @@ def run_pipeline(config: Optional[Config] = None, run_type: str = "main") -> Dic
     print(f"Timeframe: {config.data.timeframe}\n")
 
     df = fetch_binance_data(
-        data_path=str(data_file),
+        data_path=config.data.data_path,
+        data_dir=config.paths.data_dir,
+        symbol=config.data.symbol,
         timeframe=config.data.timeframe,
         limit=config.data.limit,
         save_cache=not config.data.refresh_cache,
-        cache_dir=config.paths.cache_dir
+        cache_dir=config.paths.cache_dir,
+        cache_format=config.data.cache_format,
+        incremental=config.data.incremental_cache,
+        features=config.data.get_features(),
+        start=config.data.start,
+        end=config.data.end,
+        memory_limit_mb=config.data.memory_limit_mb,
+        cache_max_mb=config.data.cache_max_mb
     )
 
     data_rows = len(df)
@@ -106,20 +217,66 @@ def run_pipeline(config: Optional[Config] = None, run_type: str = "main") -> Dic
     except Exception:
         data_start, data_end = None, None
 
-    # 4. STEP 2: PREPROCESS DATA
+    return {
+        "df": df,
+        "data_file": data_file,
+        "data_rows": data_rows,
+        "data_start": data_start,
+        "data_end": data_end,
+    }
+
+
+def prepare_data(config: Config, df) -> Dict:
+    """
+    STEP 2: Scale + chia + tạo windows theo config.preprocessing
+
+    Returns:
+        Kết quả prepare_data_for_lstm
+    """
     print("\n" + "=" * 70)
     print("BƯỚC 2: XỬ LÝ DỮ LIỆU")
     print("=" * 70 + "\n")
 
     data_dict = prepare_data_for_lstm(
         df=df,
-        features=config.data.features,
+        features=config.data.get_features(),
         window_size=config.preprocessing.window_size,
         scaler_type=config.preprocessing.scaler_type,
         train_ratio=config.preprocessing.train_ratio,
-        val_ratio=config.preprocessing.val_ratio
+        val_ratio=config.preprocessing.val_ratio,
+        dtype=config.preprocessing.dtype,
+        predict_steps=config.preprocessing.predict_steps,
+        stride=config.preprocessing.stride,
+        target=config.data.target,
+        cache_dir=(
+            config.paths.cache_dir / PREPARED_CACHE_DIR
+            if config.preprocessing.cache_prepared and not config.data.refresh_cache else None
+        ),
+        cache_max_mb=config.data.cache_max_mb
     )
 
+    return data_dict
+
+
+def train_and_report(config: Config, data_dict: Dict, data_info: Dict, run_type: str = "main") -> Dict:
+    """
+    STEP 3-6: Build model → train → đánh giá → lưu kết quả trên dữ liệu đã chuẩn bị
+
+    Tách riêng để nhiều cấu hình (ví dụ sweep window_size) dùng chung 1 lần load + scale
+
+    Args:
+        config: Cấu hình
+        data_dict: Kết quả prepare_data (hoặc with_windows)
+        data_info: Kết quả load_data
+        run_type: Loại chạy
+
+    Returns:
+        Dictionary chứa tất cả kết quả
+    """
+    data_file = data_info["data_file"]
+    data_rows = data_info["data_rows"]
+    data_start, data_end = data_info["data_start"], data_info["data_end"]
+
     X_train = data_dict['X_train']
     y_train = data_dict['y_train']
     X_val = data_dict['X_val']
@@ -128,26 +285,53 @@ def run_pipeline(config: Optional[Config] = None, run_type: str = "main") -> Dic
     y_test = data_dict['y_test']
     scaler = data_dict['scaler']
 
-    # 5. STEP 3: BUILD MODEL
+    # Subsample mỗi epoch cần chọn lại index theo epoch → chỉ WindowDataset làm được
+    # mà không tạo mảng con (fancy indexing trên mảng X sẽ copy cả khối)
+    use_window_dataset = config.training.use_window_dataset or config.preprocessing.subsample < 1.0
+    if use_window_dataset and not config.training.use_window_dataset:
+        print(f"Subsample {config.preprocessing.subsample:.0%} mỗi epoch → dùng WindowDataset")
+
+    if use_window_dataset:
+        # Thay mảng X bằng dataset sinh windows theo batch (y_* vẫn giữ để đánh giá)
+        X_train, X_val, X_test = make_window_datasets(
+            data_dict,
+            window_size=config.preprocessing.window_size,
+            predict_steps=config.preprocessing.predict_steps,
+            batch_size=config.training.batch_size,
+            seed=config.runtime.seed,
+            workers=config.training.data_workers,
+            use_multiprocessing=config.training.data_use_multiprocessing,
+            max_queue_size=config.training.data_max_queue_size,
+            stride=config.preprocessing.stride,
+            subsample=config.preprocessing.subsample
+        )
+        y_train, y_val = None, None
+
+    # STEP 3: BUILD MODEL
     print("\n" + "=" * 70)
-    print("BƯỚC 3: XÂY DỰNG MODEL BiLSTM")
+    model_name = MODEL_NAMES.get(config.model.architecture, config.model.architecture)
+    print(f"BƯỚC 3: XÂY DỰNG MODEL {model_name}")
     print("=" * 70 + "\n")
 
     input_shape = config.model.get_input_shape(
         config.preprocessing.window_size,
-        len(config.data.features)
+        len(data_dict['features'])
     )
-    model = build_bilstm_model(
+    model = build_model(
+        config.model.architecture,
         input_shape=input_shape,
-        lstm_units=config.model.lstm_units,
+        units=config.model.lstm_units,
         dropout_rate=config.model.dropout_rate,
         dense_units=config.model.dense_units,
-        output_units=config.model.output_units,
-        learning_rate=config.training.learning_rate
+        # Multi-horizon: mỗi output unit dự đoán 1 bước tới (t+1 ... t+predict_steps).
+        # Truyền thẳng, không ghi vào config (config có thể được dùng lại cho lần chạy khác)
+        output_units=config.preprocessing.predict_steps,
+        learning_rate=config.training.learning_rate,
+        **config.model.get_builder_options()
     )
     print_model_summary(model)
 
-    # 6. STEP 4: TRAIN MODEL
+    # STEP 4: TRAIN MODEL
     print("\n" + "=" * 70)
     print("BƯỚC 4: TRAINING MODEL")
     print("=" * 70 + "\n")
@@ -163,7 +347,7 @@ def run_pipeline(config: Optional[Config] = None, run_type: str = "main") -> Dic
 
     history = train_result['history']
 
-    # 7. STEP 5: EVALUATE & VISUALIZE
+    # STEP 5: EVALUATE & VISUALIZE
     print("\n" + "=" * 70)
     print("BƯỚC 5: ĐÁNH GIÁ & VẼ BIỂU ĐỒ")
     print("=" * 70 + "\n")
@@ -173,7 +357,8 @@ def run_pipeline(config: Optional[Config] = None, run_type: str = "main") -> Dic
         X_test=X_test,
         y_test=y_test,
         scaler=scaler,
-        return_predictions=True
+        return_predictions=True,
+        target_index=data_dict['target_index']
     )
 
     y_true = eval_result['y_true']
@@ -184,13 +369,14 @@ def run_pipeline(config: Optional[Config] = None, run_type: str = "main") -> Dic
     direction_accuracy = calculate_direction_accuracy(y_true, y_pred)
     eval_result["direction_accuracy"] = float(direction_accuracy)
 
-    # 8. STEP 6: SAVE RESULTS
+    # STEP 6: SAVE RESULTS
     print("\n" + "=" * 70)
     print("LƯU KẾT QUẢ")
     print("=" * 70 + "\n")
 
     # Tạo config dict để đặt tên folder (đồng bộ với notebook: chỉ dùng 3 tham số cơ bản)
     folder_config = {
+        'model': model_name,
         'timeframe': config.data.timeframe,
         'window_size': config.preprocessing.window_size,
         'limit': config.data.limit,
@@ -211,22 +397,34 @@ def run_pipeline(config: Optional[Config] = None, run_type: str = "main") -> Dic
     plot_predictions(y_true, y_pred, save_path=str(plot_predictions_file))
     plot_all_in_one(history, y_true, y_pred, save_path=str(plot_all_in_one_file))
 
+    multi_horizon = len(eval_result['horizons']) > 1
+    if multi_horizon:
+        plot_horizons_file = results_folder / f"horizons_{timestamp_suffix}.png"
+        plot_horizon_metrics(eval_result['horizons'], save_path=str(plot_horizons_file))
+
     # Tạo config dict để lưu
     config_dict = {
         'data_path': str(data_file),
-        'symbol': 'BTC/USDT',  # Default symbol
+        'symbol': symbol_to_pair(config.data.symbol),
         'timeframe': config.data.timeframe,
         'limit': config.data.limit,
+        'start': config.data.start,
+        'end': config.data.end,
         'data_rows': data_rows,
         'data_start': data_start,
         'data_end': data_end,
         'window_size': config.preprocessing.window_size,
-        'features': config.data.features,
+        'predict_steps': config.preprocessing.predict_steps,
+        'stride': config.preprocessing.stride,
+        'subsample': config.preprocessing.subsample,
+        'features': data_dict['features'],
+        'target': data_dict['target'],
         'scaler_type': config.preprocessing.scaler_type,
-        'train_samples': len(X_train),
-        'val_samples': len(X_val),
-        'test_samples': len(X_test),
+        'train_samples': len(data_dict['X_train']),
+        'val_samples': len(data_dict['X_val']),
+        'test_samples': len(data_dict['X_test']),
         'seed': config.runtime.seed,
+        'model': model_name,
         'lstm_units': config.model.lstm_units,
         'dropout_rate': config.model.dropout_rate,
         'epochs': config.training.epochs,
@@ -237,6 +435,7 @@ def run_pipeline(config: Optional[Config] = None, run_type: str = "main") -> Dic
         'best_epoch': train_result['best_epoch'],
         'best_val_loss': train_result['best_val_loss'],
         'train_seconds': train_result['train_seconds'],
+        'mean_epoch_seconds': sum(train_result['epoch_seconds']) / max(1, len(train_result['epoch_seconds'])),
         'checkpoint_path': train_result['checkpoint_path'],
     }
 
@@ -245,6 +444,8 @@ def run_pipeline(config: Optional[Config] = None, run_type: str = "main") -> Dic
         'predictions': f"predictions_{timestamp_suffix}.png",
         'all_in_one': f"all_in_one_{timestamp_suffix}.png"
     }
+    if multi_horizon:
+        plots_dict['horizons'] = f"horizons_{timestamp_suffix}.png"
 
     save_markdown_report(
         folder_path=results_folder,
@@ -255,12 +456,15 @@ def run_pipeline(config: Optional[Config] = None, run_type: str = "main") -> Dic
     )
     save_config(results_folder, config_dict)
     save_metrics(results_folder, eval_result)
+    # Tham số scaler → suy luận chỉ cần model + file này (DataScaler.load), không cần dữ liệu train
+    scaler_file = scaler.save(results_folder / "scaler.json")
+    print(f"Đã lưu scaler: {scaler_file}")
 
-    # 9. SUMMARY
+    # SUMMARY
     print("\n" + "=" * 70)
     print("HOÀN THÀNH")
     print("=" * 70)
-    print(f"Báo cáo: {results_folder / f'results_BiLSTM_{timestamp_suffix}.md'}")
+    print(f"Báo cáo: {results_folder / f'results_{results_folder.name}.md'}")
     print("=" * 70 + "\n")
 
     return {
@@ -268,6 +472,7 @@ def run_pipeline(config: Optional[Config] = None, run_type: str = "main") -> Dic
         "metrics": eval_result,
         "history": history.history,
         "plots": plots_dict,
+        "scaler_path": str(scaler_file),
         "results_folder": str(results_folder),
     }
 
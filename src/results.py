@@ -72,16 +72,17 @@ def create_results_folder(
     - Không bị lẫn với kết quả lần trước
     - Tên folder chứa thông tin quan trọng để dễ phân biệt
 
-    Format tên (đơn giản): BiLSTM_{timeframe}_w{window}_l{limit}_{timestamp}
-    Ví dụ: BiLSTM_15m_w96_l30k_20251227_133014
+    Format tên (đơn giản): {model}_{timeframe}_w{window}_l{limit}_{timestamp}
+    Ví dụ: BiLSTM_15m_w96_l30k_20251227_133014, TCN_15m_w576_l150k_20251227_133014
     
-    Format đầy đủ (nếu có thêm tham số): BiLSTM_{timeframe}_w{window}_l{limit}_e{epochs}_u{lstm_units}_d{dropout}_b{batch}_{scaler}_{timestamp}
+    Format đầy đủ (nếu có thêm tham số): {model}_{timeframe}_w{window}_l{limit}_e{epochs}_u{lstm_units}_d{dropout}_b{batch}_{scaler}_{timestamp}
     Ví dụ: BiLSTM_15m_w96_l30k_e20_u64-32_d20_b32_mm_20251227_133014
 
     Args:
         base_path: Đường dẫn cơ sở
         run_type: "main", "notebook", "test"
         config: Dict chứa config với các tham số:
+            - model: str (tùy chọn, mặc định "BiLSTM") - tên kiến trúc
             - timeframe: str (bắt buộc)
             - window_size: int (bắt buộc)
             - limit: int (tùy chọn) - số dòng dữ liệu (khuyến nghị dùng)
@@ -111,7 +112,8 @@ def create_results_folder(
         window_size = config['window_size']
         
         # Bắt đầu với phần cơ bản
-        parts = [f"BiLSTM_{timeframe}", f"w{window_size}"]
+        model_name = config.get('model') or "BiLSTM"
+        parts = [f"{model_name}_{timeframe}", f"w{window_size}"]
         
         # Thêm limit nếu có (rút gọn: 30000 -> l30k, 50000 -> l50k, 100000 -> l100k)
         if 'limit' in config and config['limit']:
@@ -163,7 +165,7 @@ def create_results_folder(
         folder_name = '_'.join(parts)
     else:
         # Fallback nếu không có config đầy đủ
-        folder_name = f"BiLSTM_{timestamp}"
+        folder_name = f"{(config or {}).get('model') or 'BiLSTM'}_{timestamp}"
     
     folder_path = base_path / run_type / folder_name
     folder_path.mkdir(parents=True, exist_ok=True)
@@ -231,7 +233,7 @@ def save_markdown_report(
     report_path = folder_path / f"results_{folder_path.name}.md"
 
     now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    content = f"# Kết quả dự đoán giá Bitcoin - BiLSTM\n\n**Timestamp:** {now_str}\n\n---\n\n"
+    content = f"# Kết quả dự đoán giá Bitcoin - {config.get('model', 'BiLSTM')}\n\n**Timestamp:** {now_str}\n\n---\n\n"
 
     # Cấu hình
     content += "## Cấu hình & Dữ liệu\n\n"
@@ -255,6 +257,39 @@ def save_markdown_report(
             content += f"| Direction Accuracy | {metrics['direction_accuracy']*100:.2f}% |\n"
         content += "\n"
 
+        # Multi-horizon: metrics từng bước dự đoán tới
+        horizons = metrics.get("horizons") or []
+        if len(horizons) > 1:
+            content += "### Theo Horizon\n\n"
+            content += "| Horizon | MAE | RMSE | MAPE | Direction Accuracy |\n|---|---|---|---|---|\n"
+            for h in horizons:
+                content += (
+                    f"| t+{h['step']} | ${h['mae']:.2f} | ${h['rmse']:.2f} | {h['mape']:.2f}% "
+                    f"| {h['direction_accuracy']*100:.2f}% |\n"
+                )
+            content += "\n"
+
+        # Walk-forward: metrics từng fold (tổng hợp ở bảng trên = nối dự đoán mọi fold)
+        folds = metrics.get("folds") or []
+        if folds:
+            content += "### Theo Fold\n\n"
+            content += f"MAE theo fold: ${metrics['mae_mean']:.2f} ± {metrics['mae_std']:.2f}  \n"
+            content += (
+                f"Thời gian: {metrics['wall_seconds']:.2f}s "
+                f"(tổng train các fold {metrics['train_seconds_total']:.2f}s)\n\n"
+            )
+            content += (
+                "| Fold | Train rows | Test | MAE | RMSE | MAPE | Direction Accuracy | Best Epoch | Train |\n"
+                "|---|---|---|---|---|---|---|---|---|\n"
+            )
+            for f in folds:
+                content += (
+                    f"| {f['fold']} | {f['train_rows']} | {f['test_start']} → {f['test_end']} "
+                    f"| ${f['mae']:.2f} | ${f['rmse']:.2f} | {f['mape']:.2f}% "
+                    f"| {f['direction_accuracy']*100:.2f}% | {f['best_epoch']} | {f['train_seconds']:.2f}s |\n"
+                )
+            content += "\n"
+
     # Training history
     if history:
         content += "## Training History\n\n"
@@ -269,6 +304,14 @@ def save_markdown_report(
             content += f"| Val MAE | {history['val_mae'][-1]:.6f} |\n"
         content += "\n"
 
+        # Thời gian từng epoch cạnh val_loss (so sánh stride/subsample)
+        if 'epoch_seconds' in history and 'val_loss' in history:
+            content += "### Theo Epoch\n\n"
+            content += "| Epoch | Thời gian | Val Loss |\n|---|---|---|\n"
+            for epoch, (seconds, val_loss) in enumerate(zip(history['epoch_seconds'], history['val_loss']), 1):
+                content += f"| {epoch} | {seconds:.2f}s | {val_loss:.6f} |\n"
+            content += "\n"
+
     # Plots
     if plots:
         content += "## Biểu Đồ / Plots\n\n"
@@ -276,7 +319,7 @@ def save_markdown_report(
             content += f"- **{plot_name}**: `{plot_file}`\n"
         content += "\n"
 
-    content += "---\n\n*Generated by BiLSTM Bitcoin Price Predictor*\n"
+    content += f"---\n\n*Generated by {config.get('model', 'BiLSTM')} Bitcoin Price Predictor*\n"
 
     with open(report_path, 'w') as f:
         f.write(content)
@@ -314,7 +357,8 @@ def clean_old_reports(
         return 0
 
     # Lấy danh sách folder, sắp theo thời gian giảm dần
-    folders = sorted(run_dir.glob("BiLSTM_*"), key=lambda p: p.stat().st_mtime, reverse=True)
+    # Mọi kiến trúc ({model}_...), mỗi folder con là 1 lần chạy
+    folders = sorted((p for p in run_dir.iterdir() if p.is_dir()), key=lambda p: p.stat().st_mtime, reverse=True)
 
     # Xóa các folder cũ
     deleted_count = 0
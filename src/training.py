@@ -12,6 +12,7 @@ Callback là gì?
 - EarlyStopping: Dừng lại khi model không còn học được gì
 - ModelCheckpoint: Lưu lại model tốt nhất
 - ReduceLROnPlateau: Giảm learning rate khi model không còn tiến bộ
+- EpochTimer: Bấm giờ từng epoch (để so thời gian với val_loss khi dùng stride/subsample)
 
 Trách nhiệm (SoC):
 - Chỉ handle training logic
@@ -20,7 +21,7 @@ Trách nhiệm (SoC):
 
 import time
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Union
 
 import numpy as np
 from tensorflow import keras
@@ -29,34 +30,63 @@ from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint, ReduceLRO
 from .config import Config
 
 
+class EpochTimer(keras.callbacks.Callback):
+    """
+    Ghi thời gian (giây) của từng epoch vào logs["epoch_seconds"]
+
+    → nằm luôn trong history.history cạnh val_loss, dễ so "nhanh hơn bao nhiêu,
+    kém đi bao nhiêu" giữa các cấu hình stride/subsample
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.epoch_seconds: List[float] = []
+        self._t0 = 0.0
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._t0 = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        seconds = time.perf_counter() - self._t0
+        self.epoch_seconds.append(seconds)
+        if logs is not None:
+            logs["epoch_seconds"] = seconds
+
+
 def train_model(
     model: keras.Model,
-    X_train: np.ndarray,
-    y_train: np.ndarray,
-    X_val: np.ndarray,
-    y_val: np.ndarray,
-    config: Config
+    X_train: Union[np.ndarray, keras.utils.PyDataset],
+    y_train: Optional[np.ndarray],
+    X_val: Union[np.ndarray, keras.utils.PyDataset],
+    y_val: Optional[np.ndarray],
+    config: Config,
+    checkpoint_path: Optional[Path] = None
 ) -> Dict[str, Any]:
     """
     Huấn luyện model với callbacks
 
     Args:
         model: Model đã được build
-        X_train, y_train: Dữ liệu train
-        X_val, y_val: Dữ liệu validation
+        X_train, y_train: Dữ liệu train. X_train là PyDataset (WindowDataset)
+            → tự sinh (X, y) theo batch, y_train = None
+        X_val, y_val: Dữ liệu validation (tương tự X_train)
         config: Cấu hình
+        checkpoint_path: File checkpoint (None = models/checkpoints/best_model.keras).
+            Nhiều process train song song → mỗi process 1 file riêng
 
     Returns:
         Dictionary chứa:
             - history: Training history
             - best_epoch: Epoch có val_loss thấp nhất
             - train_seconds: Thời gian training
+            - epoch_seconds: Thời gian từng epoch
             - checkpoint_path: Đường dẫn checkpoint
     """
     # Tạo thư mục checkpoint
-    checkpoint_dir = config.paths.models_dir / "checkpoints"
-    checkpoint_dir.mkdir(parents=True, exist_ok=True)
-    checkpoint_path = checkpoint_dir / "best_model.keras"
+    if checkpoint_path is None:
+        checkpoint_path = config.paths.models_dir / "checkpoints" / "best_model.keras"
+    checkpoint_path = Path(checkpoint_path)
+    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
 
     # Callbacks
     checkpoint_callback = ModelCheckpoint(
@@ -83,24 +113,34 @@ def train_model(
         verbose=1
     )
 
-    callbacks = [checkpoint_callback, early_stop_callback, reduce_lr_callback]
+    # Timer đứng đầu → logs["epoch_seconds"] có trước khi History ghi lại epoch
+    epoch_timer = EpochTimer()
+    callbacks = [epoch_timer, checkpoint_callback, early_stop_callback, reduce_lr_callback]
 
     print("\n" + "=" * 70)
     print("BẮT ĐẦU TRAINING")
     print("=" * 70)
     print(f"Epochs: {config.training.epochs}")
     print(f"Batch size: {config.training.batch_size}")
-    print(f"Train samples: {len(X_train)}")
-    print(f"Val samples: {len(X_val)}")
+    print(f"Train samples: {_num_samples(X_train)}")
+    print(f"Val samples: {_num_samples(X_val)}")
     print(f"Checkpoint: {checkpoint_path}")
     print("=" * 70 + "\n")
 
+    if isinstance(X_train, keras.utils.PyDataset):
+        # Dataset tự chia batch + xáo → không truyền y/batch_size
+        fit_data = dict(x=X_train, validation_data=X_val)
+    else:
+        fit_data = dict(
+            x=X_train, y=y_train,
+            validation_data=(X_val, y_val),
+            batch_size=config.training.batch_size
+        )
+
     t0 = time.perf_counter()
     history = model.fit(
-        X_train, y_train,
-        validation_data=(X_val, y_val),
+        **fit_data,
         epochs=config.training.epochs,
-        batch_size=config.training.batch_size,
         callbacks=callbacks,
         verbose=1
     )
@@ -116,6 +156,10 @@ def train_model(
     print(f"Best val_loss: {best_val_loss:.6f}")
     print(f"Best val_mae: {history.history['val_mae'][best_epoch-1]:.6f}")
     print(f"Training time: {train_seconds:.2f}s")
+    print("-" * 70)
+    print(f"{'Epoch':<8} {'Thời gian':<12} {'val_loss':<12}")
+    for epoch, (seconds, val_loss) in enumerate(zip(epoch_timer.epoch_seconds, history.history['val_loss']), 1):
+        print(f"{epoch:<8} {f'{seconds:.2f}s':<12} {val_loss:<12.6f}")
     print("=" * 70 + "\n")
 
     return {
@@ -123,10 +167,16 @@ def train_model(
         "best_epoch": best_epoch,
         "best_val_loss": best_val_loss,
         "train_seconds": train_seconds,
+        "epoch_seconds": epoch_timer.epoch_seconds,
         "checkpoint_path": str(checkpoint_path)
     }
 
 
+def _num_samples(data: Union[np.ndarray, keras.utils.PyDataset]) -> int:
+    """Số mẫu (window) của mảng hoặc WindowDataset"""
+    return data.num_windows if hasattr(data, "num_windows") else len(data)
+
+
 def load_checkpoint(checkpoint_path: str) -> keras.Model:
     """
     Load model từ checkpoint
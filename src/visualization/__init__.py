@@ -18,7 +18,8 @@ from .plots import (
     plot_predictions,
     plot_residuals,
     plot_price_history,
-    plot_all_in_one
+    plot_all_in_one,
+    plot_horizon_metrics
 )
 
 __all__ = [
@@ -27,4 +28,5 @@ __all__ = [
     "plot_residuals",
     "plot_price_history",
     "plot_all_in_one",
+    "plot_horizon_metrics",
 ]
@@ -199,6 +199,54 @@ def plot_price_history(
     plt.show()
 
 
+def plot_horizon_metrics(
+    horizons,
+    save_path: Optional[str] = None
+) -> None:
+    """
+    Vẽ sai số + độ chính xác xu hướng theo từng horizon (multi-horizon)
+
+    Giải thích bằng ví dụ đời sống:
+    - Giống như "dự báo thời tiết" - ngày mai khá chuẩn, tuần sau kém dần
+    - Cho thấy model kém đi nhanh thế nào khi dự đoán xa hơn
+
+    Args:
+        horizons: List metrics từng horizon (evaluate_model()["horizons"])
+        save_path: Đường dẫn để lưu plot
+    """
+    steps = [h["step"] for h in horizons]
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+
+    # MAE / RMSE theo horizon
+    axes[0].plot(steps, [h["mae"] for h in horizons], marker='o', label='MAE', linewidth=2)
+    axes[0].plot(steps, [h["rmse"] for h in horizons], marker='s', label='RMSE', linewidth=2)
+    axes[0].set_title('Sai số theo horizon', fontsize=14, fontweight='bold')
+    axes[0].set_xlabel('Số bước dự đoán tới (t+h)', fontsize=12)
+    axes[0].set_ylabel('Sai số (USD)', fontsize=12)
+    axes[0].set_xticks(steps)
+    axes[0].legend()
+    axes[0].grid(True, alpha=0.3)
+
+    # Direction accuracy theo horizon
+    axes[1].bar(steps, [h["direction_accuracy"] * 100 for h in horizons], edgecolor='black', alpha=0.7)
+    axes[1].axhline(y=50, color='r', linestyle='--', linewidth=1, label='Ngẫu nhiên (50%)')
+    axes[1].set_title('Độ chính xác xu hướng theo horizon', fontsize=14, fontweight='bold')
+    axes[1].set_xlabel('Số bước dự đoán tới (t+h)', fontsize=12)
+    axes[1].set_ylabel('Độ chính xác (%)', fontsize=12)
+    axes[1].set_xticks(steps)
+    axes[1].legend()
+    axes[1].grid(True, alpha=0.3)
+
+    plt.tight_layout()
+
+    if save_path:
+        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        print(f"Đã lưu horizon metrics plot: {save_path}")
+
+    plt.show()
+
+
 def plot_all_in_one(
     history,
     y_true: np.ndarray,
@@ -0,0 +1,415 @@
+"""
+WALK-FORWARD MODULE - BACKTEST NHIỀU FOLD SONG SONG
+-------------------------------------------------------
+
+Giải thích bằng ví dụ đời sống:
+- Giống như "thi thử nhiều đợt" - học tới tháng 3 thi tháng 4, học tới tháng 4 thi tháng 5...
+- Mỗi đợt là 1 fold: train trên quá khứ → dự đoán block kế tiếp (rolling-origin)
+- Nhiều phòng thi cùng lúc: mỗi fold train trong 1 process riêng
+
+Flow:
+1. Load dữ liệu 1 lần (load_data của pipeline)
+2. Chia fold (walk_forward_splits), chỉ tính index
+3. Process chính chuẩn bị dữ liệu fold k+1 (fit scaler trên train của fold, scale)
+   trong lúc các process con đang train fold k
+4. Mỗi process con: build model → train → dự đoán test của fold
+   (use_window_dataset / subsample < 1 → WindowDataset như pipeline)
+5. Gom metrics từng fold + tổng hợp (nối dự đoán test của mọi fold) vào 1 báo cáo
+
+Song song:
+- ProcessPoolExecutor với context "spawn" (không fork process đã khởi tạo TensorFlow)
+- Mỗi process có budget thread TensorFlow riêng (threads_per_worker)
+  → workers × threads_per_worker ≈ số core, các process không tranh nhau CPU
+- Log (model.fit, ...) của từng fold ghi vào fold_{k}.log trong folder kết quả
+
+Trách nhiệm (SoC):
+- Orchestrate walk-forward, logic cụ thể vẫn ở core/training (giống pipeline.py)
+"""
+
+import contextlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .config import Config, RuntimeConfig
+from .runtime import configure_tensorflow_runtime, set_random_seed
+from .core import (
+    DataScaler,
+    Fold,
+    walk_forward_splits,
+    fold_windows,
+    feature_matrix,
+    make_window_datasets,
+    MODEL_NAMES,
+    build_model,
+    evaluate_model,
+    regression_metrics,
+    calculate_direction_accuracy,
+    symbol_to_pair,
+)
+from .training import train_model
+from .visualization import plot_predictions
+from .pipeline import load_data
+from .results import (
+    create_results_folder,
+    save_config,
+    save_metrics,
+    save_markdown_report,
+)
+
+
+# ==================== WORKER (process con) ====================
+def _init_worker(threads: int, runtime: RuntimeConfig) -> None:
+    """Khởi tạo 1 process con: budget thread TensorFlow riêng"""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        configure_tensorflow_runtime(
+            intra_op_threads=threads,
+            inter_op_threads=1,
+            enable_xla=runtime.enable_xla,
+            use_gpu=runtime.use_gpu
+        )
+
+
+def _fold_series(series: np.ndarray, fold: Fold, window_size: int) -> Dict:
+    """
+    Chuỗi train/val/test của fold cho make_window_datasets
+
+    Mỗi phần kèm window_size dòng trước nó → WindowDataset sinh đúng các window của
+    fold_windows (target nằm trọn trong khoảng của phần đó)
+    """
+    def _part(rows: slice) -> np.ndarray:
+        return series[max(0, rows.start - window_size):rows.stop]
+
+    return {"train_series": _part(fold.train), "val_series": _part(fold.val), "test_series": _part(fold.test)}
+
+
+def _run_fold(task: Dict) -> Dict:
+    """
+    Train + đánh giá 1 fold (chạy trong process con)
+
+    Args:
+        task: Kết quả _prepare_fold
+
+    Returns:
+        Metrics của fold + y_true/dự đoán test (giá thật, shape [n, predict_steps])
+    """
+    config: Config = task["config"]
+    fold: Fold = task["local_fold"]
+    prep = config.preprocessing
+
+    with open(task["log_path"], "w") as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        print(task["fold"])
+        set_random_seed(config.runtime.seed, deterministic=True)
+
+        scaler = DataScaler.from_params(task["scaler_params"], dtype=prep.dtype)
+        windows = fold_windows(
+            task["series"], fold, prep.window_size, prep.predict_steps,
+            target_index=task["target_index"], stride=prep.stride
+        )
+        X_train, y_train = windows["X_train"], windows["y_train"]
+        X_val, y_val = windows["X_val"], windows["y_val"]
+        X_test = windows["X_test"]
+
+        # Giống pipeline: subsample mỗi epoch chỉ WindowDataset làm được
+        if config.training.use_window_dataset or prep.subsample < 1.0:
+            X_train, X_val, X_test = make_window_datasets(
+                {**_fold_series(task["series"], fold, prep.window_size), "target_index": task["target_index"]},
+                window_size=prep.window_size,
+                predict_steps=prep.predict_steps,
+                batch_size=config.training.batch_size,
+                seed=config.runtime.seed,
+                workers=config.training.data_workers,
+                use_multiprocessing=config.training.data_use_multiprocessing,
+                max_queue_size=config.training.data_max_queue_size,
+                stride=prep.stride,
+                subsample=prep.subsample
+            )
+            y_train, y_val = None, None
+
+        model = build_model(
+            config.model.architecture,
+            input_shape=config.model.get_input_shape(prep.window_size, task["series"].shape[1]),
+            units=config.model.lstm_units,
+            dropout_rate=config.model.dropout_rate,
+            dense_units=config.model.dense_units,
+            output_units=prep.predict_steps,
+            learning_rate=config.training.learning_rate,
+            **config.model.get_builder_options()
+        )
+        train_result = train_model(
+            model=model,
+            X_train=X_train,
+            y_train=y_train,
+            X_val=X_val,
+            y_val=y_val,
+            config=config,
+            checkpoint_path=task["checkpoint_path"]
+        )
+        eval_result = evaluate_model(
+            model=model,
+            X_test=X_test,
+            y_test=windows["y_test"],
+            scaler=scaler,
+            target_index=task["target_index"]
+        )
+
+    n_test = len(eval_result["y_true"])
+    return {
+        "fold": task["fold"].index,
+        "train_samples": len(windows["X_train"]),
+        "test_samples": n_test,
+        "mae": eval_result["mae"],
+        "rmse": eval_result["rmse"],
+        "mape": eval_result["mape"],
+        "direction_accuracy": eval_result["horizons"][0]["direction_accuracy"],
+        "best_epoch": int(train_result["best_epoch"]),
+        "best_val_loss": float(train_result["best_val_loss"]),
+        "train_seconds": train_result["train_seconds"],
+        "y_true": eval_result.get("y_true_horizons", eval_result["y_true"].reshape(n_test, -1)),
+        "predictions": eval_result.get("predictions_horizons", eval_result["predictions"].reshape(n_test, -1)),
+    }
+
+
+# ==================== CHUẨN BỊ FOLD (process chính) ====================
+def _prepare_fold(raw: np.ndarray, fold: Fold, config: Config, target_index: int, results_folder: Path) -> Dict:
+    """
+    Scale đúng đoạn dữ liệu fold cần (fit scaler trên train của fold)
+
+    Chỉ gửi sang process con các dòng [train_start - window_size, test_end) - bản riêng
+    của fold (process con nhận bản pickle, không dùng chung buffer với fold khác)
+    """
+    t0 = time.perf_counter()
+    prep = config.preprocessing
+
+    lo = max(0, fold.train_start - prep.window_size)
+    scaler = DataScaler(scaler_type=prep.scaler_type, dtype=prep.dtype).fit(raw[fold.train])
+    series = scaler.transform(raw[lo:fold.test_end])
+    # Index của fold tính lại theo đoạn vừa cắt
+    local_fold = Fold(
+        fold.index,
+        fold.train_start - lo, fold.train_end - lo,
+        fold.val_start - lo, fold.val_end - lo,
+        fold.test_start - lo, fold.test_end - lo,
+    )
+
+    return {
+        "config": config,
+        "fold": fold,
+        "local_fold": local_fold,
+        "series": series,
+        "scaler_params": scaler.get_params(),
+        "target_index": target_index,
+        "log_path": str(results_folder / f"fold_{fold.index}.log"),
+        # Trong folder kết quả của lần chạy → 2 lần chạy (khác kiến trúc/config) không ghi đè nhau
+        "checkpoint_path": str(results_folder / "checkpoints" / f"fold_{fold.index}.keras"),
+        "prep_seconds": time.perf_counter() - t0,
+    }
+
+
+# ==================== MAIN ====================
+def run_walk_forward(config: Optional[Config] = None, run_type: str = "walk_forward") -> Dict:
+    """
+    Walk-forward backtest: mỗi fold train trên quá khứ rồi dự đoán block kế tiếp
+
+    Giải thích bằng ví dụ đời sống:
+    - Lặp run_pipeline cho từng fold → chạy tuần tự + load lại dữ liệu mỗi lần
+    - Ở đây: load 1 lần, các fold train song song ở nhiều process,
+      process chính chuẩn bị fold kế tiếp trong lúc các fold trước đang train
+
+    Args:
+        config: Cấu hình (None = dùng default). Fold/song song theo config.walk_forward
+        run_type: Loại chạy
+
+    Returns:
+        Dictionary: config, metrics (tổng hợp + "folds"), y_true/predictions nối mọi fold,
+        results_folder
+    """
+    if config is None:
+        config = Config()
+    wf = config.walk_forward
+    prep = config.preprocessing
+
+    set_random_seed(config.runtime.seed, deterministic=True)
+
+    # STEP 1: Load 1 lần cho mọi fold
+    data_info = load_data(config)
+    df = data_info["df"]
+    raw, features, target_index = feature_matrix(df, config.data.get_features(), config.data.target, prep.dtype)
+
+    # STEP 2: Chia fold (chỉ index)
+    folds = walk_forward_splits(
+        len(raw),
+        n_folds=wf.n_folds,
+        val_size=wf.val_size,
+        test_size=wf.test_size,
+        gap=wf.gap,
+        train_size=wf.train_size,
+        expanding=wf.expanding
+    )
+    for fold in folds:
+        if min(fold.val_end - fold.val_start, fold.test_end - fold.test_start) < prep.predict_steps:
+            raise ValueError(f"{fold}: val/test phải có ít nhất predict_steps={prep.predict_steps} dòng")
+
+    model_name = MODEL_NAMES.get(config.model.architecture, config.model.architecture)
+    workers = min(len(folds), wf.workers or max(1, (os.cpu_count() or 1) // 2))
+    threads = wf.threads_per_worker or max(1, config.runtime.intra_op_threads // workers)
+
+    print("\n" + "=" * 70)
+    print("WALK-FORWARD BACKTEST")
+    print("=" * 70)
+    for fold in folds:
+        print(f"   {fold}")
+    print(f"   Song song: {workers} process × {threads} thread TensorFlow")
+    print("=" * 70 + "\n")
+
+    folder_config = {
+        'model': model_name,
+        'timeframe': config.data.timeframe,
+        'window_size': prep.window_size,
+        'limit': config.data.limit,
+    }
+    results_folder = create_results_folder(run_type=run_type, config=folder_config)
+    print(f"Folder kết quả: {results_folder} (log từng fold: fold_*.log)\n")
+
+    # STEP 3-4: Chuẩn bị fold k+1 trong lúc fold k đang train
+    t0 = time.perf_counter()
+    fold_results: List[Dict] = []
+    prep_seconds: Dict[int, float] = {}
+    pending = {}
+    remaining = iter(folds)
+
+    def _next_task() -> Optional[Dict]:
+        fold = next(remaining, None)
+        return None if fold is None else _prepare_fold(raw, fold, config, target_index, results_folder)
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(threads, config.runtime)
+    ) as pool:
+        task = _next_task()
+        while task is not None or pending:
+            if task is not None and len(pending) < workers:
+                prep_seconds[task["fold"].index] = task["prep_seconds"]
+                pending[pool.submit(_run_fold, task)] = task["fold"]
+                print(f"Đã gửi fold {task['fold'].index} (chuẩn bị {task['prep_seconds']:.2f}s)")
+                # Chuẩn bị fold kế tiếp ngay, trong lúc các fold đã gửi đang train
+                task = _next_task()
+                continue
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                fold = pending.pop(future)
+                result = future.result()
+                result["prep_seconds"] = prep_seconds[fold.index]
+                fold_results.append(result)
+                print(
+                    f"Xong fold {fold.index}: MAE ${result['mae']:.2f}, "
+                    f"train {result['train_seconds']:.2f}s ({len(fold_results)}/{len(folds)})"
+                )
+
+    wall_seconds = time.perf_counter() - t0
+    fold_results.sort(key=lambda r: r["fold"])
+
+    # STEP 5: Tổng hợp - nối dự đoán test của mọi fold (test các fold nối tiếp nhau)
+    y_true = np.concatenate([r.pop("y_true") for r in fold_results])
+    y_pred = np.concatenate([r.pop("predictions") for r in fold_results])
+    overall = regression_metrics(y_true.ravel(), y_pred.ravel())
+    fold_mae = np.array([r["mae"] for r in fold_results])
+
+    datetimes = df.get_column("datetime")
+    for fold, result in zip(folds, fold_results):
+        result["train_rows"] = fold.train_end - fold.train_start
+        result["test_start"] = str(datetimes[fold.test_start])
+        result["test_end"] = str(datetimes[fold.test_end - 1])
+
+    train_seconds_total = sum(r["train_seconds"] for r in fold_results)
+    metrics = {
+        **overall,
+        "direction_accuracy": float(calculate_direction_accuracy(y_true[:, 0], y_pred[:, 0], verbose=False)),
+        "mae_mean": float(fold_mae.mean()),
+        "mae_std": float(fold_mae.std()),
+        "wall_seconds": wall_seconds,
+        "train_seconds_total": train_seconds_total,
+        "folds": fold_results,
+    }
+
+    print("\n" + "=" * 70)
+    print("KẾT QUẢ WALK-FORWARD")
+    print("=" * 70)
+    print(f"{'Fold':<6}{'Test':<44}{'MAE':<14}{'Xu hướng':<10}{'Train (s)':<10}")
+    for r in fold_results:
+        direction = f"{r['direction_accuracy'] * 100:.2f}%"
+        print(
+            f"{r['fold']:<6}{r['test_start'] + ' → ' + r['test_end']:<44}"
+            f"${r['mae']:<13.2f}{direction:<10}{r['train_seconds']:<10.2f}"
+        )
+    print("-" * 70)
+    print(f"Tổng hợp: MAE ${metrics['mae']:.2f} (theo fold: {metrics['mae_mean']:.2f} ± {metrics['mae_std']:.2f})")
+    print(f"Thời gian: {wall_seconds:.2f}s (tổng train các fold {train_seconds_total:.2f}s)")
+    print("=" * 70 + "\n")
+
+    # STEP 6: Lưu 1 báo cáo chung
+    folder_parts = results_folder.name.split('_')
+    timestamp_suffix = '_'.join(folder_parts[-2:])
+    plot_predictions_file = results_folder / f"predictions_{timestamp_suffix}.png"
+    plot_predictions(y_true[:, 0], y_pred[:, 0], save_path=str(plot_predictions_file))
+
+    config_dict = {
+        'data_path': str(data_info["data_file"]),
+        'symbol': symbol_to_pair(config.data.symbol),
+        'timeframe': config.data.timeframe,
+        'limit': config.data.limit,
+        'data_rows': data_info["data_rows"],
+        'data_start': data_info["data_start"],
+        'data_end': data_info["data_end"],
+        'window_size': prep.window_size,
+        'predict_steps': prep.predict_steps,
+        'stride': prep.stride,
+        'features': features,
+        'target': features[target_index],
+        'scaler_type': prep.scaler_type,
+        'n_folds': len(folds),
+        'test_size': folds[0].test_end - folds[0].test_start,
+        'val_size': folds[0].val_end - folds[0].val_start,
+        'gap': wf.gap,
+        'expanding': wf.expanding,
+        'workers': workers,
+        'threads_per_worker': threads,
+        'seed': config.runtime.seed,
+        'model': model_name,
+        'lstm_units': config.model.lstm_units,
+        'dropout_rate': config.model.dropout_rate,
+        'epochs': config.training.epochs,
+        'batch_size': config.training.batch_size,
+        'learning_rate': config.training.learning_rate,
+    }
+    plots_dict = {'predictions': plot_predictions_file.name}
+
+    save_markdown_report(folder_path=results_folder, config=config_dict, metrics=metrics, plots=plots_dict)
+    save_config(results_folder, config_dict)
+    save_metrics(results_folder, metrics)
+
+    return {
+        "config": config_dict,
+        "metrics": metrics,
+        "y_true": y_true,
+        "predictions": y_pred,
+        "plots": plots_dict,
+        "results_folder": str(results_folder),
+    }
+
+
+if __name__ == "__main__":
+    # Test walk-forward
+    config = Config.from_args(timeframe="1d", limit=1500, epochs=2, window=20)
+    config.walk_forward.n_folds = 3
+    results = run_walk_forward(config)
+    print("Walk-forward completed!")